@@ -0,0 +1,89 @@
+"""
+Compare the lxml and legacy (BeautifulSoup html.parser) extraction engines on
+the pages in ./corpus (small synthetic pages, see README.md) or in another
+directory of saved pages with its own expectations.json.
+
+Run from the ai/ directory:
+    python benchmarks/html_extraction/bench_html_extraction.py --iterations 200
+    python benchmarks/html_extraction/bench_html_extraction.py --corpus ~/saved-pages --iterations 20
+
+Quality is measured per page as recall of expected main-content phrases and
+leakage of boilerplate phrases (cookie banners, comments, sidebars, footers).
+Pages marked "rejected" should fail the minimum-length gate.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+AI_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, AI_ROOT)
+
+from services.html_extractor import LXML_AVAILABLE, extract_main_content  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    with open(os.path.join(corpus_dir, "expectations.json"), encoding="utf-8") as handle:
+        expectations = json.load(handle)
+    pages = {}
+    for name in expectations:
+        with open(os.path.join(corpus_dir, name), encoding="utf-8", errors="replace") as handle:
+            pages[name] = handle.read()
+    return pages, expectations
+
+
+def score_page(result, expectation):
+    if expectation.get("rejected"):
+        return {"recall": 1.0 if result is None else 0.0, "leakage": 0.0, "title": result is None}
+
+    content = (result or {}).get("content", "")
+    title = (result or {}).get("title", "")
+    expected = expectation.get("expected", [])
+    boilerplate = expectation.get("boilerplate", [])
+    recall = sum(phrase in content for phrase in expected) / max(len(expected), 1)
+    leakage = sum(phrase in content for phrase in boilerplate) / max(len(boilerplate), 1)
+    return {"recall": recall, "leakage": leakage, "title": expectation["title"] in title}
+
+
+def run_engine(engine, pages, expectations, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for name, html in pages.items():
+            extract_main_content(html, name, engine=engine)
+    elapsed = time.perf_counter() - started
+
+    per_page = {
+        name: score_page(extract_main_content(html, name, engine=engine), expectations[name])
+        for name, html in pages.items()
+    }
+    total_pages = iterations * len(pages)
+    return {
+        "engine": engine,
+        "pagesPerSecond": round(total_pages / elapsed, 1) if elapsed else None,
+        "msPerPage": round((elapsed / total_pages) * 1000, 3) if total_pages else None,
+        "meanRecall": round(sum(s["recall"] for s in per_page.values()) / len(per_page), 3),
+        "meanLeakage": round(sum(s["leakage"] for s in per_page.values()) / len(per_page), 3),
+        "titlesCorrect": sum(bool(s["title"]) for s in per_page.values()),
+        "pages": per_page,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="directory with .html pages and expectations.json")
+    args = parser.parse_args()
+
+    pages, expectations = load_corpus(os.path.expanduser(args.corpus))
+    engines = ["legacy"] + (["lxml"] if LXML_AVAILABLE else [])
+    for engine in engines:
+        report = run_engine(engine, pages, expectations, args.iterations)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare the incremental JSON parser (utils/json_stream.py) with the current
+regex clean-up + json.loads pipeline (_clean_json_response in gemini_service)
+on LLM-shaped blog payloads.
+
+Run from the ai/ directory:
+    python benchmarks/json_stream/bench_json_stream.py --iterations 300
+
+For each case it reports whether each pipeline recovers the payload, the
+time per parse, and, for the streaming parser fed in small chunks, how much
+of the output had arrived when the first section became available (the
+regex pipeline always needs 100%).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+AI_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, AI_ROOT)
+
+from services.gemini_service import _clean_json_response  # noqa: E402
+from utils.json_stream import IncrementalJSONParser, parse_json_tolerant  # noqa: E402
+
+CHUNK_SIZE = 32
+
+
+def blog_payload(sections: int, words_per_section: int):
+    body = " ".join(f"word{i}" for i in range(words_per_section))
+    return {
+        "title": "Remote productivity playbook",
+        "h1": "Remote productivity for distributed teams",
+        "sections": [{"h2": f"Section {i}", "body": f"{body} \"quoted\" end."} for i in range(sections)],
+        "faqs": [{"q": f"Question {i}?", "a": "Answer."} for i in range(3)],
+        "meta": {"description": "How remote teams stay productive.", "slug": "remote-productivity"},
+    }
+
+
+def build_cases():
+    small = blog_payload(5, 60)
+    large = blog_payload(12, 250)
+    raw_newlines = json.dumps(small).replace("word10 word11", "word10\nword11").replace("word20 word21", "word20\n\nword21")
+    return {
+        "clean": (json.dumps(small), small),
+        "fenced": ("```json\n" + json.dumps(small, indent=2) + "\n```", small),
+        "prose+fence": ("Sure! Here is the article:\n```json\n" + json.dumps(small) + "\n```\nLet me know.", small),
+        "raw-newlines": (raw_newlines, json.loads(raw_newlines, strict=False)),
+        "trailing-comma": (json.dumps(small)[:-1] + ",}", small),
+        "large": (json.dumps(large), large),
+    }
+
+
+def regex_pipeline(raw):
+    return json.loads(_clean_json_response(raw))
+
+
+def first_section_fraction(raw):
+    parser = IncrementalJSONParser()
+    for start in range(0, len(raw), CHUNK_SIZE):
+        for event in parser.feed(raw[start:start + CHUNK_SIZE]):
+            if event.key == "sections" and event.index == 0:
+                return min(parser.consumed, len(raw)) / len(raw)
+    return None
+
+
+def streamed(raw):
+    parser = IncrementalJSONParser()
+    for start in range(0, len(raw), CHUNK_SIZE):
+        parser.feed(raw[start:start + CHUNK_SIZE])
+    return parser.close()
+
+
+def timed(func, raw, expected, iterations):
+    try:
+        ok = func(raw) == expected
+    except ValueError:
+        ok = False
+    started = time.perf_counter()
+    for _ in range(iterations):
+        try:
+            func(raw)
+        except ValueError:
+            pass
+    return ok, (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    header = f"{'case':<16}{'bytes':>8}  {'regex ok':>8} {'regex us':>9}  {'stream ok':>9} {'1-shot us':>10} {'chunked us':>11}  {'1st section at':>14}"
+    print(header)
+    print("-" * len(header))
+    for name, (raw, expected) in build_cases().items():
+        regex_ok, regex_us = timed(regex_pipeline, raw, expected, args.iterations)
+        oneshot_ok, oneshot_us = timed(parse_json_tolerant, raw, expected, args.iterations)
+        chunked_ok, chunked_us = timed(streamed, raw, expected, args.iterations)
+        fraction = first_section_fraction(raw)
+        print(
+            f"{name:<16}{len(raw):>8}  {str(regex_ok):>8} {regex_us:>9.1f}  "
+            f"{str(oneshot_ok and chunked_ok):>9} {oneshot_us:>10.1f} {chunked_us:>11.1f}  "
+            f"{(f'{fraction:.0%}' if fraction else '-'):>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
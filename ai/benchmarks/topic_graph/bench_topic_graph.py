@@ -0,0 +1,91 @@
+"""
+Compare the /topic/suggest research flow run strictly in sequence (the old
+seed -> retrieve -> live search order) with the task graph in
+services/generation_service.topic_research, which runs the live search alongside
+seed + retrieve.
+
+Providers are stubbed with fixed latencies, so no network or API keys are
+needed. Run from the ai/ directory:
+    python benchmarks/topic_graph/bench_topic_graph.py --runs 5
+
+Latencies are in milliseconds and can be changed to match what /metrics or
+diagnostics.timings show in production, e.g. --live 2500 --seed 900.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+AI_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, AI_ROOT)
+
+from models.requests import TopicSuggestRequest  # noqa: E402
+from services import generation_service, live_search_service  # noqa: E402
+
+
+def install_stubs(seed_ms: float, retrieve_ms: float, live_ms: float) -> None:
+    async def quick_seed_now(*args):
+        await asyncio.sleep(seed_ms / 1000)
+
+    async def retrieve_context(*args):
+        await asyncio.sleep(retrieve_ms / 1000)
+        return {"snippets": [{"title": "indexed", "url": "https://indexed.example", "text": "indexed snippet"}]}
+
+    async def search_and_scrape(queries, max_urls=10):
+        await asyncio.sleep(live_ms / 1000)
+        return [{"title": "live", "url": "https://live.example", "content": "live snippet"}]
+
+    generation_service.quick_seed_now = quick_seed_now
+    generation_service.retrieve_context = retrieve_context
+    generation_service.ensure_index_async = lambda *args: None
+    live_search_service.search_and_scrape = search_and_scrape
+
+
+async def sequential(req: TopicSuggestRequest) -> None:
+    """The flow before the task graph: every stage waits for the previous one."""
+    ns = generation_service.stable_namespace(req.userId, req.language, req.niche)
+    await generation_service.quick_seed_now(req.userId, req.language, req.niche, req.region, req.season, req.seedKeywords, ns)
+    await generation_service.retrieve_context(req.userId, req.language, req.niche, {}, req.niche, None, True, ns)
+    await live_search_service.search_and_scrape([req.niche], max_urls=4)
+
+
+async def timed(flow, req: TopicSuggestRequest, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await flow(req)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def run(args) -> None:
+    install_stubs(args.seed, args.retrieve, args.live)
+    req = TopicSuggestRequest(userId="bench", niche="saas", persona={"role": "founder"}, includeTrends=True)
+
+    sequential_ms = await timed(sequential, req, args.runs)
+    graph_ms = await timed(generation_service.topic_research, req, args.runs)
+    _ns, ctx, _live = await generation_service.topic_research(req)
+
+    print(f"stub latencies: seed={args.seed:.0f}ms retrieve={args.retrieve:.0f}ms live={args.live:.0f}ms")
+    print(f"{'flow':<12}{'median ms':>10}")
+    print(f"{'sequential':<12}{sequential_ms:>10.1f}")
+    print(f"{'graph':<12}{graph_ms:>10.1f}   ({1 - graph_ms / sequential_ms:.0%} shorter critical path)")
+    print("graph nodes:", ", ".join(
+        f"{name} start={timing['startMs']:.0f}ms took={timing['ms']:.0f}ms" for name, timing in ctx["timings"]["nodes"].items()
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=float, default=700.0, help="quick_seed_now latency (search + embed)")
+    parser.add_argument("--retrieve", type=float, default=400.0, help="retrieve_context latency (embed + vector search)")
+    parser.add_argument("--live", type=float, default=1800.0, help="search_and_scrape latency")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -54,6 +54,97 @@ class Settings(BaseSettings):
     GN_GL: str = Field(default="PK")
     GN_CEID: str = Field(default="PK:en")
 
+    # HTML extraction engine: auto | lxml | legacy
+    HTML_EXTRACTOR: str = Field(default="auto")
+
+    # CPU-bound stages (HTML parsing, clustering, scoring) run in a process pool; 0 runs them inline
+    CPU_POOL_WORKERS: int = Field(default=2)
+    CPU_POOL_INLINE_MAX_CHARS: int = Field(default=20000)
+
+    # Blocking SDK calls run on named thread pools ("name=size,..."); unlisted pools get 4 threads
+    BLOCKING_POOL_SIZES: str = Field(default="ddgs=4,feedparser=2,cohere=4,sbert=1,qdrant=4,pgvector=4,jobs=2")
+    BLOCKING_IO_TIMEOUT_SECONDS: float = Field(default=30.0)
+    GEMINI_TIMEOUT_SECONDS: float = Field(default=90.0)
+    EMBEDDING_TIMEOUT_SECONDS: float = Field(default=30.0)
+
+    # LLM provider circuit breaker; set PROVIDER_HEALTH_STATE_FILE to share state across workers
+    PROVIDER_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=3)
+    PROVIDER_CIRCUIT_OPEN_SECONDS: float = Field(default=30.0)
+    PROVIDER_CIRCUIT_MAX_OPEN_SECONDS: float = Field(default=300.0)
+    PROVIDER_UNSUPPORTED_MODEL_OPEN_SECONDS: float = Field(default=900.0)
+    PROVIDER_DAILY_QUOTA_COOLDOWN_SECONDS: float = Field(default=3600.0)
+    PROVIDER_HEALTH_STATE_FILE: str = Field(default="")
+
+    # LLM routing: a task leaves its preferred provider when p90 latency, error rate or quota headroom degrade
+    LLM_ROUTER_EWMA_ALPHA: float = Field(default=0.2)
+    LLM_ROUTER_MIN_SAMPLES: int = Field(default=5)
+    LLM_ROUTER_MAX_ERROR_RATE: float = Field(default=0.5)
+    LLM_ROUTER_MIN_HEADROOM: float = Field(default=0.05)
+    LLM_ROUTER_CONTENT_MAX_P90_SECONDS: float = Field(default=15.0)
+    LLM_ROUTER_TOPICS_MAX_P90_SECONDS: float = Field(default=10.0)
+
+    # Opt-in hedging for content: ask the alternative provider too if the primary is slower than the delay
+    LLM_HEDGE_ENABLED: bool = Field(default=False)
+    LLM_HEDGE_DELAY_SECONDS: float = Field(default=8.0)
+
+    # Long-form blogs (targetLength >= LONG_FORM_MIN_WORDS): one outline call, then section bodies in parallel
+    LONG_FORM_MIN_WORDS: int = Field(default=1500)
+    LONG_FORM_SECTION_WORDS: int = Field(default=350)
+    LONG_FORM_MAX_CONCURRENCY: int = Field(default=4)
+
+    # Research context for content prompts: best-scoring scraped sentences packed into this many tokens
+    CONTEXT_PACK_TOKEN_BUDGET: int = Field(default=1200)
+    # Blog summary used as the only context when deriving LinkedIn/Instagram variants
+    DERIVATIVE_SUMMARY_TOKEN_BUDGET: int = Field(default=350)
+    # Answer content research from search snippets + indexed context; scrape pages and extract keywords in the background
+    RESEARCH_PROGRESSIVE: bool = Field(default=True)
+
+    # Share one in-flight search/scrape/embedding/LLM call and index seed between identical concurrent callers
+    # (research bundles are always shared, see utils.singleflight.ALWAYS_COALESCED)
+    SINGLEFLIGHT_ENABLED: bool = Field(default=True)
+
+    # Batch endpoints: items processed at once per batch request
+    BATCH_MAX_CONCURRENCY: int = Field(default=3)
+
+    # Durable job queue for scheduled/bulk generation, run by `python -m workers.job_worker`
+    JOB_QUEUE_PATH: str = Field(default="jobs.sqlite3")
+    JOB_MAX_ATTEMPTS: int = Field(default=3)
+    JOB_RETRY_BASE_SECONDS: float = Field(default=30.0)
+    JOB_RETRY_MAX_SECONDS: float = Field(default=900.0)
+    JOB_LEASE_SECONDS: float = Field(default=300.0)
+    JOB_WORKER_CONCURRENCY: int = Field(default=2)
+    JOB_WORKER_POLL_SECONDS: float = Field(default=2.0)
+
+    # Per-request deadline (X-Request-Timeout header or default, seconds); stages degrade below their minimum remaining
+    REQUEST_DEADLINE_SECONDS: float = Field(default=90.0)
+    IMAGE_REQUEST_DEADLINE_SECONDS: float = Field(default=150.0)
+    REQUEST_DEADLINE_MAX_SECONDS: float = Field(default=300.0)
+    DEADLINE_SCRAPE_MIN_SECONDS: float = Field(default=50.0)
+    DEADLINE_KEYWORDS_MIN_SECONDS: float = Field(default=40.0)
+    DEADLINE_GEMINI_MIN_SECONDS: float = Field(default=30.0)
+    DEADLINE_REPAIR_MIN_SECONDS: float = Field(default=20.0)
+    DEADLINE_IMAGE_MIN_SECONDS: float = Field(default=20.0)
+    DEADLINE_LLM_MIN_TIMEOUT_SECONDS: float = Field(default=10.0)
+
+    # Idempotency-Key on /content/generate(-multi) and /image/generate: in-process store of compressed responses
+    IDEMPOTENCY_ENABLED: bool = Field(default=True)
+    IDEMPOTENCY_RETENTION_SECONDS: float = Field(default=86400.0)
+    IDEMPOTENCY_MAX_ENTRIES: int = Field(default=1000)
+    IDEMPOTENCY_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+
+    # Generation result cache: exact prompt hash plus opt-in embedding near-match; TTLs per platform/topics in seconds
+    GENERATION_CACHE_ENABLED: bool = Field(default=True)
+    GENERATION_CACHE_TTLS: str = Field(default="blog=86400,linkedin=21600,instagram=21600,topics=3600")
+    GENERATION_CACHE_MAX_ENTRIES: int = Field(default=500)
+    GENERATION_CACHE_SEMANTIC: bool = Field(default=False)
+    GENERATION_CACHE_SEMANTIC_THRESHOLD: float = Field(default=0.95)
+
+    # Output token budgets sized from targetLength with learned tokens-per-word; False restores fixed per-platform caps
+    TOKEN_BUDGET_ADAPTIVE: bool = Field(default=True)
+    TOKEN_BUDGET_HEADROOM: float = Field(default=0.3)
+    TOKEN_BUDGET_EWMA_ALPHA: float = Field(default=0.2)
+    TOKEN_BUDGET_MAX_OUTPUT_TOKENS: int = Field(default=8192)
+
     LOG_LEVEL: str = Field(default="info")
 
     class Config:
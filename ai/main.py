@@ -1,9 +1,23 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import logging
 import os
-from routers import topics, content, image
+from routers import topics, content, image, jobs
 from config import settings
+from services.blocking_io import get_blocking_pool_stats, shutdown_blocking_pools
+from services.cpu_executor import get_cpu_pool_stats, shutdown_cpu_pool, warm_cpu_pool
+from services.gemini_service import get_json_repair_stats
+from services.generation_cache import get_generation_cache_stats
+from services.generation_service import GenerationFailed
+from services.idempotency import IdempotencyConflict, get_idempotency_stats
+from services.job_queue import get_job_queue_stats
+from services.llm_hedging import get_hedge_stats
+from services.llm_router import get_router_stats
+from services.provider_health import get_provider_health_stats
+from services.token_budget import get_token_budget_stats
+from utils.disconnect import ClientDisconnected, get_disconnect_stats
+from utils.singleflight import get_singleflight_stats
 
 
 def configure_logging():
@@ -29,11 +43,45 @@ app.add_middleware(
     allow_methods=["*"], allow_headers=["*"],
 )
 
+@app.exception_handler(IdempotencyConflict)
+async def idempotency_conflict(request: Request, exc: IdempotencyConflict):
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.exception_handler(GenerationFailed)
+async def generation_failed(request: Request, exc: GenerationFailed):
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected(request: Request, exc: ClientDisconnected):
+    # Nobody is listening any more; 499 (client closed request) is for the access log
+    return Response(status_code=499)
+
+
 @app.get("/health")
 def health():
     return {"ok": True}
 
 
+@app.get("/metrics")
+def metrics():
+    return {
+        "cpuPool": get_cpu_pool_stats(),
+        "blockingPools": get_blocking_pool_stats(),
+        "providerHealth": get_provider_health_stats(),
+        "llmRouter": get_router_stats(),
+        "llmHedging": get_hedge_stats(),
+        "jsonRepair": get_json_repair_stats(),
+        "tokenBudget": get_token_budget_stats(),
+        "generationCache": get_generation_cache_stats(),
+        "singleflight": get_singleflight_stats(),
+        "jobQueue": get_job_queue_stats(),
+        "idempotency": get_idempotency_stats(),
+        "disconnects": get_disconnect_stats(),
+    }
+
+
 @app.on_event("startup")
 async def log_startup_configuration():
     logger.info(
@@ -42,7 +90,15 @@ async def log_startup_configuration():
         settings.GEMINI_MODEL,
         settings.IMAGE_PROVIDER_ORDER,
     )
+    warm_cpu_pool()
+
+
+@app.on_event("shutdown")
+async def stop_worker_pools():
+    shutdown_cpu_pool()
+    shutdown_blocking_pools()
 
 app.include_router(topics.router, prefix="/topic", tags=["topic"])
 app.include_router(content.router, prefix="/content", tags=["content"])
 app.include_router(image.router, prefix="/image", tags=["image"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 TOPIC_SUGGESTION_COUNT = 6
+MAX_BATCH_ITEMS = 25
+MAX_JOB_ITEMS = 200
 
 class Persona(BaseModel):
     role: str = Field(min_length=2)
@@ -20,6 +22,10 @@ class TopicSuggestRequest(BaseModel):
     count: int = Field(default=TOPIC_SUGGESTION_COUNT, ge=1, le=TOPIC_SUGGESTION_COUNT)
     includeTrends: bool = True
     namespace: Optional[str] = None
+    bypassCache: bool = False
+
+class TopicSuggestBatchRequest(BaseModel):
+    items: List[TopicSuggestRequest] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
 
 class ContentGenerateRequest(BaseModel):
     userId: str
@@ -37,6 +43,38 @@ class ContentGenerateRequest(BaseModel):
     season: Optional[str] = None
     persona: Optional[Persona] = None
     namespace: Optional[str] = None
+    bypassCache: bool = False
+
+class ContentGenerateBatchRequest(BaseModel):
+    items: List[ContentGenerateRequest] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+class ContentMultiGenerateRequest(BaseModel):
+    userId: str
+    platforms: List[Literal["blog", "linkedin", "instagram"]] = Field(min_length=1, max_length=3)
+    language: str = "en"
+    topicOrIdea: str = Field(min_length=4, max_length=4000)
+    tone: str = "friendly"
+    targetLength: int = 1200  # blog; linkedin/instagram default to content_pipeline.PLATFORM_TARGET_WORDS
+    targetLengths: Dict[Literal["blog", "linkedin", "instagram"], int] = {}  # per-platform override
+    focusKeyword: str = Field(min_length=2)
+    includeTrend: bool = True
+    styleGuideBullets: List[str] = []
+    niche: Optional[str] = None
+    seedKeywords: List[str] = []
+    region: Optional[str] = None
+    season: Optional[str] = None
+    persona: Optional[Persona] = None
+    namespace: Optional[str] = None
+    bypassCache: bool = False
+
+class ContentDeriveRequest(BaseModel):
+    userId: str
+    blog: Dict[str, Any]  # the `structured` blog payload returned by /content/generate
+    platforms: List[Literal["linkedin", "instagram"]] = Field(min_length=1, max_length=2)
+    language: str = "en"
+    tone: str = "friendly"
+    focusKeyword: Optional[str] = None
+    styleGuideBullets: List[str] = []
 
 class ImageGenerateRequest(BaseModel):
     prompt: str = Field(min_length=3, max_length=1000)
@@ -45,3 +83,11 @@ class ImageGenerateRequest(BaseModel):
     sizes: List[str] = []
     count: int = Field(default=1, ge=1, le=6)
     language: str = "en"
+
+class JobSubmitRequest(BaseModel):
+    kind: Literal["topics", "content"]
+    items: List[Dict[str, Any]] = Field(min_length=1, max_length=MAX_JOB_ITEMS)  # TopicSuggestRequest / ContentGenerateRequest bodies
+    priority: Literal["interactive", "scheduled"] = "scheduled"
+    maxAttempts: Optional[int] = Field(default=None, ge=1, le=10)
+
+JOB_ITEM_MODELS = {"topics": TopicSuggestRequest, "content": ContentGenerateRequest}
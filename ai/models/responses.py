@@ -20,6 +20,11 @@ class ContentGenerateResponse(BaseModel):
     diagnostics: Dict[str, Any]
     metrics: Optional[ContentMetrics] = None
 
+class ContentMultiGenerateResponse(BaseModel):
+    results: Dict[str, ContentGenerateResponse]  # keyed by platform
+    errors: Dict[str, str] = {}  # platforms that failed, with the reason
+    diagnostics: Dict[str, Any]
+
 class GeneratedImage(BaseModel):
     url: str
     base64: Optional[str] = None
@@ -34,3 +39,23 @@ class GeneratedImage(BaseModel):
 class ImageGenerateResponse(BaseModel):
     altText: str
     images: List[GeneratedImage]
+    diagnostics: Optional[Dict[str, Any]] = None
+
+class JobStatusResponse(BaseModel):
+    id: str
+    kind: str
+    priority: str
+    status: str  # queued | running | succeeded | failed | cancelled
+    attempts: int
+    maxAttempts: int
+    progress: Dict[str, int]  # total / done / failed items
+    error: Optional[str] = None
+    runAfter: Optional[float] = None
+    createdAt: float
+    updatedAt: float
+    finishedAt: Optional[float] = None
+
+class JobResultResponse(BaseModel):
+    id: str
+    status: str
+    items: List[Dict[str, Any]]  # {index, status, result | error}, in item order
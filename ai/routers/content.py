@@ -1,21 +1,64 @@
 # ai/routers/content.py - COMPLETE FILE (REPLACE ENTIRE FILE)
 
+import json
 import logging
+import time
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
-from models.requests import ContentGenerateRequest
-from models.responses import ContentGenerateResponse
-from services.content_research_service import get_content_research_bundle
-from services.llm_service import generate_content_json
+from config import settings
+from models.requests import (
+    ContentDeriveRequest,
+    ContentGenerateBatchRequest,
+    ContentGenerateRequest,
+    ContentMultiGenerateRequest,
+)
+from models.responses import ContentGenerateResponse, ContentMultiGenerateResponse
+from services import batch_service, generation_service, idempotency
+from services.content_pipeline import generate_for_platforms
+from services.derivative_service import derive_from_blog
+from services.llm_service import stream_content_events
+from utils import deadline, disconnect
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _multi_response(results, errors, diagnostics) -> ContentMultiGenerateResponse:
+    return ContentMultiGenerateResponse(
+        results={
+            platform: ContentGenerateResponse(
+                contentForEditor=result["content"],
+                diagnostics=result["diagnostics"],
+                metrics=result["metrics"],
+            )
+            for platform, result in results.items()
+        },
+        errors=errors,
+        diagnostics=diagnostics,
+    )
+
+
+def _mark_replay(response: Response, replayed: Optional[str]) -> None:
+    if replayed:
+        response.headers[idempotency.REPLAY_HEADER] = replayed
+
+
+def _sse(event: str, payload) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
 @router.post("/generate", response_model=ContentGenerateResponse)
-async def generate_content(req: ContentGenerateRequest):
+async def generate_content(
+    req: ContentGenerateRequest,
+    request: Request,
+    response: Response,
+    idempotency_key: Annotated[Optional[str], Header(alias="Idempotency-Key")] = None,
+    request_timeout: Annotated[Optional[str], Header(alias=deadline.HEADER)] = None,
+):
     """
     Generate content using live search + RAG + Gemini LLM.
     
@@ -24,76 +67,252 @@ async def generate_content(req: ContentGenerateRequest):
     2. Scrape top articles
     3. Extract context via RAG
     4. Feed to Gemini for high-quality generation
+
+    A retry with the same Idempotency-Key attaches to the running request or
+    gets its stored response (Idempotent-Replayed: in-flight | stored).
+    X-Request-Timeout (seconds) sets the time budget; stages that would not
+    fit degrade and are listed in diagnostics.deadline. If the client
+    disconnects first, the work is cancelled (499).
+    """
+    deadline.start(deadline.budget_from_header(request_timeout))
+    result, replayed = await disconnect.run_until_disconnected(
+        request,
+        "content.generate",
+        idempotency.run_idempotent(
+            "content.generate", idempotency_key, req, lambda: generation_service.generate_content(req), ContentGenerateResponse
+        ),
+    )
+    _mark_replay(response, replayed)
+    return result
+
+
+@router.post("/generate-batch")
+async def generate_content_batch(batch: ContentGenerateBatchRequest):
+    """
+    /generate for many items, streamed back as NDJSON in completion order.
+
+    Each line is {"index", "status", "result" | "error", "ms"} where result is
+    a /generate response; the last line is a {"done": true, ...} summary.
+    Items with the same research inputs share one research bundle, at most
+    BATCH_MAX_CONCURRENCY items run at once and a failing item does not fail
+    the batch.
+    """
+    memo = {}
+
+    async def worker(req: ContentGenerateRequest):
+        key = batch_service.research_key(
+            req.userId, req.language, req.topicOrIdea, req.focusKeyword, req.includeTrend, req.niche,
+            req.seedKeywords, req.region, req.season, req.persona.model_dump() if req.persona else None, req.namespace,
+        )
+        research_bundle = await batch_service.shared(memo, key, lambda: generation_service.content_research(req))
+        return (await generation_service.generate_content(req, research_bundle)).model_dump()
+
+    return StreamingResponse(
+        batch_service.ndjson_lines(batch.items, worker, settings.BATCH_MAX_CONCURRENCY, memo, "content_batch"),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post("/generate-multi", response_model=ContentMultiGenerateResponse)
+async def generate_content_multi(
+    req: ContentMultiGenerateRequest,
+    request: Request,
+    response: Response,
+    idempotency_key: Annotated[Optional[str], Header(alias="Idempotency-Key")] = None,
+    request_timeout: Annotated[Optional[str], Header(alias=deadline.HEADER)] = None,
+):
+    """
+    Generate the same topic for several platforms at once.
+
+    Research runs once and its retrieved context is shared; the platforms are
+    then generated concurrently, each with its own target length (from
+    targetLengths, else targetLength for the blog and a short-form default
+    for linkedin/instagram). A platform that fails is listed in
+    `errors` while the others are still returned; 500 only if all fail.
+    Idempotency-Key, X-Request-Timeout and client disconnects are handled
+    as on /generate.
     """
+    deadline.start(deadline.budget_from_header(request_timeout))
+    result, replayed = await disconnect.run_until_disconnected(
+        request,
+        "content.generate-multi",
+        idempotency.run_idempotent(
+            "content.generate-multi", idempotency_key, req, lambda: _generate_multi(req), ContentMultiGenerateResponse
+        ),
+    )
+    _mark_replay(response, replayed)
+    return result
+
+
+async def _generate_multi(req: ContentMultiGenerateRequest) -> ContentMultiGenerateResponse:
     logger.info(
-        "content_request user=%s platform=%s topic=%s keyword=%s trend=%s",
+        "content_multi_request user=%s platforms=%s topic=%s keyword=%s",
         req.userId,
-        req.platform,
+        ",".join(req.platforms),
         req.topicOrIdea,
         req.focusKeyword,
-        req.includeTrend,
     )
-    
-    niche = req.niche or req.focusKeyword or req.topicOrIdea
-    persona = req.persona.model_dump() if req.persona else {"role": "content reader", "pains": []}
-    seed_keywords = list(req.seedKeywords or ([req.focusKeyword] if req.focusKeyword else []))
 
-    research_bundle = await get_content_research_bundle(
-        user_id=req.userId,
+    started = time.perf_counter()
+    research_bundle = await generation_service.content_research(req)
+    research_ms = (time.perf_counter() - started) * 1000
+
+    results, errors, timings = await generate_for_platforms(
+        req.platforms,
         language=req.language,
         topic_or_idea=req.topicOrIdea,
+        tone=req.tone,
+        target_length=req.targetLength,
+        target_lengths=req.targetLengths,
         focus_keyword=req.focusKeyword,
-        include_trend=req.includeTrend,
-        niche=niche,
-        seed_keywords=seed_keywords,
-        region=req.region,
-        season=req.season,
-        persona=persona,
-        namespace=req.namespace,
+        style_guide=req.styleGuideBullets,
+        retrieved_context=research_bundle["retrievedContext"],
+        bypass_cache=req.bypassCache,
+        namespace=research_bundle["indexedNamespace"],
     )
-    retrieved_context = research_bundle["retrievedContext"]
-    indexed_policy = research_bundle["indexedPolicy"]
-    namespace = research_bundle["indexedNamespace"]
+    if not results:
+        raise HTTPException(status_code=500, detail="; ".join(f"{platform}: {error}" for platform, error in errors.items()))
+
+    research_diagnostics = generation_service.research_diagnostics(research_bundle)
+    for result in results.values():
+        result["diagnostics"].update(research_diagnostics)
+
+    diagnostics = {
+        **research_diagnostics,
+        "researchMs": round(research_ms, 1),
+        "totalMs": round((time.perf_counter() - started) * 1000, 1),
+        "platforms": timings,
+    }
+    deadline_report = deadline.report()
+    if deadline_report:
+        diagnostics["deadline"] = deadline_report
+    return _multi_response(results, errors, diagnostics)
+
+
+@router.post("/derive", response_model=ContentMultiGenerateResponse)
+async def derive_content(
+    req: ContentDeriveRequest,
+    request: Request,
+    request_timeout: Annotated[Optional[str], Header(alias=deadline.HEADER)] = None,
+):
+    """
+    LinkedIn/Instagram variants of an existing blog, without research.
 
+    The blog's structured payload is summarized locally and that summary is
+    the only context sent to the LLM. Response shape matches
+    /generate-multi; diagnostics.summary reports the source vs summary
+    token counts. X-Request-Timeout and client disconnects are handled as on
+    /generate.
+    """
+    deadline.start(deadline.budget_from_header(request_timeout))
+    return await disconnect.run_until_disconnected(request, "content.derive", _derive(req))
+
+
+async def _derive(req: ContentDeriveRequest) -> ContentMultiGenerateResponse:
     logger.info(
-        "content_rag_policy use_indexed=%s reason=%s overlap=%s namespace=%s",
-        research_bundle["useIndexedContext"],
-        indexed_policy.get("reason"),
-        ",".join(indexed_policy.get("overlapTerms", [])) or "none",
-        namespace,
+        "content_derive_request user=%s platforms=%s title=%s",
+        req.userId,
+        ",".join(req.platforms),
+        req.blog.get("h1") or req.blog.get("title"),
     )
-    
-    # STEP 5: Generate with Gemini
+
+    started = time.perf_counter()
     try:
-        content, diagnostics, metrics = await generate_content_json(
-            platform=req.platform,
+        results, errors, timings, summary_stats = await derive_from_blog(
+            req.blog,
+            req.platforms,
             language=req.language,
-            topic_or_idea=req.topicOrIdea,
             tone=req.tone,
-            target_length=req.targetLength,
             focus_keyword=req.focusKeyword,
             style_guide=req.styleGuideBullets,
-            retrieved_context=retrieved_context,
         )
-    except Exception as e:
-        logger.error(f"Content generation failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-    diagnostics.update({
-        "ragMode": research_bundle["ragMode"],
-        "indexedPolicy": indexed_policy,
-        "indexedNamespace": namespace,
-    })
-    
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not results:
+        raise HTTPException(status_code=500, detail="; ".join(f"{platform}: {error}" for platform, error in errors.items()))
+
+    diagnostics = {
+        "summary": summary_stats,
+        "totalMs": round((time.perf_counter() - started) * 1000, 1),
+        "platforms": timings,
+    }
+    deadline_report = deadline.report()
+    if deadline_report:
+        diagnostics["deadline"] = deadline_report
+    return _multi_response(results, errors, diagnostics)
+
+
+@router.post("/generate/stream")
+async def generate_content_stream(
+    req: ContentGenerateRequest,
+    request_timeout: Annotated[Optional[str], Header(alias=deadline.HEADER)] = None,
+):
+    """
+    Server-Sent Events variant of /generate.
+
+    Events, in order: "status" (immediately), "research" (sources ready),
+    "delta" (raw LLM output as it streams), "section" (rendered HTML per
+    section), "final" (the same body /generate returns). Failures after the
+    stream has started arrive as an "error" event. X-Request-Timeout sets
+    the time budget as on /generate; the report is in the final event's
+    diagnostics.deadline.
+    """
+    budget = deadline.budget_from_header(request_timeout)
     logger.info(
-        "content_complete platform=%s length=%s model=%s",
+        "content_stream_request user=%s platform=%s topic=%s keyword=%s",
+        req.userId,
         req.platform,
-        len(content.get("plainText", "")),
-        diagnostics.get("model"),
+        req.topicOrIdea,
+        req.focusKeyword,
     )
-    
-    return ContentGenerateResponse(
-        contentForEditor=content,
-        diagnostics=diagnostics,
-        metrics=metrics,
+
+    async def events():
+        # Started here: the body is iterated after the endpoint has returned
+        deadline.start(budget)
+        yield _sse("status", {"stage": "research"})
+        try:
+            research_bundle = await generation_service.content_research(req)
+            retrieved_context = research_bundle["retrievedContext"]
+            yield _sse("research", {
+                **generation_service.research_diagnostics(research_bundle),
+                "liveSources": retrieved_context.get("liveSources", 0),
+                "indexedSources": retrieved_context.get("indexedSources", 0),
+                "sources": [
+                    {"title": snippet.get("title", ""), "url": snippet.get("url", "")}
+                    for snippet in retrieved_context.get("snippets", [])
+                    if isinstance(snippet, dict)
+                ],
+            })
+            yield _sse("status", {"stage": "generation"})
+
+            async for event, payload in stream_content_events(
+                platform=req.platform,
+                language=req.language,
+                topic_or_idea=req.topicOrIdea,
+                tone=req.tone,
+                target_length=req.targetLength,
+                focus_keyword=req.focusKeyword,
+                style_guide=req.styleGuideBullets,
+                retrieved_context=retrieved_context,
+            ):
+                if event == "final":
+                    payload["diagnostics"].update(generation_service.research_diagnostics(research_bundle))
+                    deadline_report = deadline.report()
+                    if deadline_report:
+                        payload["diagnostics"]["deadline"] = deadline_report
+                    response = ContentGenerateResponse(
+                        contentForEditor=payload["content"],
+                        diagnostics=payload["diagnostics"],
+                        metrics=payload["metrics"],
+                    )
+                    payload = response.model_dump()
+                yield _sse(event, payload)
+        except Exception as e:
+            logger.error(f"Content stream failed: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -1,13 +1,54 @@
-from fastapi import APIRouter
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Header, Request, Response
+from config import settings
 from models.requests import ImageGenerateRequest
 from models.responses import ImageGenerateResponse
+from services import idempotency
 from services.image_generation_service import generate_images
+from utils import deadline, disconnect
 
 router = APIRouter()
 
 
 @router.post("/generate", response_model=ImageGenerateResponse)
-async def generate_image(req: ImageGenerateRequest):
+async def generate_image(
+    req: ImageGenerateRequest,
+    request: Request,
+    response: Response,
+    idempotency_key: Annotated[Optional[str], Header(alias="Idempotency-Key")] = None,
+    request_timeout: Annotated[Optional[str], Header(alias=deadline.HEADER)] = None,
+):
+    """
+    A retry with the same Idempotency-Key reuses the running or stored result.
+    X-Request-Timeout (default IMAGE_REQUEST_DEADLINE_SECONDS) bounds provider
+    polling; degradations are listed in diagnostics.deadline. A client
+    disconnect cancels the work (499).
+    """
+    deadline.start(deadline.budget_from_header(request_timeout, settings.IMAGE_REQUEST_DEADLINE_SECONDS))
+    result, replayed = await disconnect.run_until_disconnected(
+        request,
+        "image.generate",
+        idempotency.run_idempotent(
+            "image.generate",
+            idempotency_key,
+            req,
+            lambda: _generate_image(req),
+            ImageGenerateResponse,
+            storable=_has_generated_image,
+        ),
+    )
+    if replayed:
+        response.headers[idempotency.REPLAY_HEADER] = replayed
+    return result
+
+
+def _has_generated_image(payload) -> bool:
+    """Placeholder-only results are not kept, so a retry tries the providers again."""
+    return any(image.get("provider") != "placeholder" for image in payload.get("images") or [])
+
+
+async def _generate_image(req: ImageGenerateRequest) -> ImageGenerateResponse:
     requested_sizes = list(req.sizes or [])
     image_count = max(req.count, len(requested_sizes), 1)
     prompts = [req.prompt] * image_count
@@ -19,4 +60,9 @@ async def generate_image(req: ImageGenerateRequest):
         sizes=requested_sizes,
         style=req.style,
     )
-    return ImageGenerateResponse(altText=req.prompt, images=images)
+    deadline_report = deadline.report()
+    return ImageGenerateResponse(
+        altText=req.prompt,
+        images=images,
+        diagnostics={"deadline": deadline_report} if deadline_report else None,
+    )
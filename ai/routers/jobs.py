@@ -0,0 +1,82 @@
+import logging
+
+from fastapi import APIRouter, HTTPException
+from pydantic import ValidationError
+
+from models.requests import JOB_ITEM_MODELS, JobSubmitRequest
+from models.responses import JobResultResponse, JobStatusResponse
+from services import job_queue
+from services.blocking_io import run_blocking
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _status(job) -> JobStatusResponse:
+    total = len((job["payload"] or {}).get("items") or [])
+    return JobStatusResponse(
+        id=job["id"],
+        kind=job["kind"],
+        priority=job["priority"],
+        status=job["status"],
+        attempts=job["attempts"],
+        maxAttempts=job["maxAttempts"],
+        progress=job_queue.progress_counts(job["progress"], total),
+        error=job["error"],
+        runAfter=job["runAfter"] if job["status"] == "queued" else None,
+        createdAt=job["createdAt"],
+        updatedAt=job["updatedAt"],
+        finishedAt=job["finishedAt"],
+    )
+
+
+async def _job_or_404(job_id: str):
+    job = await run_blocking("jobs", job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("", response_model=JobStatusResponse, status_code=202)
+async def submit_job(req: JobSubmitRequest):
+    """
+    Queue topic or content generation for a worker process
+    (`python -m workers.job_worker`) instead of running it in this request.
+    Every item is validated as a /topic/suggest or /content/generate body.
+    """
+    model = JOB_ITEM_MODELS[req.kind]
+    items = []
+    for index, item in enumerate(req.items):
+        try:
+            items.append(model.model_validate(item).model_dump())
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail={"item": index, "errors": e.errors(include_url=False)})
+
+    job = await run_blocking("jobs", job_queue.submit, req.kind, {"items": items}, req.priority, req.maxAttempts)
+    return _status(job)
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    return _status(await _job_or_404(job_id))
+
+
+@router.get("/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(job_id: str):
+    """Per-item results of a finished job (409 while it is still queued or running)."""
+    job = await _job_or_404(job_id)
+    if job["status"] not in job_queue.FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    total = len((job["payload"] or {}).get("items") or [])
+    items = (job["result"] or {}).get("items") or job_queue.progress_items(job["progress"], total)
+    return JobResultResponse(id=job["id"], status=job["status"], items=items)
+
+
+@router.delete("/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued job; a running job finishes its current attempt (409)."""
+    await _job_or_404(job_id)
+    if not await run_blocking("jobs", job_queue.cancel, job_id):
+        raise HTTPException(status_code=409, detail="Only queued jobs can be cancelled")
+    return _status(await _job_or_404(job_id))
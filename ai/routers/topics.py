@@ -1,71 +1,49 @@
-from fastapi import APIRouter, HTTPException
-from models.requests import TopicSuggestRequest
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from config import settings
+from models.requests import TopicSuggestBatchRequest, TopicSuggestRequest
 from models.responses import TopicSuggestResponse
-from services.llm_service import generate_topics_json
-from services.rag_service import retrieve_context, ensure_index_async, quick_seed_now, stable_namespace
-from services.rag_strategy import build_topic_live_queries, docs_to_snippets, merge_snippet_sources
+from services import batch_service, generation_service
+from utils import deadline, disconnect
 
 router = APIRouter()
 
-@router.post("/suggest", response_model=TopicSuggestResponse)
-async def suggest_topics(req: TopicSuggestRequest):
-    ns = req.namespace or stable_namespace(req.userId, req.language, req.niche)
-
-    # Fast seed so usedRAG becomes true on first call
-    await quick_seed_now(req.userId, req.language, req.niche, req.region, req.season, req.seedKeywords, ns)
-    # Full RAG build in background (Google News + optional Serper + baseline RSS)
-    ensure_index_async(req.userId, req.language, req.niche, req.region, req.season, req.seedKeywords, ns)
-
-    ctx = await retrieve_context(
-        req.userId, req.language, req.niche, req.persona.model_dump(),
-        req.niche, None, req.includeTrends, ns
-    )
-
-    live_topic_snippets = []
-    if req.includeTrends:
-        try:
-            from services.live_search_service import search_and_scrape
 
-            live_queries = build_topic_live_queries(
-                req.niche,
-                req.seedKeywords,
-                req.region or "",
-                req.season or "",
-                req.includeTrends,
-            )
-            live_docs = await search_and_scrape(live_queries, max_urls=4)
-            live_topic_snippets = docs_to_snippets(live_docs[:4], text_limit=700)
-        except Exception:
-            live_topic_snippets = []
+@router.post("/suggest", response_model=TopicSuggestResponse)
+async def suggest_topics(
+    req: TopicSuggestRequest,
+    request: Request,
+    request_timeout: Annotated[Optional[str], Header(alias=deadline.HEADER)] = None,
+):
+    """Work is cancelled (499) if the client disconnects before the response is ready."""
+    deadline.start(deadline.budget_from_header(request_timeout))
+    return await disconnect.run_until_disconnected(request, "topic.suggest", generation_service.suggest_topics(req))
+
+
+@router.post("/suggest-batch")
+async def suggest_topics_batch(batch: TopicSuggestBatchRequest):
+    """
+    /suggest for many items, streamed back as NDJSON in completion order.
+
+    Each line is {"index", "status", "result" | "error", "ms"} where result is
+    a /suggest response; the last line is a {"done": true, ...} summary.
+    Items with the same research inputs share one research run, at most
+    BATCH_MAX_CONCURRENCY items run at once and a failing item does not fail
+    the batch.
+    """
+    memo = {}
+
+    async def worker(req: TopicSuggestRequest):
+        key = batch_service.research_key(
+            req.userId, req.language, req.niche, req.persona.model_dump(), req.seedKeywords,
+            req.region, req.season, req.includeTrends, req.namespace,
+        )
+        research = await batch_service.shared(memo, key, lambda: generation_service.topic_research(req))
+        return (await generation_service.suggest_topics(req, research)).model_dump()
 
-    merged_topic_snippets = merge_snippet_sources(
-        live_topic_snippets,
-        ctx.get("snippets", []),
-        limit=12,
-        text_limit=700,
+    return StreamingResponse(
+        batch_service.ndjson_lines(batch.items, worker, settings.BATCH_MAX_CONCURRENCY, memo, "topic_batch"),
+        media_type="application/x-ndjson",
     )
-    ctx = {
-        **ctx,
-        "snippets": merged_topic_snippets,
-        "liveSources": len(live_topic_snippets),
-        "indexedSources": len(ctx.get("snippets", [])),
-        "usedRAG": bool(merged_topic_snippets),
-    }
-
-    try:
-        clusters, ideas, diagnostics = await generate_topics_json(
-            language=req.language, niche=req.niche, persona=req.persona.model_dump(),
-            seed_keywords=req.seedKeywords, region=req.region or "", season=req.season or "",
-            count=req.count,
-            retrieved_context=ctx,
-            include_trends=req.includeTrends,
-            content_goals=req.contentGoals or "",
-            preferred_content_types=req.preferredContentTypes or []
-        )
-        diagnostics["namespace"] = ns
-        diagnostics["liveSources"] = len(live_topic_snippets)
-        diagnostics["indexedSources"] = ctx.get("indexedSources", 0)
-        diagnostics["ragMode"] = "indexed+live" if live_topic_snippets else "indexed"
-        return TopicSuggestResponse(clusters=clusters, ideas=ideas, diagnostics=diagnostics)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,129 @@
+"""
+Batch execution for the topic and content batch endpoints.
+
+The scheduler and bulk tools used to call /topic/suggest and
+/content/generate once per item. A batch request now carries N items:
+
+- at most BATCH_MAX_CONCURRENCY items run at once, so a large batch does not
+  flood the LLM providers (routing, circuit breaking and single-flight
+  still apply per call)
+- research shared by several items (same namespace, niche, keywords, ...)
+  runs once per batch through `shared()`
+- results are yielded in completion order, one dict per item; a failing
+  item yields an error entry and the rest of the batch carries on
+- stopping the iteration (client gone) cancels the items still pending
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+def research_key(*parts: Any) -> str:
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+async def shared(memo: Dict[Hashable, asyncio.Task], key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run `factory()` once per key for the lifetime of `memo` (one batch).
+    Every caller gets its own deep copy; a cancelled caller does not cancel
+    the shared work.
+    """
+    task = memo.get(key)
+    if task is None:
+        task = memo[key] = asyncio.create_task(factory())
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+def cancel_shared(memo: Dict[Hashable, asyncio.Task]) -> None:
+    for task in memo.values():
+        if not task.done():
+            task.cancel()
+
+
+def _error_message(exc: Exception) -> str:
+    detail = getattr(exc, "detail", None)  # HTTPException
+    return str(detail or exc) or type(exc).__name__
+
+
+async def run_batch(
+    items: List[Any],
+    worker: Callable[[Any], Awaitable[Any]],
+    concurrency: int,
+    label: str = "batch",
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yields {"index", "status": "ok"|"error", "result"|"error", "ms"} per item
+    as items finish.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run(index: int, item: Any) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await worker(item)
+            except Exception as exc:
+                logger.warning("%s_item_failed index=%s error=%s", label, index, exc)
+                return {
+                    "index": index,
+                    "status": "error",
+                    "error": _error_message(exc),
+                    "ms": round((time.perf_counter() - started) * 1000, 1),
+                }
+            return {
+                "index": index,
+                "status": "ok",
+                "result": result,
+                "ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+
+    tasks = [asyncio.create_task(_run(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.info("%s_cancelled pending=%s", label, len(pending))
+
+
+async def ndjson_lines(
+    items: List[Any],
+    worker: Callable[[Any], Awaitable[Any]],
+    concurrency: int,
+    memo: Dict[Hashable, asyncio.Task],
+    label: str = "batch",
+) -> AsyncIterator[str]:
+    """
+    NDJSON body for a batch endpoint: one line per item in completion order,
+    then a summary line {"done": true, ...}.
+    """
+    started = time.perf_counter()
+    counts = {"ok": 0, "error": 0}
+    outcomes = run_batch(items, worker, concurrency, label)
+    try:
+        async for outcome in outcomes:
+            counts[outcome["status"]] += 1
+            yield json.dumps(outcome, default=str) + "\n"
+    finally:
+        await outcomes.aclose()
+        cancel_shared(memo)
+
+    summary = {
+        "done": True,
+        "items": len(items),
+        "ok": counts["ok"],
+        "failed": counts["error"],
+        "researchRuns": len(memo),
+        "totalMs": round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info("%s_complete items=%s ok=%s failed=%s research_runs=%s", label, len(items), counts["ok"], counts["error"], len(memo))
+    yield json.dumps(summary) + "\n"
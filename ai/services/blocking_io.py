@@ -0,0 +1,166 @@
+"""
+Named, size-limited thread pools for blocking third-party SDK calls.
+
+Each library (DDGS, feedparser, Cohere, Qdrant, ...) gets its
+own pool so one slow provider can only exhaust its own threads instead of
+the shared default executor or the event loop.
+
+`run_blocking` applies a timeout and is cancellable from the caller's side:
+a queued call is dropped, while a call that already started keeps its
+thread until the SDK returns, and its result is discarded.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+_POOLS: Dict[str, "_BlockingPool"] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def parse_pool_sizes(raw: str) -> Dict[str, int]:
+    sizes: Dict[str, int] = {}
+    for item in str(raw or "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip().lower()
+        if not name:
+            continue
+        try:
+            sizes[name] = max(1, int(value))
+        except ValueError:
+            logger.warning("blocking_io: ignoring invalid pool size entry %r", item)
+    return sizes
+
+
+class _BlockingPool:
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"blocking-{name}")
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.peak_active = 0
+        self.peak_queued = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.wait_ms_total = 0.0
+        self.run_ms_total = 0.0
+
+    def _run(self, submitted_at: float, func: Callable, args: tuple, kwargs: dict):
+        started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            self.wait_ms_total += (started_at - submitted_at) * 1000
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.run_ms_total += (time.perf_counter() - started_at) * 1000
+
+    def submit(self, func: Callable, args: tuple, kwargs: dict):
+        with self._lock:
+            self.submitted += 1
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        return self.executor.submit(self._run, time.perf_counter(), func, args, kwargs)
+
+    def _dropped_before_start(self) -> None:
+        with self._lock:
+            self.queued -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = max(self.completed + self.failed, 1)
+            return {
+                "maxWorkers": self.max_workers,
+                "active": self.active,
+                "queued": self.queued,
+                "saturation": round(self.active / self.max_workers, 2),
+                "peakActive": self.peak_active,
+                "peakQueued": self.peak_queued,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "cancelled": self.cancelled,
+                "waitMsAvg": round(self.wait_ms_total / max(self.submitted - self.queued, 1), 2),
+                "runMsAvg": round(self.run_ms_total / finished, 2),
+            }
+
+
+def get_blocking_pool(name: str) -> _BlockingPool:
+    pool = _POOLS.get(name)
+    if pool is not None:
+        return pool
+    with _POOLS_LOCK:
+        pool = _POOLS.get(name)
+        if pool is None:
+            size = parse_pool_sizes(settings.BLOCKING_POOL_SIZES).get(name, DEFAULT_POOL_SIZE)
+            pool = _BlockingPool(name, size)
+            _POOLS[name] = pool
+            logger.info("blocking_pool_started name=%s workers=%s", name, size)
+    return pool
+
+
+async def run_blocking(
+    pool_name: str,
+    func: Callable,
+    *args: Any,
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+):
+    """
+    Run a blocking `func(*args, **kwargs)` on the named pool.
+
+    Raises:
+        asyncio.TimeoutError: the call did not finish within `timeout` seconds
+    """
+    pool = get_blocking_pool(pool_name)
+    effective_timeout = settings.BLOCKING_IO_TIMEOUT_SECONDS if timeout is None else timeout
+    future = pool.submit(func, args, kwargs)
+
+    try:
+        result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=effective_timeout)
+    except asyncio.TimeoutError:
+        pool.timeouts += 1
+        if future.cancel():
+            pool._dropped_before_start()
+        logger.warning("blocking_pool_timeout name=%s timeout=%ss", pool_name, effective_timeout)
+        raise
+    except asyncio.CancelledError:
+        pool.cancelled += 1
+        if future.cancel():
+            pool._dropped_before_start()
+        raise
+    except Exception:
+        pool.failed += 1
+        raise
+
+    pool.completed += 1
+    return result
+
+
+def get_blocking_pool_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: pool.snapshot() for name, pool in sorted(_POOLS.items())}
+
+
+def shutdown_blocking_pools() -> None:
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+        _POOLS.clear()
@@ -0,0 +1,106 @@
+"""
+Multi-platform content generation from one research bundle.
+
+Campaigns want a blog post, a LinkedIn post and an Instagram caption for the
+same topic, which used to mean three /content/generate calls, each with its
+own research lookup. Here the caller researches once and every requested
+platform is generated concurrently from the same retrieved context:
+
+- each platform keeps its own target length and therefore its own
+  token_budget estimate (blog may still go long-form); without a
+  per-platform length, linkedin and instagram use PLATFORM_TARGET_WORDS
+  rather than the blog-sized targetLength
+- a failing platform is reported in `errors` and does not affect the others
+- per-platform timings are returned for diagnostics
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.llm_service import generate_content_json
+
+logger = logging.getLogger(__name__)
+
+# Default lengths (words) for the short-form platforms; the blog uses the request's targetLength
+PLATFORM_TARGET_WORDS = {"linkedin": 300, "instagram": 150}
+
+
+async def fan_out(
+    platforms: List[str],
+    generate: Callable[[str], Awaitable[Tuple[Any, Any, Any]]],
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str], Dict[str, Dict[str, Any]]]:
+    """
+    Run `generate(platform)` for every platform concurrently. Returns
+    (results, errors, timings); `results[platform]` holds content,
+    diagnostics and metrics, platforms that raised appear in `errors` with
+    the error message instead.
+    """
+
+    async def _timed(platform: str):
+        started = time.perf_counter()
+        content, diagnostics, metrics = await generate(platform)
+        return content, diagnostics, metrics, (time.perf_counter() - started) * 1000
+
+    outcomes = await asyncio.gather(*(_timed(platform) for platform in platforms), return_exceptions=True)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    timings: Dict[str, Dict[str, Any]] = {}
+    for platform, outcome in zip(platforms, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, Exception):
+            logger.error("content_multi_platform_failed platform=%s error=%s", platform, outcome)
+            errors[platform] = str(outcome) or type(outcome).__name__
+            timings[platform] = {"status": "failed"}
+            continue
+        content, diagnostics, metrics, elapsed_ms = outcome
+        results[platform] = {"content": content, "diagnostics": diagnostics, "metrics": metrics}
+        timings[platform] = {"status": "ok", "ms": round(elapsed_ms, 1)}
+
+    logger.info("content_multi_complete ok=%s failed=%s", ",".join(results) or "-", ",".join(errors) or "-")
+    return results, errors, timings
+
+
+async def generate_for_platforms(
+    platforms: List[str],
+    *,
+    language: str,
+    topic_or_idea: str,
+    tone: str,
+    target_length: int,
+    target_lengths: Optional[Dict[str, int]],
+    focus_keyword: str,
+    style_guide: List[str],
+    retrieved_context: Dict[str, Any],
+    bypass_cache: bool = False,
+    namespace: str = "",
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str], Dict[str, Dict[str, Any]]]:
+    """generate_content_json for every platform from the same retrieved context; see fan_out."""
+    ordered = list(dict.fromkeys(platforms))
+    lengths = {
+        platform: int((target_lengths or {}).get(platform) or PLATFORM_TARGET_WORDS.get(platform, target_length))
+        for platform in ordered
+    }
+    logger.info("content_multi_start platforms=%s lengths=%s", ",".join(ordered), lengths)
+
+    results, errors, timings = await fan_out(
+        ordered,
+        lambda platform: generate_content_json(
+            platform=platform,
+            language=language,
+            topic_or_idea=topic_or_idea,
+            tone=tone,
+            target_length=lengths[platform],
+            focus_keyword=focus_keyword,
+            style_guide=style_guide,
+            retrieved_context=retrieved_context,
+            bypass_cache=bypass_cache,
+            namespace=namespace,
+        ),
+    )
+    for platform, timing in timings.items():
+        timing["targetLength"] = lengths[platform]
+    return results, errors, timings
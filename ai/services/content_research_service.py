@@ -3,10 +3,19 @@ import copy
 import hashlib
 import json
 import logging
-from typing import Any, Dict, List, Optional, Sequence
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 from config import settings
-from services.live_search_service import extract_keywords_rag, search_and_scrape
+from services.cpu_executor import run_cpu
+from services.cpu_tasks import pack_context_task
+from services.live_search_service import (
+    extract_keywords_rag,
+    scrape_ranked,
+    search_and_scrape,
+    search_ranked,
+    snippet_docs,
+)
 from services.rag_service import ensure_index_async, quick_seed_now, retrieve_context, stable_namespace
 from services.rag_strategy import (
     docs_to_snippets,
@@ -14,12 +23,13 @@ from services.rag_strategy import (
     merge_snippet_sources,
     should_use_indexed_content_context,
 )
+from utils import deadline, singleflight
 from utils.cache import get_if_fresh, set_with_ttl
 
 logger = logging.getLogger(__name__)
 
 RESEARCH_CACHE_TTL_SECONDS = min(settings.CACHE_TTL_SECONDS, 300)
-_RESEARCH_IN_FLIGHT: Dict[str, asyncio.Task] = {}
+_ENRICH_TASKS: Dict[str, asyncio.Task] = {}
 
 
 def _normalize_persona(persona: Optional[Dict[str, Any]]) -> Dict[str, Any]:
@@ -118,41 +128,76 @@ async def get_content_research_bundle(
         logger.info("content_research cache HIT namespace=%s", resolved_namespace)
         return copy.deepcopy(cached)
 
-    existing_task = _RESEARCH_IN_FLIGHT.get(cache_key)
-    if existing_task and not existing_task.done():
-        logger.info("content_research await_inflight namespace=%s", resolved_namespace)
-        result = await existing_task
-        return copy.deepcopy(result)
-
-    task = asyncio.create_task(
-        _build_content_research(
-            user_id=user_id,
-            language=language,
-            topic_or_idea=topic_or_idea,
-            focus_keyword=focus_keyword,
-            include_trend=include_trend,
-            niche=resolved_niche,
-            seed_keywords=list(seed_keywords or []),
-            region=region,
-            season=season,
-            persona=resolved_persona,
-            namespace=resolved_namespace,
-        )
+    # Concurrent requests for the same research share one build; a request that
+    # disconnects only detaches, the build is cancelled when nobody waits for it
+    result = await singleflight.run(
+        "research",
+        cache_key,
+        _build_content_research,
+        user_id=user_id,
+        language=language,
+        topic_or_idea=topic_or_idea,
+        focus_keyword=focus_keyword,
+        include_trend=include_trend,
+        niche=resolved_niche,
+        seed_keywords=list(seed_keywords or []),
+        region=region,
+        season=season,
+        persona=resolved_persona,
+        namespace=resolved_namespace,
+        cache_key=cache_key,
     )
-    _RESEARCH_IN_FLIGHT[cache_key] = task
+    if not result["retrievedContext"].get("degraded"):
+        # Research cut short by one request's deadline is not reused by the next
+        _store_bundle(cache_key, result)
+    return copy.deepcopy(result)
+
 
+def _store_bundle(cache_key: str, bundle: Dict[str, Any]) -> bool:
+    """Cache the bundle unless a newer version (e.g. an enriched one) is already there."""
+    current = get_if_fresh(cache_key)
+    if current and current.get("version", 1) > bundle.get("version", 1):
+        return False
+    set_with_ttl(cache_key, bundle, RESEARCH_CACHE_TTL_SECONDS)
+    return True
+
+
+async def _pack_live_context(docs: List[Dict[str, Any]], query: str, language: str):
+    """Best sentences from the scraped pages within CONTEXT_PACK_TOKEN_BUDGET; falls back to page prefixes."""
+    if not docs:
+        return [], None
     try:
-        result = await task
-        set_with_ttl(cache_key, result, RESEARCH_CACHE_TTL_SECONDS)
-        return copy.deepcopy(result)
-    finally:
-        current_task = _RESEARCH_IN_FLIGHT.get(cache_key)
-        if current_task is task:
-            _RESEARCH_IN_FLIGHT.pop(cache_key, None)
+        packed = await run_cpu(
+            "context_pack",
+            pack_context_task,
+            docs,
+            query,
+            language,
+            settings.CONTEXT_PACK_TOKEN_BUDGET,
+            size=sum(len(str(doc.get("content") or "")) for doc in docs),
+        )
+    except Exception as exc:
+        logger.warning("content_context_pack failed error=%s", exc)
+        return docs_to_snippets(docs), None
+    stats = packed["stats"]
+    logger.info(
+        "content_context_packed sources=%s candidates=%s selected=%s duplicates=%s tokens=%s source_tokens=%s",
+        len(packed["snippets"]),
+        stats["candidates"],
+        stats["selected"],
+        stats["duplicates"],
+        stats["tokens"],
+        stats["sourceTokens"],
+    )
+    if not packed["snippets"]:
+        return docs_to_snippets(docs), stats
+    return packed["snippets"], stats
 
 
-async def _build_content_research(
+async def _indexed_context(
     *,
+    use_indexed_context: bool,
+    indexed_policy: Dict[str, Any],
     user_id: str,
     language: str,
     topic_or_idea: str,
@@ -165,92 +210,74 @@ async def _build_content_research(
     persona: Dict[str, Any],
     namespace: str,
 ) -> Dict[str, Any]:
-    use_indexed_context, indexed_policy = should_use_indexed_content_context(
-        niche or "",
-        topic_or_idea,
-        focus_keyword,
-        seed_keywords,
-    )
-
-    focus_anchor = focus_keyword or topic_or_idea or ""
-    topic_anchor = merge_query_terms(focus_anchor, topic_or_idea or "")
-    search_queries = _dedupe_queries(
-        [
-            topic_anchor or topic_or_idea,
-            f"{focus_anchor} latest" if include_trend else f"{focus_anchor} tutorial",
-            f"{topic_anchor or topic_or_idea} analysis preview"
-            if include_trend
-            else f"{topic_anchor or topic_or_idea} guide",
-        ]
-    )
-
-    logger.info(
-        "content_research_build namespace=%s use_indexed=%s queries=%s",
-        namespace,
-        use_indexed_context,
-        len(search_queries),
-    )
-
-    try:
-        scraped_data = await search_and_scrape(search_queries, max_urls=5)
-    except Exception as exc:
-        logger.error("content_research search failed namespace=%s error=%s", namespace, exc)
-        scraped_data = []
-
-    live_snippets = docs_to_snippets(scraped_data[:6])
-
-    indexed_context = {"snippets": [], "usedRAG": False}
-    if use_indexed_context:
-        try:
-            await quick_seed_now(
-                user_id,
-                language,
-                niche,
-                region,
-                season,
-                seed_keywords,
-                namespace,
-            )
-            ensure_index_async(
-                user_id,
-                language,
-                niche,
-                region,
-                season,
-                seed_keywords,
-                namespace,
-            )
-            indexed_context = await retrieve_context(
-                user_id,
-                language,
-                niche,
-                persona,
-                topic_or_idea,
-                focus_keyword,
-                include_trend,
-                namespace,
-            )
-        except Exception as exc:
-            logger.warning("content_research indexed retrieval failed namespace=%s error=%s", namespace, exc)
-    else:
+    if not use_indexed_context:
         logger.info(
             "content_research indexed skipped namespace=%s reason=%s",
             namespace,
             indexed_policy.get("reason"),
         )
+        return {"snippets": [], "usedRAG": False}
+    try:
+        await quick_seed_now(
+            user_id,
+            language,
+            niche,
+            region,
+            season,
+            seed_keywords,
+            namespace,
+        )
+        ensure_index_async(
+            user_id,
+            language,
+            niche,
+            region,
+            season,
+            seed_keywords,
+            namespace,
+        )
+        return await retrieve_context(
+            user_id,
+            language,
+            niche,
+            persona,
+            topic_or_idea,
+            focus_keyword,
+            include_trend,
+            namespace,
+        )
+    except Exception as exc:
+        logger.warning("content_research indexed retrieval failed namespace=%s error=%s", namespace, exc)
+        return {"snippets": [], "usedRAG": False}
+
 
-    rag_keywords = {"keywords": [], "themes": []}
-    if scraped_data:
-        try:
-            rag_keywords = await extract_keywords_rag(scraped_data, top_n=15)
-        except Exception as exc:
-            logger.error("content_research keyword extraction failed namespace=%s error=%s", namespace, exc)
+async def _extract_keywords(scraped_data: List[Dict[str, Any]], namespace: str) -> Dict[str, Any]:
+    if not scraped_data:
+        return {"keywords": [], "themes": []}
+    try:
+        return await extract_keywords_rag(scraped_data, top_n=15)
+    except Exception as exc:
+        logger.error("content_research keyword extraction failed namespace=%s error=%s", namespace, exc)
+        return {"keywords": [], "themes": []}
 
+
+def _assemble_bundle(
+    *,
+    live_snippets: List[Dict[str, Any]],
+    packing: Optional[Dict[str, Any]],
+    rag_keywords: Dict[str, Any],
+    indexed_context: Dict[str, Any],
+    indexed_policy: Dict[str, Any],
+    use_indexed_context: bool,
+    namespace: str,
+    version: int,
+    stage: str,
+) -> Dict[str, Any]:
     merged_snippets = merge_snippet_sources(
         live_snippets,
         indexed_context.get("snippets", []),
         limit=12,
-        text_limit=900,
+        text_limit=2400,  # live snippets are already packed to the token budget
     )
 
     if rag_keywords.get("keywords"):
@@ -269,6 +296,8 @@ async def _build_content_research(
         "liveSources": len(live_snippets),
         "indexedSources": len(indexed_context.get("snippets", [])),
         "keywords": rag_keywords.get("keywords", []),
+        "packing": packing,
+        "degraded": [stage for stage in ("scrape", "keywords") if deadline.degraded(stage)],
     }
 
     bundle = {
@@ -277,12 +306,160 @@ async def _build_content_research(
         "indexedNamespace": namespace,
         "useIndexedContext": use_indexed_context,
         "ragMode": "live+indexed" if use_indexed_context and indexed_context.get("snippets") else "live-only",
+        # "snippets": search-result snippets only, enrichment pending; "full": scraped pages + keywords
+        "stage": stage,
+        "version": version,
     }
     logger.info(
-        "content_research_ready namespace=%s live=%s indexed=%s keywords=%s",
+        "content_research_ready namespace=%s stage=%s version=%s live=%s indexed=%s keywords=%s",
         namespace,
+        stage,
+        version,
         retrieved_context["liveSources"],
         retrieved_context["indexedSources"],
         len(retrieved_context["keywords"]),
     )
     return bundle
+
+
+async def _build_content_research(
+    *,
+    user_id: str,
+    language: str,
+    topic_or_idea: str,
+    focus_keyword: str,
+    include_trend: bool,
+    niche: str,
+    seed_keywords: List[str],
+    region: Optional[str],
+    season: Optional[str],
+    persona: Dict[str, Any],
+    namespace: str,
+    cache_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    use_indexed_context, indexed_policy = should_use_indexed_content_context(
+        niche or "",
+        topic_or_idea,
+        focus_keyword,
+        seed_keywords,
+    )
+
+    focus_anchor = focus_keyword or topic_or_idea or ""
+    topic_anchor = merge_query_terms(focus_anchor, topic_or_idea or "")
+    search_queries = _dedupe_queries(
+        [
+            topic_anchor or topic_or_idea,
+            f"{focus_anchor} latest" if include_trend else f"{focus_anchor} tutorial",
+            f"{topic_anchor or topic_or_idea} analysis preview"
+            if include_trend
+            else f"{topic_anchor or topic_or_idea} guide",
+        ]
+    )
+    progressive = settings.RESEARCH_PROGRESSIVE and cache_key is not None
+
+    logger.info(
+        "content_research_build namespace=%s use_indexed=%s queries=%s progressive=%s",
+        namespace,
+        use_indexed_context,
+        len(search_queries),
+        progressive,
+    )
+
+    ranked: List[Dict[str, Any]] = []
+    try:
+        if progressive:
+            ranked = await search_ranked(search_queries, max_urls=5)
+            scraped_data = snippet_docs(ranked)
+        else:
+            scraped_data = await search_and_scrape(search_queries, max_urls=5)
+    except Exception as exc:
+        logger.error("content_research search failed namespace=%s error=%s", namespace, exc)
+        scraped_data = []
+
+    query = topic_anchor or topic_or_idea
+    live_snippets, packing = await _pack_live_context(scraped_data[:6], query, language)
+    indexed_context = await _indexed_context(
+        use_indexed_context=use_indexed_context,
+        indexed_policy=indexed_policy,
+        user_id=user_id,
+        language=language,
+        topic_or_idea=topic_or_idea,
+        focus_keyword=focus_keyword,
+        include_trend=include_trend,
+        niche=niche,
+        seed_keywords=seed_keywords,
+        region=region,
+        season=season,
+        persona=persona,
+        namespace=namespace,
+    )
+    assemble = partial(
+        _assemble_bundle,
+        indexed_context=indexed_context,
+        indexed_policy=indexed_policy,
+        use_indexed_context=use_indexed_context,
+        namespace=namespace,
+    )
+
+    if progressive and ranked:
+        _schedule_enrichment(cache_key, ranked, query, language, namespace, assemble)
+        return assemble(
+            live_snippets=live_snippets,
+            packing=packing,
+            rag_keywords={"keywords": [], "themes": []},
+            version=1,
+            stage="snippets",
+        )
+
+    rag_keywords = await _extract_keywords(scraped_data, namespace)
+    return assemble(live_snippets=live_snippets, packing=packing, rag_keywords=rag_keywords, version=1, stage="full")
+
+
+def _schedule_enrichment(
+    cache_key: str,
+    ranked: List[Dict[str, Any]],
+    query: str,
+    language: str,
+    namespace: str,
+    assemble: Callable[..., Dict[str, Any]],
+) -> asyncio.Task:
+    existing_task = _ENRICH_TASKS.get(cache_key)
+    if existing_task and not existing_task.done():
+        logger.info("content_research_enrich skipped_inflight namespace=%s", namespace)
+        return existing_task
+
+    # Not awaited by the request: it outlives the response, a client disconnect and the request deadline
+    task = asyncio.create_task(_enrich_research(cache_key, ranked, query, language, namespace, assemble))
+    _ENRICH_TASKS[cache_key] = task
+    return task
+
+
+async def _enrich_research(
+    cache_key: str,
+    ranked: List[Dict[str, Any]],
+    query: str,
+    language: str,
+    namespace: str,
+    assemble: Callable[..., Dict[str, Any]],
+) -> None:
+    """Scrape the ranked pages and extract keywords, then replace the snippet bundle with version 2."""
+    deadline.clear()  # the task copied the request's deadline; enrichment runs on its own time
+    try:
+        scraped_data = await scrape_ranked(ranked)
+        live_snippets, packing = await _pack_live_context(scraped_data[:6], query, language)
+        rag_keywords = await _extract_keywords(scraped_data, namespace)
+        bundle = assemble(live_snippets=live_snippets, packing=packing, rag_keywords=rag_keywords, version=2, stage="full")
+        stored = _store_bundle(cache_key, bundle)
+        logger.info(
+            "content_research_enriched namespace=%s live=%s keywords=%s stored=%s",
+            namespace,
+            bundle["retrievedContext"]["liveSources"],
+            len(bundle["retrievedContext"]["keywords"]),
+            stored,
+        )
+    except Exception as exc:
+        logger.warning("content_research_enrich failed namespace=%s error=%s", namespace, exc)
+    finally:
+        current_task = _ENRICH_TASKS.get(cache_key)
+        if current_task is asyncio.current_task():
+            _ENRICH_TASKS.pop(cache_key, None)
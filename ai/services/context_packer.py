@@ -0,0 +1,126 @@
+"""
+Token-budgeted context packing for content prompts.
+
+Scraped pages used to reach the prompt as their first 900 characters, which
+is often cookie banners and navigation. Instead, every sentence from every
+scraped document is scored and the best ones are packed into a fixed token
+budget:
+
+- boilerplate and fragment sentences are dropped up front
+- score = QUERY_WEIGHT x cosine(sentence, topic + focus keyword)
+          + (1 - QUERY_WEIGHT) x cosine(sentence, TF-IDF centroid of all sentences),
+  computed as sparse matrix products over one TF-IDF fit
+- a sentence too similar to one already selected (from any source) is skipped
+- no source may take more than MAX_SOURCE_SHARE of the budget
+
+The selected sentences are regrouped per source in their original order and
+returned as regular snippets. CPU-bound; run via cpu_tasks.pack_context_task.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[^a-z])")
+BOILERPLATE = re.compile(
+    r"cookie|privacy policy|terms of (use|service)|all rights reserved|subscribe|newsletter|sign (in|up)|"
+    r"log ?in|javascript|accept all|advertisement|click here|share this|skip to (main )?content",
+    re.IGNORECASE,
+)
+MIN_SENTENCE_WORDS = 6
+MAX_SENTENCE_WORDS = 80
+QUERY_WEIGHT = 0.6
+DUPLICATE_SIMILARITY = 0.8
+MAX_SOURCE_SHARE = 0.4
+TOKENS_PER_WORD = 1.4
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text.split()) * TOKENS_PER_WORD) + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    sentences = []
+    for raw in SENTENCE_SPLIT.split(" ".join(str(text or "").split())):
+        sentence = raw.strip()
+        words = len(sentence.split())
+        if MIN_SENTENCE_WORDS <= words <= MAX_SENTENCE_WORDS and not BOILERPLATE.search(sentence):
+            sentences.append(sentence)
+    return sentences
+
+
+def pack_documents(
+    docs: Iterable[Dict[str, Any]],
+    query: str,
+    language: str = "en",
+    token_budget: int = 1200,
+) -> Dict[str, Any]:
+    """
+    Returns {"snippets": [{url, title, text}], "stats": {...}} with the
+    snippets ordered by the score of their best sentence.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    sources: List[Dict[str, str]] = []
+    sentences: List[str] = []
+    owners: List[int] = []
+    source_tokens = 0
+    for doc in docs:
+        if not isinstance(doc, dict):
+            continue
+        content = str(doc.get("content") or doc.get("text") or "")
+        source_tokens += estimate_tokens(content)
+        doc_sentences = split_sentences(content)
+        if not doc_sentences:
+            continue
+        sources.append({"url": str(doc.get("url", "") or ""), "title": str(doc.get("title", "") or "Reference source")})
+        sentences.extend(doc_sentences)
+        owners.extend([len(sources) - 1] * len(doc_sentences))
+
+    stats = {"sourceTokens": source_tokens, "candidates": len(sentences), "selected": 0, "tokens": 0, "duplicates": 0}
+    if not sentences:
+        return {"snippets": [], "stats": stats}
+
+    stop_words = "english" if (language or "en").lower().startswith("en") else None
+    vectorizer = TfidfVectorizer(stop_words=stop_words, sublinear_tf=True, ngram_range=(1, 2), min_df=1)
+    try:
+        matrix = vectorizer.fit_transform([*sentences, query or ""])
+    except ValueError:  # empty vocabulary, e.g. only stop words
+        return {"snippets": [], "stats": stats}
+    sentence_matrix, query_vector = matrix[:-1], matrix[-1]
+
+    centroid = sentence_matrix.mean(axis=0).A1
+    norm = (centroid ** 2).sum() ** 0.5
+    centroid_scores = sentence_matrix @ (centroid / norm) if norm else 0.0
+    query_scores = (sentence_matrix @ query_vector.T).toarray().ravel()
+    scores = QUERY_WEIGHT * query_scores + (1 - QUERY_WEIGHT) * centroid_scores
+
+    source_cap = max(1, int(token_budget * MAX_SOURCE_SHARE))
+    used_by_source = [0] * len(sources)
+    best_by_source = [0.0] * len(sources)
+    selected: List[int] = []
+    spent = 0
+    for index in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+        cost = estimate_tokens(sentences[index])
+        owner = owners[index]
+        if spent + cost > token_budget or used_by_source[owner] + cost > source_cap:
+            continue
+        if selected:
+            # Rows are L2-normalised, so the dot product is cosine similarity
+            similarity = (sentence_matrix[selected] @ sentence_matrix[index].T).toarray().max()
+            if similarity >= DUPLICATE_SIMILARITY:
+                stats["duplicates"] += 1
+                continue
+        selected.append(index)
+        spent += cost
+        used_by_source[owner] += cost
+        best_by_source[owner] = max(best_by_source[owner], float(scores[index]))
+
+    grouped: Dict[int, List[int]] = {}
+    for index in sorted(selected):
+        grouped.setdefault(owners[index], []).append(index)
+    snippets = [
+        {**sources[owner], "text": " ".join(sentences[i] for i in grouped[owner])}
+        for owner in sorted(grouped, key=lambda owner: -best_by_source[owner])
+    ]
+    stats.update({"selected": len(selected), "tokens": spent})
+    return {"snippets": snippets, "stats": stats}
@@ -0,0 +1,175 @@
+"""
+Managed process pool for CPU-bound research stages (HTML extraction, keyword
+clustering, language detection, content scoring).
+
+Work submitted through `run_cpu` leaves the event loop so other in-flight
+requests keep moving. Inputs smaller than the stage's inline threshold run
+inline, because shipping them to a worker costs more than the work itself.
+`CPU_POOL_WORKERS=0` disables the pool entirely.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_STATS: Dict[str, Dict[str, float]] = {}
+
+
+def _warm_worker() -> None:
+    """Worker initializer: import heavy modules once so the first task is not slow."""
+    from services import cpu_tasks
+
+    cpu_tasks.warm_up()
+
+
+def _timed_call(func: Callable, args: tuple):
+    started_at = time.time()
+    result = func(*args)
+    return started_at, time.time() - started_at, result
+
+
+def _stage_stats(stage: str) -> Dict[str, float]:
+    return _STATS.setdefault(stage, {
+        "calls": 0,
+        "inline": 0,
+        "pooled": 0,
+        "errors": 0,
+        "queueMsTotal": 0.0,
+        "queueMsMax": 0.0,
+        "runMsTotal": 0.0,
+        "runMsMax": 0.0,
+    })
+
+
+def _record(stage: str, *, pooled: bool, queue_ms: float, run_ms: float) -> None:
+    stats = _stage_stats(stage)
+    stats["calls"] += 1
+    stats["pooled" if pooled else "inline"] += 1
+    stats["queueMsTotal"] += queue_ms
+    stats["queueMsMax"] = max(stats["queueMsMax"], queue_ms)
+    stats["runMsTotal"] += run_ms
+    stats["runMsMax"] = max(stats["runMsMax"], run_ms)
+
+
+def get_cpu_pool() -> Optional[ProcessPoolExecutor]:
+    global _POOL
+    if settings.CPU_POOL_WORKERS <= 0:
+        return None
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(
+            max_workers=settings.CPU_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+        logger.info("cpu_pool_started workers=%s", settings.CPU_POOL_WORKERS)
+    return _POOL
+
+
+def warm_cpu_pool() -> None:
+    """Start every worker now instead of on the first request; does not wait."""
+    pool = get_cpu_pool()
+    if pool is None:
+        return
+    for _ in range(settings.CPU_POOL_WORKERS):
+        pool.submit(time.sleep, 0)
+
+
+def shutdown_cpu_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+async def run_cpu(
+    stage: str,
+    func: Callable,
+    *args: Any,
+    size: int = 0,
+    inline_below: Optional[int] = None,
+):
+    """
+    Run a picklable `func(*args)` on the CPU pool and return its result.
+
+    Args:
+        stage: Metrics label for the call site
+        size: Input size in the stage's own unit (chars, phrases, ...)
+        inline_below: Run inline when `size` is below this; defaults to CPU_POOL_INLINE_MAX_CHARS
+    """
+    threshold = settings.CPU_POOL_INLINE_MAX_CHARS if inline_below is None else inline_below
+    pool = get_cpu_pool() if size >= threshold else None
+
+    if pool is None:
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            _record(stage, pooled=False, queue_ms=0.0, run_ms=(time.perf_counter() - started) * 1000)
+
+    submitted_at = time.time()
+    try:
+        started_at, run_seconds, result = await _submit(stage, pool, func, args)
+    except BrokenProcessPool:
+        # A worker died (OOM, segfault): retry once on a fresh pool before giving up on the pool
+        pool = get_cpu_pool()
+        if pool is None:
+            return func(*args)
+        submitted_at = time.time()
+        try:
+            started_at, run_seconds, result = await _submit(stage, pool, func, args)
+        except BrokenProcessPool:
+            logger.warning("cpu_pool_broken stage=%s twice, running inline", stage)
+            return func(*args)
+
+    _record(
+        stage,
+        pooled=True,
+        queue_ms=max(started_at - submitted_at, 0.0) * 1000,
+        run_ms=run_seconds * 1000,
+    )
+    return result
+
+
+async def _submit(stage: str, pool: ProcessPoolExecutor, func: Callable, args: tuple):
+    """Run on `pool`; a broken pool is shut down and dropped, every failure counts as a stage error."""
+    global _POOL
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, _timed_call, func, args)
+    except BrokenProcessPool:
+        _stage_stats(stage)["errors"] += 1
+        logger.warning("cpu_pool_broken stage=%s, restarting pool", stage)
+        pool.shutdown(wait=False, cancel_futures=True)
+        if _POOL is pool:
+            _POOL = None
+        raise
+    except Exception:
+        _stage_stats(stage)["errors"] += 1
+        raise
+
+
+def get_cpu_pool_stats() -> Dict[str, Any]:
+    stages = {}
+    for stage, stats in _STATS.items():
+        pooled = max(stats["pooled"], 1)
+        calls = max(stats["calls"], 1)
+        stages[stage] = {
+            **{key: round(value, 2) if isinstance(value, float) else value for key, value in stats.items()},
+            "queueMsAvg": round(stats["queueMsTotal"] / pooled, 2),
+            "runMsAvg": round(stats["runMsTotal"] / calls, 2),
+        }
+    return {
+        "workers": settings.CPU_POOL_WORKERS,
+        "inlineMaxChars": settings.CPU_POOL_INLINE_MAX_CHARS,
+        "started": _POOL is not None,
+        "stages": stages,
+    }
@@ -0,0 +1,66 @@
+"""
+Picklable task wrappers executed by services.cpu_executor worker processes.
+
+Each wrapper takes plain positional arguments and returns plain data so it
+can cross the process boundary. Keep them thin: the real logic stays in the
+owning service module.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+
+def extract_main_content_task(html: str, url: str, max_chars: int) -> Optional[Dict[str, str]]:
+    from services.html_extractor import extract_main_content
+
+    return extract_main_content(html, url, max_chars=max_chars)
+
+
+def extract_paragraph_text_task(html: str, max_chars: int) -> str:
+    from services.html_extractor import extract_paragraph_text
+
+    return extract_paragraph_text(html, max_chars=max_chars)
+
+
+def cluster_keywords_task(phrases: List[str], top_n: int) -> Tuple[List[str], int]:
+    from services.live_search_service import cluster_keyword_phrases
+
+    return cluster_keyword_phrases(phrases, top_n)
+
+
+def pack_context_task(docs: List[Dict], query: str, language: str, token_budget: int) -> Dict:
+    from services.context_packer import pack_documents
+
+    return pack_documents(docs, query, language, token_budget)
+
+
+# Detection costs ~3.5 ms whatever the sample length (vs ~1 ms pool round-trip), so it always leaves the loop
+LANGDETECT_INLINE_MAX_CHARS = 0
+
+
+def detect_language_task(text: str) -> str:
+    from langdetect import DetectorFactory, detect
+
+    DetectorFactory.seed = 0  # langdetect samples randomly; seed it so repair decisions are repeatable
+    return detect(text)
+
+
+def score_content_metrics_task(html: str, plain_text: str, language: str) -> Dict[str, float | None]:
+    from services.text_quality_service import score_content_metrics
+
+    return score_content_metrics(html, plain_text, language)
+
+
+def warm_up() -> None:
+    """Import heavy dependencies and load langdetect profiles in a fresh worker."""
+    from langdetect import detect
+    from langdetect.lang_detect_exception import LangDetectException
+
+    import services.context_packer  # noqa: F401
+    import services.html_extractor  # noqa: F401
+    import services.live_search_service  # noqa: F401
+    import services.text_quality_service  # noqa: F401
+
+    try:
+        detect("warm up the language profiles")
+    except LangDetectException:
+        pass
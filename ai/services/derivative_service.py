@@ -0,0 +1,172 @@
+"""
+Short-form variants (LinkedIn, Instagram) derived from a finished blog.
+
+Repurposing a blog used to mean a fresh /content/generate call per platform:
+live search, RAG and a full research prompt for content we already have.
+Here the blog's `structured` payload is condensed locally instead. The
+context packer picks the sentences most relevant to the blog's h1 and focus
+keyword within DERIVATIVE_SUMMARY_TOKEN_BUDGET, grouped under their section
+headings. That summary is the only context in a small prompt per platform.
+Rendering, the language check and metrics are the same as for generated
+content (_finalize_content).
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from services import llm_router, token_budget
+from services.content_pipeline import PLATFORM_TARGET_WORDS, fan_out
+from services.context_packer import estimate_tokens
+from services.cpu_executor import run_cpu
+from services.cpu_tasks import pack_context_task
+from services.llm_service import REQUIRED_CONTENT_KEYS, _finalize_content
+from services.prompt_builder import instagram_system, linkedin_system
+
+logger = logging.getLogger(__name__)
+
+# Nominal lengths; the LinkedIn/Instagram prompts pin their own length
+DERIVATIVE_TARGET_WORDS = PLATFORM_TARGET_WORDS
+FALLBACK_WORDS_PER_SECTION = 40
+
+
+def _blog_title(blog: Dict[str, Any]) -> str:
+    return str(blog.get("h1") or blog.get("title") or "").strip()
+
+
+def _section_docs(blog: Dict[str, Any]) -> List[Dict[str, str]]:
+    return [
+        {"url": "", "title": str(section.get("h2") or "").strip(), "content": str(section.get("body") or "")}
+        for section in blog.get("sections") or []
+        if isinstance(section, dict) and str(section.get("body") or "").strip()
+    ]
+
+
+async def summarize_blog(blog: Dict[str, Any], language: str, focus_keyword: str = "") -> Tuple[str, Dict[str, Any]]:
+    """
+    Returns (summary, stats). Raises ValueError if the blog has no section
+    bodies to summarize.
+    """
+    docs = _section_docs(blog)
+    if not docs:
+        raise ValueError("Blog payload has no sections with body text")
+    title = _blog_title(blog)
+    source_tokens = sum(estimate_tokens(doc["content"]) for doc in docs)
+
+    points: List[Tuple[str, str]] = []
+    try:
+        packed = await run_cpu(
+            "context_pack",
+            pack_context_task,
+            docs,
+            f"{title} {focus_keyword}".strip(),
+            language,
+            settings.DERIVATIVE_SUMMARY_TOKEN_BUDGET,
+            size=sum(len(doc["content"]) for doc in docs),
+        )
+        points = [(snippet["title"], snippet["text"]) for snippet in packed["snippets"]]
+    except Exception as exc:
+        logger.warning("derivative_summary_pack_failed error=%s", exc)
+    packed_ok = bool(points)
+    if not packed_ok:
+        points = [(doc["title"], " ".join(doc["content"].split()[:FALLBACK_WORDS_PER_SECTION])) for doc in docs]
+
+    lines = [f"Title: {title}"]
+    description = str((blog.get("meta") or {}).get("description") or "").strip()
+    if description:
+        lines.append(f"Summary: {description}")
+    lines.append("Key points:")
+    lines.extend(f"- {heading}: {text}" if heading else f"- {text}" for heading, text in points)
+    summary = "\n".join(lines)
+
+    stats = {"sourceTokens": source_tokens, "summaryTokens": estimate_tokens(summary), "packed": packed_ok}
+    logger.info(
+        "derivative_summary source_tokens=%s summary_tokens=%s packed=%s",
+        stats["sourceTokens"],
+        stats["summaryTokens"],
+        packed_ok,
+    )
+    return summary, stats
+
+
+def _derivative_messages(platform: str, language: str, tone: str, style_guide: List[str], summary: str) -> List[Dict[str, str]]:
+    system = linkedin_system(language) if platform == "linkedin" else instagram_system(language)
+    user_content = f"""Repurpose the blog post summarized below. Keep its facts and angle; do not add new claims.
+Tone: {tone}
+Style guide: {style_guide}
+
+Blog summary:
+{summary}
+"""
+    return [{"role": "system", "content": system}, {"role": "user", "content": user_content}]
+
+
+async def _derive_one(
+    platform: str,
+    *,
+    summary: str,
+    summary_stats: Dict[str, Any],
+    title: str,
+    language: str,
+    tone: str,
+    focus_keyword: str,
+    style_guide: List[str],
+):
+    target_words = DERIVATIVE_TARGET_WORDS[platform]
+    messages = _derivative_messages(platform, language, tone, style_guide, summary)
+    max_tokens = token_budget.estimate_max_tokens(platform, language, target_words)
+
+    llm_router.reset_routing()
+    data = await llm_router.call_routed_json(
+        "content",
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=0.7,
+        required_keys=REQUIRED_CONTENT_KEYS.get(platform),
+    )
+    return await _finalize_content(
+        data,
+        messages,
+        max_tokens,
+        platform=platform,
+        language=language,
+        topic_or_idea=title,
+        focus_keyword=focus_keyword,
+        target_length=target_words,
+        retrieved_context={},
+        extra_diagnostics={"derivedFrom": {"title": title, **summary_stats}},
+    )
+
+
+async def derive_from_blog(
+    blog: Dict[str, Any],
+    platforms: List[str],
+    *,
+    language: str,
+    tone: str,
+    focus_keyword: Optional[str] = None,
+    style_guide: Optional[List[str]] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str], Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """
+    Returns (results, errors, timings, summary_stats); see content_pipeline.fan_out
+    for the first three. The blog is summarized once for all platforms.
+    """
+    ordered = list(dict.fromkeys(platforms))
+    title = _blog_title(blog)
+    summary, summary_stats = await summarize_blog(blog, language, focus_keyword or "")
+    logger.info("derivative_start platforms=%s title=%s", ",".join(ordered), title)
+
+    results, errors, timings = await fan_out(
+        ordered,
+        lambda platform: _derive_one(
+            platform,
+            summary=summary,
+            summary_stats=summary_stats,
+            title=title,
+            language=language,
+            tone=tone,
+            focus_keyword=focus_keyword or "",
+            style_guide=list(style_guide or []),
+        ),
+    )
+    return results, errors, timings, summary_stats
@@ -1,5 +1,7 @@
 from typing import List
 from config import settings
+from services.blocking_io import run_blocking
+from utils import singleflight
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,24 @@ def embed_texts(texts: List[str]) -> List[List[float]]:
     logger.info("embed_texts", extra={"total_texts": len(texts), "batches": (len(texts) + BATCH_SIZE - 1) // BATCH_SIZE})
     return all_embeddings
 
+async def embed_texts_async(texts: List[str]) -> List[List[float]]:
+    """
+    Run `embed_texts` on the embedder's dedicated blocking pool. Concurrent
+    calls with the same texts share one embedding request.
+    """
+    if not texts:
+        return []
+    embedder = settings.EMBEDDER.lower() or "cohere"
+    return await singleflight.run(
+        "embed",
+        singleflight.key_for(embedder, list(texts)),
+        run_blocking,
+        embedder,
+        embed_texts,
+        texts,
+        timeout=settings.EMBEDDING_TIMEOUT_SECONDS,
+    )
+
 def _embed_cohere(texts: List[str]) -> List[List[float]]:
     import cohere
     client = cohere.Client(api_key=settings.COHERE_API_KEY)
@@ -0,0 +1,219 @@
+"""
+Result cache for topic and content generation.
+
+Retries from the backend, users double-clicking "regenerate" and scheduled
+jobs for the same topic all used to re-run generation from scratch.
+
+Two tiers, checked in order:
+- exact: sha256 over the canonical JSON of (provider, model, messages,
+  temperature, max_tokens); the provider/model are the task's preferred
+  ones, so the key is stable regardless of the routing decision of the day
+- semantic (opt-in, GENERATION_CACHE_SEMANTIC): an embedding of the
+  free-text request fields (topic, focus keyword, niche, ...) is compared
+  against entries with identical strict fields (research namespace,
+  platform, language, tone, length); cosine >=
+  GENERATION_CACHE_SEMANTIC_THRESHOLD is a hit. The namespace keeps one
+  user's results, built from their indexed context, away from another's
+
+TTLs come from GENERATION_CACHE_TTLS per platform ("blog=86400,..."), the
+cache is an in-process LRU bounded by GENERATION_CACHE_MAX_ENTRIES, and a
+caller can bypass the lookup for one call (the fresh result still replaces
+the cached one). Every lookup returns a provenance dict for diagnostics.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from services import llm_router
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600
+MAX_TOKENS_BUCKET = 512
+
+_ENTRIES: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_STATS: Dict[str, int] = {
+    "exactHits": 0,
+    "semanticHits": 0,
+    "misses": 0,
+    "bypassed": 0,
+    "stores": 0,
+    "evictions": 0,
+}
+
+
+def _parse_ttls(raw: str) -> Dict[str, int]:
+    ttls: Dict[str, int] = {}
+    for item in str(raw or "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip().lower()
+        if not name:
+            continue
+        try:
+            ttls[name] = max(0, int(value))
+        except ValueError:
+            logger.warning("generation_cache: ignoring invalid TTL entry %r", item)
+    return ttls
+
+
+def ttl_for(scope: str) -> int:
+    return _parse_ttls(settings.GENERATION_CACHE_TTLS).get(scope, DEFAULT_TTL_SECONDS)
+
+
+def cache_key(task: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+    # max_tokens drifts as token_budget learns; bucket it so the key survives small adjustments
+    provider = llm_router.TASK_POLICIES.get(task, llm_router.TASK_POLICIES["content"])["preferred"]
+    canonical = json.dumps(
+        {
+            "provider": provider,
+            "model": llm_router._model_for(provider),
+            "messages": messages,
+            "temperature": round(float(temperature), 3),
+            "maxTokens": -(-int(max_tokens) // MAX_TOKENS_BUCKET) * MAX_TOKENS_BUCKET,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _fresh(entry: Dict[str, Any], now: float) -> bool:
+    return entry["expires"] > now
+
+
+def _cosine(left: List[float], right: List[float]) -> float:
+    dot = sum(a * b for a, b in zip(left, right))
+    norm = math.sqrt(sum(a * a for a in left)) * math.sqrt(sum(b * b for b in right))
+    return dot / norm if norm else 0.0
+
+
+def _semantic_text(fields: Dict[str, Any]) -> str:
+    return " | ".join(f"{name}: {fields[name]}" for name in sorted(fields) if fields[name])
+
+
+async def _embed(text: str) -> Optional[List[float]]:
+    from services.embedding_service import embed_texts_async
+
+    try:
+        vectors = await embed_texts_async([text])
+    except Exception as exc:
+        logger.warning("generation_cache_embed_failed error=%s", exc)
+        return None
+    return list(vectors[0]) if vectors else None
+
+
+def _hit(probe: Dict[str, Any], key: str, entry: Dict[str, Any], tier: str, now: float, **extra) -> Dict[str, Any]:
+    _ENTRIES.move_to_end(key)
+    _STATS[f"{tier}Hits"] += 1
+    probe["value"] = copy.deepcopy(entry["value"])
+    probe["provenance"] = {
+        "hit": tier,
+        "key": key[:16],
+        "ageSeconds": round(now - entry["created"], 1),
+        "ttlSeconds": entry["ttl"],
+        **extra,
+    }
+    logger.info("generation_cache_hit scope=%s tier=%s key=%s", probe["scope"], tier, key[:16])
+    return probe
+
+
+async def lookup(
+    scope: str,
+    key: str,
+    strict_fields: Optional[Dict[str, Any]] = None,
+    semantic_fields: Optional[Dict[str, Any]] = None,
+    bypass: bool = False,
+) -> Dict[str, Any]:
+    """
+    Returns a probe dict. probe["value"] is the cached value (a deep copy) or
+    None; probe["provenance"] describes the outcome for diagnostics. Pass the
+    probe to store() after a miss.
+    """
+    probe: Dict[str, Any] = {
+        "scope": scope,
+        "key": key,
+        "strict": strict_fields or {},
+        "semantic": semantic_fields or {},
+        "embedding": None,
+        "value": None,
+        "provenance": {"hit": None, "key": key[:16]},
+    }
+    if not settings.GENERATION_CACHE_ENABLED:
+        probe["provenance"] = {"hit": None, "disabled": True}
+        return probe
+    if bypass:
+        _STATS["bypassed"] += 1
+        probe["provenance"]["bypassed"] = True
+        return probe
+
+    now = time.time()
+    entry = _ENTRIES.get(key)
+    if entry is not None:
+        if _fresh(entry, now):
+            return _hit(probe, key, entry, "exact", now)
+        _ENTRIES.pop(key, None)
+
+    if settings.GENERATION_CACHE_SEMANTIC and probe["semantic"]:
+        probe["embedding"] = await _embed(_semantic_text(probe["semantic"]))
+        if probe["embedding"]:
+            best_key, best_similarity = None, 0.0
+            for other_key, other in list(_ENTRIES.items()):
+                if other["scope"] != scope or other["strict"] != probe["strict"] or not other["embedding"]:
+                    continue
+                if not _fresh(other, now):
+                    continue
+                similarity = _cosine(probe["embedding"], other["embedding"])
+                if similarity > best_similarity:
+                    best_key, best_similarity = other_key, similarity
+            if best_key and best_similarity >= settings.GENERATION_CACHE_SEMANTIC_THRESHOLD:
+                return _hit(probe, best_key, _ENTRIES[best_key], "semantic", now, similarity=round(best_similarity, 4))
+
+    _STATS["misses"] += 1
+    return probe
+
+
+def store(probe: Dict[str, Any], value: Any) -> None:
+    if not settings.GENERATION_CACHE_ENABLED:
+        return
+    ttl = ttl_for(probe["scope"])
+    if ttl <= 0:
+        return
+    now = time.time()
+    _ENTRIES[probe["key"]] = {
+        "scope": probe["scope"],
+        "strict": probe["strict"],
+        "embedding": probe["embedding"],
+        "value": copy.deepcopy(value),
+        "created": now,
+        "expires": now + ttl,
+        "ttl": ttl,
+    }
+    _ENTRIES.move_to_end(probe["key"])
+    _STATS["stores"] += 1
+    while len(_ENTRIES) > max(1, settings.GENERATION_CACHE_MAX_ENTRIES):
+        _ENTRIES.popitem(last=False)
+        _STATS["evictions"] += 1
+
+
+def get_generation_cache_stats() -> Dict[str, Any]:
+    lookups = _STATS["exactHits"] + _STATS["semanticHits"] + _STATS["misses"]
+    return {
+        **_STATS,
+        "entries": len(_ENTRIES),
+        "hitRate": round((_STATS["exactHits"] + _STATS["semanticHits"]) / lookups, 3) if lookups else 0.0,
+        "semantic": settings.GENERATION_CACHE_SEMANTIC,
+    }
+
+
+def reset_generation_cache() -> None:
+    _ENTRIES.clear()
+    for name in _STATS:
+        _STATS[name] = 0
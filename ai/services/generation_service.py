@@ -0,0 +1,212 @@
+"""
+Single-item content and topic generation, shared by the HTTP routers and the
+job worker.
+
+The routers add what only HTTP requests have (Idempotency-Key, the
+X-Request-Timeout deadline, client disconnects); the worker runs the same
+handlers for queued job items. Research is split out so batch endpoints can
+share one research run between items with the same inputs.
+"""
+
+import logging
+import time
+
+from models.requests import ContentGenerateRequest, ContentMultiGenerateRequest, TopicSuggestRequest
+from models.responses import ContentGenerateResponse, TopicSuggestResponse
+from services.content_research_service import get_content_research_bundle
+from services.llm_service import generate_content_json, generate_topics_json
+from services.rag_service import retrieve_context, ensure_index_async, quick_seed_now, stable_namespace
+from services.rag_strategy import build_topic_live_queries, docs_to_snippets, merge_snippet_sources
+from utils import deadline, task_graph
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationFailed(RuntimeError):
+    """The LLM step failed; the API answers 500 with the message as detail."""
+
+
+async def content_research(req: ContentGenerateRequest | ContentMultiGenerateRequest):
+    niche = req.niche or req.focusKeyword or req.topicOrIdea
+    persona = req.persona.model_dump() if req.persona else {"role": "content reader", "pains": []}
+    seed_keywords = list(req.seedKeywords or ([req.focusKeyword] if req.focusKeyword else []))
+
+    research_bundle = await get_content_research_bundle(
+        user_id=req.userId,
+        language=req.language,
+        topic_or_idea=req.topicOrIdea,
+        focus_keyword=req.focusKeyword,
+        include_trend=req.includeTrend,
+        niche=niche,
+        seed_keywords=seed_keywords,
+        region=req.region,
+        season=req.season,
+        persona=persona,
+        namespace=req.namespace,
+    )
+    indexed_policy = research_bundle["indexedPolicy"]
+
+    logger.info(
+        "content_rag_policy use_indexed=%s reason=%s overlap=%s namespace=%s",
+        research_bundle["useIndexedContext"],
+        indexed_policy.get("reason"),
+        ",".join(indexed_policy.get("overlapTerms", [])) or "none",
+        research_bundle["indexedNamespace"],
+    )
+    return research_bundle
+
+
+def research_diagnostics(research_bundle) -> dict:
+    diagnostics = {
+        "ragMode": research_bundle["ragMode"],
+        "indexedPolicy": research_bundle["indexedPolicy"],
+        "indexedNamespace": research_bundle["indexedNamespace"],
+    }
+    if "stage" in research_bundle:
+        diagnostics["research"] = {"stage": research_bundle["stage"], "version": research_bundle["version"]}
+    return diagnostics
+
+
+async def generate_content(req: ContentGenerateRequest, research_bundle=None) -> ContentGenerateResponse:
+    logger.info(
+        "content_request user=%s platform=%s topic=%s keyword=%s trend=%s",
+        req.userId,
+        req.platform,
+        req.topicOrIdea,
+        req.focusKeyword,
+        req.includeTrend,
+    )
+    
+    research_bundle = research_bundle or await content_research(req)
+    retrieved_context = research_bundle["retrievedContext"]
+    
+    # STEP 5: Generate with Gemini
+    try:
+        content, diagnostics, metrics = await generate_content_json(
+            platform=req.platform,
+            language=req.language,
+            topic_or_idea=req.topicOrIdea,
+            tone=req.tone,
+            target_length=req.targetLength,
+            focus_keyword=req.focusKeyword,
+            style_guide=req.styleGuideBullets,
+            retrieved_context=retrieved_context,
+            bypass_cache=req.bypassCache,
+            namespace=research_bundle["indexedNamespace"],
+        )
+    except Exception as e:
+        logger.error(f"Content generation failed: {e}")
+        raise GenerationFailed(str(e)) from e
+
+    diagnostics.update(research_diagnostics(research_bundle))
+    deadline_report = deadline.report()
+    if deadline_report:
+        diagnostics["deadline"] = deadline_report
+    
+    logger.info(
+        "content_complete platform=%s length=%s model=%s",
+        req.platform,
+        len(content.get("plainText", "")),
+        diagnostics.get("model"),
+    )
+    
+    return ContentGenerateResponse(
+        contentForEditor=content,
+        diagnostics=diagnostics,
+        metrics=metrics,
+    )
+
+
+async def topic_research(req: TopicSuggestRequest):
+    """
+    Index seeding, RAG retrieval and live trend snippets. Returns (namespace, context, live source count).
+
+    Runs as a task graph: seed -> retrieve, with the live search (which needs
+    neither) in parallel; per-node timings are kept in context["timings"].
+    """
+    ns = req.namespace or stable_namespace(req.userId, req.language, req.niche)
+
+    async def seed():
+        # Fast seed so usedRAG becomes true on first call
+        await quick_seed_now(req.userId, req.language, req.niche, req.region, req.season, req.seedKeywords, ns)
+        # Full RAG build in background (Google News + optional Serper + baseline RSS)
+        ensure_index_async(req.userId, req.language, req.niche, req.region, req.season, req.seedKeywords, ns)
+
+    async def retrieve(seed):
+        return await retrieve_context(
+            req.userId, req.language, req.niche, req.persona.model_dump(),
+            req.niche, None, req.includeTrends, ns
+        )
+
+    async def live():
+        if not req.includeTrends:
+            return []
+        try:
+            from services.live_search_service import search_and_scrape
+
+            live_queries = build_topic_live_queries(
+                req.niche,
+                req.seedKeywords,
+                req.region or "",
+                req.season or "",
+                req.includeTrends,
+            )
+            live_docs = await search_and_scrape(live_queries, max_urls=4)
+            return docs_to_snippets(live_docs[:4], text_limit=700)
+        except Exception:
+            return []
+
+    results, timings = await task_graph.run_graph({
+        "seed": ((), seed),
+        "retrieve": (("seed",), retrieve),
+        "live": ((), live),
+    })
+    ctx, live_topic_snippets = results["retrieve"], results["live"]
+
+    merged_topic_snippets = merge_snippet_sources(
+        live_topic_snippets,
+        ctx.get("snippets", []),
+        limit=12,
+        text_limit=700,
+    )
+    ctx = {
+        **ctx,
+        "snippets": merged_topic_snippets,
+        "liveSources": len(live_topic_snippets),
+        "indexedSources": len(ctx.get("snippets", [])),
+        "usedRAG": bool(merged_topic_snippets),
+        "timings": timings,
+    }
+    return ns, ctx, len(live_topic_snippets)
+
+
+async def suggest_topics(req: TopicSuggestRequest, research=None) -> TopicSuggestResponse:
+    ns, ctx, live_sources = research or await topic_research(req)
+    try:
+        generate_started = time.perf_counter()
+        clusters, ideas, diagnostics = await generate_topics_json(
+            language=req.language, niche=req.niche, persona=req.persona.model_dump(),
+            seed_keywords=req.seedKeywords, region=req.region or "", season=req.season or "",
+            count=req.count,
+            retrieved_context=ctx,
+            include_trends=req.includeTrends,
+            content_goals=req.contentGoals or "",
+            preferred_content_types=req.preferredContentTypes or [],
+            bypass_cache=req.bypassCache,
+            namespace=ns,
+        )
+        diagnostics["namespace"] = ns
+        diagnostics["liveSources"] = live_sources
+        diagnostics["indexedSources"] = ctx.get("indexedSources", 0)
+        diagnostics["ragMode"] = "indexed+live" if live_sources else "indexed"
+        if ctx.get("timings"):
+            diagnostics["timings"] = {
+                **ctx["timings"],
+                "generateMs": round((time.perf_counter() - generate_started) * 1000, 1),
+            }
+        deadline_report = deadline.report()
+        if deadline_report:
+            diagnostics["deadline"] = deadline_report
+        return TopicSuggestResponse(clusters=clusters, ideas=ideas, diagnostics=diagnostics)
+    except Exception as e:
+        raise GenerationFailed(str(e)) from e
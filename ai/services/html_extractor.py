@@ -0,0 +1,280 @@
+"""
+HTML main-content extraction shared by live search scraping and RAG indexing.
+
+Two engines are available:
+- "lxml": C parser plus readability-style scoring of paragraph containers.
+- "legacy": BeautifulSoup html.parser with the original selector cascade.
+
+`HTML_EXTRACTOR=auto` picks lxml when it is installed and falls back to the
+legacy engine otherwise, so Windows setups without lxml keep working.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from config import settings
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MIN_CONTENT_CHARS = 200
+SCRAPE_BOILERPLATE_TAGS = ("script", "style", "nav", "footer", "header")
+INDEX_BOILERPLATE_TAGS = SCRAPE_BOILERPLATE_TAGS + ("noscript",)
+LXML_BOILERPLATE_TAGS = INDEX_BOILERPLATE_TAGS + ("aside", "form", "iframe", "svg", "button", "select")
+LEGACY_CONTENT_SELECTORS = ["article", "main", ".content", "#content", ".post", ".entry"]
+
+POSITIVE_HINTS = re.compile(
+    r"article|body|content|entry|hentry|main|page|post|story|text|blog",
+    re.IGNORECASE,
+)
+NEGATIVE_HINTS = re.compile(
+    r"ad-|ads|banner|breadcrumb|comment|consent|cookie|footer|menu|meta|modal|nav|"
+    r"newsletter|popup|promo|related|share|sidebar|social|sponsor|subscribe|widget",
+    re.IGNORECASE,
+)
+PARAGRAPH_TAGS = ("p", "pre", "blockquote", "td")
+MIN_PARAGRAPH_CHARS = 25
+SIBLING_SCORE_RATIO = 0.2
+SIBLING_MIN_SCORE = 10.0
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text or "").split())
+
+
+def resolve_engine(engine: Optional[str] = None) -> str:
+    requested = str(engine or settings.HTML_EXTRACTOR or "auto").strip().lower()
+    if requested == "lxml" and not LXML_AVAILABLE:
+        logger.warning("html_extractor: lxml requested but not installed, using legacy engine")
+        return "legacy"
+    if requested in {"lxml", "legacy"}:
+        return requested
+    return "lxml" if LXML_AVAILABLE else "legacy"
+
+
+def extract_main_content(
+    html: str,
+    url: str = "",
+    *,
+    max_chars: int = 5000,
+    min_chars: int = MIN_CONTENT_CHARS,
+    engine: Optional[str] = None,
+) -> Optional[Dict[str, str]]:
+    """
+    Extract the page title and main text.
+
+    Returns:
+        {"title": str, "content": str} or None when the text is below `min_chars`
+    """
+    if not html:
+        return None
+
+    if resolve_engine(engine) == "lxml":
+        title, content = _lxml_main_content(html)
+    else:
+        title, content = _legacy_main_content(html)
+
+    content = _normalize(content)[:max_chars]
+    if len(content) < min_chars:
+        return None
+    return {"title": title or url, "content": content}
+
+
+def extract_paragraph_text(html: str, *, max_chars: int = 6000, engine: Optional[str] = None) -> str:
+    """Join paragraph and list-item text, preferring the main content block."""
+    if not html:
+        return ""
+    if resolve_engine(engine) == "lxml":
+        text = _lxml_paragraph_text(html)
+    else:
+        text = _legacy_paragraph_text(html)
+    return text[:max_chars]
+
+
+# ---------------------------------------------------------------------------
+# Legacy engine (BeautifulSoup html.parser)
+# ---------------------------------------------------------------------------
+
+def _legacy_main_content(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(list(SCRAPE_BOILERPLATE_TAGS)):
+        tag.decompose()
+
+    title = soup.find("title")
+    title_text = title.get_text().strip() if title else ""
+
+    content = ""
+    for selector in LEGACY_CONTENT_SELECTORS:
+        container = soup.select_one(selector)
+        if container:
+            content = container.get_text(separator=" ", strip=True)
+            break
+
+    if not content:
+        body = soup.find("body")
+        if body:
+            content = body.get_text(separator=" ", strip=True)
+
+    return title_text, content
+
+
+def _legacy_paragraph_text(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(list(INDEX_BOILERPLATE_TAGS)):
+        tag.extract()
+    return " ".join(p.get_text(" ", strip=True) for p in soup.find_all(["p", "li"]))
+
+
+# ---------------------------------------------------------------------------
+# lxml engine with readability-style scoring
+# ---------------------------------------------------------------------------
+
+def _lxml_document(html: str):
+    try:
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # Unicode strings with an XML encoding declaration must be parsed as bytes.
+            root = lxml.html.document_fromstring(html.encode("utf-8", errors="ignore"))
+    except (etree.ParserError, etree.XMLSyntaxError):
+        return None
+
+    for element in list(root.iter(etree.Comment)):
+        element.drop_tree()
+    for element in list(root.iter(*LXML_BOILERPLATE_TAGS)):
+        element.drop_tree()
+    return root
+
+
+def _lxml_title(root) -> str:
+    title = root.find(".//title")
+    if title is not None and _normalize(title.text_content()):
+        return _normalize(title.text_content())
+    og_title = root.xpath("//meta[@property='og:title']/@content")
+    if og_title:
+        return _normalize(og_title[0])
+    heading = root.find(".//h1")
+    return _normalize(heading.text_content()) if heading is not None else ""
+
+
+def _class_weight(node) -> float:
+    hints = f"{node.get('class', '')} {node.get('id', '')}"
+    weight = 0.0
+    if hints.strip():
+        if NEGATIVE_HINTS.search(hints):
+            weight -= 25
+        if POSITIVE_HINTS.search(hints):
+            weight += 25
+    if node.tag in {"article", "main"}:
+        weight += 10
+    elif node.tag == "div":
+        weight += 5
+    return weight
+
+
+def _link_density(node) -> float:
+    text_length = len(_normalize(node.text_content()))
+    if not text_length:
+        return 1.0
+    link_length = sum(len(_normalize(link.text_content())) for link in node.iter("a"))
+    return min(link_length / text_length, 1.0)
+
+
+def _score_candidates(root):
+    scores = {}
+    for paragraph in root.iter(*PARAGRAPH_TAGS):
+        text = _normalize(paragraph.text_content())
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        paragraph_score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for node, share in ((parent, 1.0), (grandparent, 0.5)):
+            if node is None or not isinstance(node.tag, str):
+                continue
+            if node not in scores:
+                scores[node] = _class_weight(node)
+            scores[node] += paragraph_score * share
+
+    return {node: score * (1 - _link_density(node)) for node, score in scores.items()}
+
+
+def _content_nodes(root) -> List:
+    """Return the top-scoring container plus strong siblings, in document order."""
+    scores = _score_candidates(root)
+    if not scores:
+        return []
+
+    best_node = max(scores, key=scores.get)
+    best_score = scores[best_node]
+    if best_score <= 0:
+        return []
+
+    parent = best_node.getparent()
+    if parent is None:
+        return [best_node]
+
+    threshold = max(SIBLING_MIN_SCORE, best_score * SIBLING_SCORE_RATIO)
+    return [
+        sibling
+        for sibling in parent
+        if sibling is best_node or scores.get(sibling, 0.0) >= threshold
+    ]
+
+
+def _lxml_selector_fallback(root):
+    for xpath in (
+        "//article",
+        "//main",
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' content ')]",
+        "//*[@id='content']",
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' post ')]",
+        "//*[contains(concat(' ', normalize-space(@class), ' '), ' entry ')]",
+    ):
+        matches = root.xpath(xpath)
+        if matches:
+            return matches[0]
+    return root.find(".//body")
+
+
+def _node_text(node) -> str:
+    return _normalize(" ".join(node.itertext())) if node is not None else ""
+
+
+def _lxml_main_content(html: str):
+    root = _lxml_document(html)
+    if root is None:
+        return "", ""
+
+    title = _lxml_title(root)
+    content = " ".join(_node_text(node) for node in _content_nodes(root))
+    if len(content) < MIN_CONTENT_CHARS:
+        content = _node_text(_lxml_selector_fallback(root)) or content
+    return title, content
+
+
+def _lxml_paragraph_text(html: str) -> str:
+    root = _lxml_document(html)
+    if root is None:
+        return ""
+
+    scopes = _content_nodes(root) or [root]
+    parts: List[str] = [
+        _normalize(node.text_content())
+        for scope in scopes
+        for node in scope.iter("p", "li")
+    ]
+    text = " ".join(part for part in parts if part)
+    if scopes != [root] and len(text) < MIN_CONTENT_CHARS:
+        parts = [_normalize(node.text_content()) for node in root.iter("p", "li")]
+        text = " ".join(part for part in parts if part)
+    return text
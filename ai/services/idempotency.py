@@ -0,0 +1,215 @@
+"""
+Idempotency-Key support for the expensive generation endpoints.
+
+When the backend's call to /content/generate or /image/generate times out on
+its side it retries, and every retry used to repeat the whole search,
+scrape, LLM and image pipeline. A client that sends an `Idempotency-Key`
+header now gets, for a repeated key:
+
+- the running execution, if the first request is still in flight (the
+  shared task is shielded and keeps running when every caller has
+  disconnected, so the retry can still pick it up)
+- the stored response, if it finished successfully within
+  IDEMPOTENCY_RETENTION_SECONDS; responses are kept as zlib-compressed JSON
+- 422 if the key was used with a different request body
+
+Failures are not stored, so a retry after an error runs again; neither are
+responses the caller's `storable` check rejects (e.g. placeholder-only
+images). The store is in-process (one per API worker) and LRU-bounded by
+both IDEMPOTENCY_MAX_ENTRIES and IDEMPOTENCY_MAX_BYTES of compressed data:
+image responses carry megabytes of base64, so the entry count alone does not
+bound memory.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from config import settings
+from utils import disconnect
+
+logger = logging.getLogger(__name__)
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+_RESULTS: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_IN_FLIGHT: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_STATS: Dict[str, int] = {
+    "executed": 0,
+    "replayedStored": 0,
+    "attachedInFlight": 0,
+    "conflicts": 0,
+    "detached": 0,
+    "notStored": 0,
+    "evicted": 0,
+    "rawBytes": 0,
+    "storedBytes": 0,
+}
+
+
+class IdempotencyConflict(ValueError):
+    """The key was already used for a different request body."""
+
+
+def fingerprint(request: BaseModel) -> str:
+    canonical = json.dumps(request.model_dump(mode="json"), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _purge_expired(now: float) -> None:
+    for entry_key in [entry_key for entry_key, entry in _RESULTS.items() if entry["expires"] <= now]:
+        _RESULTS.pop(entry_key, None)
+
+
+def _stored_bytes() -> int:
+    return sum(len(entry["blob"]) for entry in _RESULTS.values())
+
+
+def _store(entry_key: Tuple[str, str], request_fingerprint: str, payload: Dict[str, Any]) -> None:
+    raw = json.dumps(payload, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+    blob = zlib.compress(raw, 6)
+    max_bytes = max(0, settings.IDEMPOTENCY_MAX_BYTES)
+    if len(blob) > max_bytes:
+        _STATS["notStored"] += 1
+        logger.warning("idempotency_not_stored key=%s bytes=%s reason=over_max_bytes", entry_key[1], len(blob))
+        return
+    now = time.time()
+    _RESULTS[entry_key] = {
+        "fingerprint": request_fingerprint,
+        "blob": blob,
+        "expires": now + settings.IDEMPOTENCY_RETENTION_SECONDS,
+    }
+    _RESULTS.move_to_end(entry_key)
+    total = _stored_bytes()
+    while len(_RESULTS) > max(1, settings.IDEMPOTENCY_MAX_ENTRIES) or total > max_bytes:
+        _evicted_key, evicted = _RESULTS.popitem(last=False)
+        total -= len(evicted["blob"])
+        _STATS["evicted"] += 1
+    _STATS["rawBytes"] += len(raw)
+    _STATS["storedBytes"] += len(blob)
+
+
+def _stored(entry_key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    entry = _RESULTS.get(entry_key)
+    if entry is None:
+        return None
+    if entry["expires"] <= time.time():
+        _RESULTS.pop(entry_key, None)
+        return None
+    _RESULTS.move_to_end(entry_key)
+    return entry
+
+
+def _check(entry: Dict[str, Any], request_fingerprint: str, scope: str, key: str) -> None:
+    if entry["fingerprint"] != request_fingerprint:
+        _STATS["conflicts"] += 1
+        logger.warning("idempotency_conflict scope=%s key=%s", scope, key)
+        raise IdempotencyConflict("Idempotency-Key was already used with a different request body")
+
+
+async def _execute_and_store(
+    entry_key: Tuple[str, str],
+    request_fingerprint: str,
+    execute: Callable[[], Awaitable[BaseModel]],
+    storable: Optional[Callable[[Dict[str, Any]], bool]],
+) -> Dict[str, Any]:
+    try:
+        payload = (await execute()).model_dump(mode="json")
+        if storable is None or storable(payload):
+            _store(entry_key, request_fingerprint, payload)
+        else:
+            _STATS["notStored"] += 1
+            logger.info("idempotency_not_stored scope=%s key=%s reason=not_storable", *entry_key)
+        return payload
+    finally:
+        _IN_FLIGHT.pop(entry_key, None)
+
+
+async def _await_flight(flight: Dict[str, Any], scope: str, key: str) -> Dict[str, Any]:
+    flight["waiters"] += 1
+    try:
+        return await asyncio.shield(flight["task"])
+    finally:
+        flight["waiters"] -= 1
+        if not flight["task"].done():
+            disconnect.mark_detached()  # this caller leaves, the execution does not
+        if flight["waiters"] == 0 and not flight["task"].done():
+            # Every caller disconnected; keep running so a retry finds the result
+            _STATS["detached"] += 1
+            logger.info("idempotency_detached scope=%s key=%s", scope, key)
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()  # mark retrieved; waiters (if any) re-raise it themselves
+
+
+async def run_idempotent(
+    scope: str,
+    key: Optional[str],
+    request: BaseModel,
+    execute: Callable[[], Awaitable[ResponseModel]],
+    response_model: Type[ResponseModel],
+    storable: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> Tuple[ResponseModel, Optional[str]]:
+    """
+    Run `execute()` at most once per (scope, key) within the retention window.
+
+    Returns the response and how it was served: None (executed now),
+    "stored" or "in-flight". Without a key (or with IDEMPOTENCY_ENABLED off)
+    this is just `await execute()`. A response for which `storable(payload)`
+    is false is still shared with in-flight retries but not kept afterwards.
+    """
+    if not key or not settings.IDEMPOTENCY_ENABLED:
+        return await execute(), None
+
+    entry_key = (scope, key)
+    request_fingerprint = fingerprint(request)
+    _purge_expired(time.time())
+
+    entry = _stored(entry_key)
+    if entry is not None:
+        _check(entry, request_fingerprint, scope, key)
+        _STATS["replayedStored"] += 1
+        logger.info("idempotency_replay scope=%s key=%s source=stored", scope, key)
+        return response_model.model_validate(json.loads(zlib.decompress(entry["blob"]))), "stored"
+
+    flight = _IN_FLIGHT.get(entry_key)
+    if flight is not None:
+        _check(flight, request_fingerprint, scope, key)
+        _STATS["attachedInFlight"] += 1
+        logger.info("idempotency_replay scope=%s key=%s source=in-flight", scope, key)
+        return response_model.model_validate(await _await_flight(flight, scope, key)), "in-flight"
+
+    task = asyncio.create_task(_execute_and_store(entry_key, request_fingerprint, execute, storable))
+    task.add_done_callback(_retrieve)
+    flight = {"fingerprint": request_fingerprint, "task": task, "waiters": 0}
+    _IN_FLIGHT[entry_key] = flight
+    _STATS["executed"] += 1
+    return response_model.model_validate(await _await_flight(flight, scope, key)), None
+
+
+def get_idempotency_stats() -> Dict[str, Any]:
+    return {
+        "stored": len(_RESULTS),
+        "inFlight": len(_IN_FLIGHT),
+        "bytes": _stored_bytes(),
+        **_STATS,
+        "compressionRatio": round(_STATS["storedBytes"] / _STATS["rawBytes"], 3) if _STATS["rawBytes"] else None,
+    }
+
+
+def reset_idempotency() -> None:
+    _RESULTS.clear()
+    _IN_FLIGHT.clear()
+    for name in _STATS:
+        _STATS[name] = 0
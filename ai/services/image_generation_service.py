@@ -8,6 +8,7 @@ from urllib.parse import urlparse
 import httpx
 
 from config import settings
+from utils import deadline
 
 logger = logging.getLogger(__name__)
 
@@ -262,7 +263,7 @@ async def generate_with_together(prompt: str, size: str, style: Optional[str] =
 
     logger.info("image_provider=together model=%s size=%sx%s", settings.TOGETHER_IMAGE_MODEL, width, height)
 
-    async with httpx.AsyncClient(timeout=settings.TOGETHER_IMAGE_TIMEOUT_SECONDS) as client:
+    async with httpx.AsyncClient(timeout=deadline.cap(settings.TOGETHER_IMAGE_TIMEOUT_SECONDS)) as client:
         response = await client.post(
             "https://api.together.xyz/v1/images/generations",
             headers={
@@ -302,8 +303,12 @@ async def generate_with_together(prompt: str, size: str, style: Optional[str] =
 
 async def poll_kie_task(task_id: str, headers: Dict[str, str]) -> Dict:
     max_polls = max(1, settings.KIE_POLL_TIMEOUT_SECONDS // max(settings.KIE_POLL_DELAY_SECONDS, 1))
-    async with httpx.AsyncClient(timeout=settings.KIE_POLL_REQUEST_TIMEOUT_SECONDS) as client:
+    async with httpx.AsyncClient(timeout=deadline.cap(settings.KIE_POLL_REQUEST_TIMEOUT_SECONDS)) as client:
         for attempt in range(max_polls):
+            left = deadline.remaining()
+            if left is not None and left < settings.KIE_POLL_DELAY_SECONDS:
+                deadline.degrade("image", "stopped polling kie.ai")
+                raise RuntimeError(f"kie.ai task {task_id} not finished before the request deadline")
             await asyncio.sleep(settings.KIE_POLL_DELAY_SECONDS)
             response = await client.get(
                 f"{KIE_BASE_URL}/jobs/recordInfo",
@@ -362,7 +367,7 @@ async def generate_with_kie(prompt: str, platform: str, style: Optional[str] = N
 
     logger.info("image_provider=kie model=%s size=%s", settings.KIE_MODEL, image_size)
 
-    async with httpx.AsyncClient(timeout=settings.KIE_CREATE_TIMEOUT_SECONDS) as client:
+    async with httpx.AsyncClient(timeout=deadline.cap(settings.KIE_CREATE_TIMEOUT_SECONDS)) as client:
         response = await client.post(
             f"{KIE_BASE_URL}/jobs/createTask",
             headers=headers,
@@ -435,7 +440,7 @@ async def generate_with_huggingface(prompt: str, size: str, style: Optional[str]
 
     logger.info("image_provider=huggingface model=%s size=%sx%s", settings.HUGGINGFACE_IMAGE_MODEL, width, height)
 
-    async with httpx.AsyncClient(timeout=settings.HUGGINGFACE_IMAGE_TIMEOUT_SECONDS) as client:
+    async with httpx.AsyncClient(timeout=deadline.cap(settings.HUGGINGFACE_IMAGE_TIMEOUT_SECONDS)) as client:
         response = await client.post(
             model_url,
             headers={
@@ -498,6 +503,9 @@ def generate_placeholder(prompt: str, size: str) -> Dict:
 async def generate_alt_text(prompt: str, language: str = "en") -> str:
     if not settings.GROQ_API_KEY:
         return fallback_alt_text(prompt, language)
+    if deadline.tight("image"):
+        deadline.degrade("image", "template alt text")
+        return fallback_alt_text(prompt, language)
 
     system_prompt = (
         f"You write concise, SEO-friendly image alt text in {language}. "
@@ -514,7 +522,7 @@ async def generate_alt_text(prompt: str, language: str = "en") -> str:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with httpx.AsyncClient(timeout=deadline.cap(10)) as client:
             response = await client.post(
                 "https://api.groq.com/openai/v1/chat/completions",
                 headers={
@@ -556,6 +564,11 @@ async def generate_image(
     )
 
     for provider in provider_order:
+        left = deadline.remaining()
+        if left is not None and left <= 0:
+            deadline.degrade("image", "placeholder after deadline")
+            errors.append({"provider": provider, "error": "request deadline reached"})
+            continue
         try:
             if provider == "together":
                 result = await generate_with_together(prompt, resolved_size, normalized_style)
@@ -0,0 +1,332 @@
+"""
+Durable job queue for scheduled and bulk generation.
+
+Scheduled posts do not need interactive latency, but they used to go through
+the same request path as live users and time out on slow providers. Jobs are
+now stored in SQLite (JOB_QUEUE_PATH) and run by separate worker processes
+(`python -m workers.job_worker`):
+
+- priority classes: "interactive" jobs are always claimed before
+  "scheduled" ones, oldest first within a class
+- a claim is a lease (JOB_LEASE_SECONDS) that the worker keeps extending;
+  a lease that runs out (the worker died, e.g. OOM-killed) counts as a
+  failed attempt, so a job that keeps killing its worker is not reclaimed
+  forever
+- a failed attempt is retried after an exponential backoff with jitter
+  (JOB_RETRY_BASE_SECONDS doubling, capped at JOB_RETRY_MAX_SECONDS) until
+  maxAttempts, then the job is marked failed
+- workers checkpoint per-item progress, so a retried job only redoes the
+  items that have not succeeded yet
+
+All functions are synchronous and short; async callers run them on the
+"jobs" blocking pool.
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"interactive": 0, "scheduled": 10}
+PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority, run_after, created_at);
+"""
+
+_INITIALIZED: set = set()
+_INIT_LOCK = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    path = settings.JOB_QUEUE_PATH
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if path not in _INITIALIZED:
+        with _INIT_LOCK:
+            if path not in _INITIALIZED:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                _INITIALIZED.add(path)
+    return conn
+
+
+def _loads(value: Optional[str]) -> Any:
+    return json.loads(value) if value else None
+
+
+def _public(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+    if row is None:
+        return None
+    return {
+        "id": row["id"],
+        "kind": row["kind"],
+        "payload": _loads(row["payload"]),
+        "priority": PRIORITY_NAMES.get(row["priority"], str(row["priority"])),
+        "status": row["status"],
+        "attempts": row["attempts"],
+        "maxAttempts": row["max_attempts"],
+        "runAfter": row["run_after"],
+        "leaseUntil": row["lease_until"],
+        "worker": row["worker"],
+        "progress": _loads(row["progress"]),
+        "result": _loads(row["result"]),
+        "error": row["error"],
+        "createdAt": row["created_at"],
+        "updatedAt": row["updated_at"],
+        "finishedAt": row["finished_at"],
+    }
+
+
+def new_progress(total: int) -> Dict[str, Any]:
+    return {"total": total, "results": {}, "errors": {}}
+
+
+def progress_counts(progress: Optional[Dict[str, Any]], total: int) -> Dict[str, int]:
+    progress = progress or new_progress(total)
+    return {"total": total, "done": len(progress["results"]), "failed": len(progress["errors"])}
+
+
+def progress_items(progress: Optional[Dict[str, Any]], total: int) -> List[Dict[str, Any]]:
+    """Per-item outcomes in item order; items not attempted yet are "pending"."""
+    progress = progress or new_progress(total)
+    items = []
+    for index in range(total):
+        key = str(index)
+        if key in progress["results"]:
+            items.append({"index": index, "status": "ok", "result": progress["results"][key]})
+        elif key in progress["errors"]:
+            items.append({"index": index, "status": "error", "error": progress["errors"][key]})
+        else:
+            items.append({"index": index, "status": "pending"})
+    return items
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next attempt after `attempts` failed ones (+-20% jitter)."""
+    base = settings.JOB_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1))
+    return min(settings.JOB_RETRY_MAX_SECONDS, base) * random.uniform(0.8, 1.2)
+
+
+def submit(kind: str, payload: Dict[str, Any], priority: str = "scheduled", max_attempts: Optional[int] = None) -> Dict[str, Any]:
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority class {priority!r}")
+    now = time.time()
+    job_id = uuid.uuid4().hex
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, payload, priority, status, max_attempts, run_after, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (
+                job_id,
+                kind,
+                json.dumps(payload, default=str),
+                PRIORITIES[priority],
+                max(1, max_attempts or settings.JOB_MAX_ATTEMPTS),
+                now,
+                now,
+                now,
+            ),
+        )
+        logger.info("job_submitted id=%s kind=%s priority=%s", job_id, kind, priority)
+        return _public(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def get(job_id: str) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    try:
+        return _public(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def _expire_leases(conn: sqlite3.Connection, now: float) -> None:
+    """Running jobs whose lease ran out lost their worker: retry after a backoff or fail them."""
+    expired = conn.execute(
+        "SELECT id, attempts, max_attempts FROM jobs WHERE status = 'running' AND lease_until < ?", (now,)
+    ).fetchall()
+    for row in expired:
+        error = "lease expired: worker stopped before finishing the job"
+        if row["attempts"] < row["max_attempts"]:
+            delay = retry_delay(row["attempts"])
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, lease_until = NULL, worker = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (error, now + delay, now, row["id"]),
+            )
+            logger.warning("job_lease_expired id=%s attempt=%s retry_in=%.1fs", row["id"], row["attempts"], delay)
+        else:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_until = NULL, updated_at = ?, finished_at = ? "
+                "WHERE id = ?",
+                (error, now, now, row["id"]),
+            )
+            logger.error("job_failed id=%s attempts=%s error=%s", row["id"], row["attempts"], error)
+
+
+def claim(worker_id: str, priorities: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Lease the next queued job that is due. Expired leases are settled first
+    (as failed attempts). Returns None when nothing is runnable.
+    """
+    now = time.time()
+    allowed = [PRIORITIES[name] for name in (priorities or PRIORITIES)]
+    placeholders = ",".join("?" for _ in allowed)
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        _expire_leases(conn, now)
+        row = conn.execute(
+            f"""
+            SELECT id FROM jobs
+            WHERE priority IN ({placeholders}) AND status = 'queued' AND run_after <= ?
+            ORDER BY priority, created_at
+            LIMIT 1
+            """,
+            (*allowed, now),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, lease_until = ?, updated_at = ? "
+            "WHERE id = ?",
+            (worker_id, now + settings.JOB_LEASE_SECONDS, now, row["id"]),
+        )
+        job = _public(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    logger.info("job_claimed id=%s kind=%s worker=%s attempt=%s", job["id"], job["kind"], worker_id, job["attempts"])
+    return job
+
+
+def _update_running(job_id: str, worker_id: str, sql: str, params: tuple) -> bool:
+    """Apply an update only while `worker_id` still holds the job's lease."""
+    conn = _connect()
+    try:
+        cursor = conn.execute(f"{sql} WHERE id = ? AND worker = ? AND status = 'running'", (*params, job_id, worker_id))
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def heartbeat(job_id: str, worker_id: str) -> bool:
+    now = time.time()
+    return _update_running(
+        job_id, worker_id, "UPDATE jobs SET lease_until = ?, updated_at = ?", (now + settings.JOB_LEASE_SECONDS, now)
+    )
+
+
+def save_progress(job_id: str, worker_id: str, progress: Dict[str, Any]) -> bool:
+    return _update_running(
+        job_id, worker_id, "UPDATE jobs SET progress = ?, updated_at = ?", (json.dumps(progress, default=str), time.time())
+    )
+
+
+def complete(job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+    now = time.time()
+    done = _update_running(
+        job_id,
+        worker_id,
+        "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, lease_until = NULL, updated_at = ?, finished_at = ?",
+        (json.dumps(result, default=str), now, now),
+    )
+    if done:
+        logger.info("job_succeeded id=%s", job_id)
+    return done
+
+
+def fail(job_id: str, worker_id: str, error: str, result: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Record a failed attempt. Returns the new status ("queued" for a retry,
+    "failed" once attempts are exhausted) or None if the lease was lost.
+    """
+    job = get(job_id)
+    if job is None:
+        return None
+    now = time.time()
+    result_json = json.dumps(result, default=str) if result is not None else None
+    if job["attempts"] < job["maxAttempts"]:
+        delay = retry_delay(job["attempts"])
+        updated = _update_running(
+            job_id,
+            worker_id,
+            "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, lease_until = NULL, worker = NULL, updated_at = ?",
+            (error, now + delay, now),
+        )
+        status = "queued"
+        logger.warning("job_retry id=%s attempt=%s delay=%.1fs error=%s", job_id, job["attempts"], delay, error)
+    else:
+        updated = _update_running(
+            job_id,
+            worker_id,
+            "UPDATE jobs SET status = 'failed', error = ?, result = ?, lease_until = NULL, updated_at = ?, finished_at = ?",
+            (error, result_json, now, now),
+        )
+        status = "failed"
+        logger.error("job_failed id=%s attempts=%s error=%s", job_id, job["attempts"], error)
+    return status if updated else None
+
+
+def cancel(job_id: str) -> bool:
+    """Cancel a job that has not started running; running jobs finish their attempt."""
+    now = time.time()
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'cancelled', updated_at = ?, finished_at = ? WHERE id = ? AND status = 'queued'",
+            (now, now, job_id),
+        )
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def get_job_queue_stats() -> Dict[str, Any]:
+    if not os.path.exists(settings.JOB_QUEUE_PATH):
+        return {"path": settings.JOB_QUEUE_PATH, "jobs": {}}
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT priority, status, COUNT(*) AS n FROM jobs GROUP BY priority, status").fetchall()
+    finally:
+        conn.close()
+    jobs: Dict[str, Dict[str, int]] = {}
+    for row in rows:
+        jobs.setdefault(PRIORITY_NAMES.get(row["priority"], str(row["priority"])), {})[row["status"]] = row["n"]
+    return {"path": settings.JOB_QUEUE_PATH, "jobs": jobs}
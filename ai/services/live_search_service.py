@@ -6,13 +6,17 @@ Uses DuckDuckGo for unlimited searches and temporary RAG for keyword extraction.
 import asyncio
 import httpx
 import logging
-from typing import List, Dict, Set
-from bs4 import BeautifulSoup
+from typing import List, Dict, Set, Tuple
 from sklearn.cluster import KMeans
 from sklearn.feature_extraction.text import TfidfVectorizer
 import re
 from urllib.parse import urlparse
 
+from services.blocking_io import run_blocking
+from services.cpu_executor import run_cpu
+from services.cpu_tasks import cluster_keywords_task, extract_main_content_task
+from utils import deadline, singleflight
+
 # Import ddgs conditionally (not always needed)
 try:
     from ddgs import DDGS
@@ -25,6 +29,7 @@ logger = logging.getLogger(__name__)
 # Timeout settings
 SEARCH_TIMEOUT = 10  # seconds per search
 SCRAPE_TIMEOUT = 8   # seconds per URL
+CLUSTER_INLINE_MAX_PHRASES = 20  # smaller phrase sets cluster faster inline than in the pool
 SCRAPE_HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -252,11 +257,16 @@ def expand_keywords(keywords: List[str]) -> List[str]:
 
 async def search_ddg(query: str, max_results: int = 5) -> List[Dict]:
     """
-    Search DuckDuckGo with timeout protection.
+    Search DuckDuckGo with timeout protection. Identical concurrent queries
+    share one search (utils.singleflight).
     
     Returns:
         List of {"title": str, "url": str, "snippet": str}
     """
+    return await singleflight.run("search", ("ddg", query, max_results), _search_ddg, query, max_results)
+
+
+async def _search_ddg(query: str, max_results: int) -> List[Dict]:
     if not DDGS_AVAILABLE:
         logger.warning("DDGS not available, returning empty results")
         return []
@@ -264,18 +274,12 @@ async def search_ddg(query: str, max_results: int = 5) -> List[Dict]:
     results = []
     
     try:
-        # Run search in executor to add timeout
-        loop = asyncio.get_event_loop()
-        
         def _search():
             with DDGS() as ddgs:
                 return list(ddgs.text(query, max_results=max_results))
         
-        # Add timeout
-        search_results = await asyncio.wait_for(
-            loop.run_in_executor(None, _search),
-            timeout=SEARCH_TIMEOUT
-        )
+        # Run search on the dedicated DDGS pool with a timeout
+        search_results = await run_blocking("ddgs", _search, timeout=deadline.cap(SEARCH_TIMEOUT))
         
         for r in search_results:
             results.append({
@@ -294,20 +298,27 @@ async def search_ddg(query: str, max_results: int = 5) -> List[Dict]:
     return results
 
 
-async def scrape_url(url: str, session: httpx.AsyncClient) -> Dict:
+async def scrape_url(url: str) -> Dict:
     """
-    Scrape a single URL with timeout and error handling.
+    Scrape a single URL with timeout and error handling. Concurrent scrapes of
+    the same URL share one fetch, which owns its HTTP client: a caller that is
+    cancelled (e.g. its client disconnected) cannot close it under the others.
     
     Returns:
         {"url": str, "title": str, "content": str} or None if failed
     """
+    return await singleflight.run("scrape", url, _scrape_url, url)
+
+
+async def _scrape_url(url: str) -> Dict:
     try:
-        response = await session.get(
-            url,
-            timeout=SCRAPE_TIMEOUT,
-            follow_redirects=True,
-            headers=SCRAPE_HEADERS,
-        )
+        async with httpx.AsyncClient() as session:
+            response = await session.get(
+                url,
+                timeout=deadline.cap(SCRAPE_TIMEOUT),
+                follow_redirects=True,
+                headers=SCRAPE_HEADERS,
+            )
         
         if response.status_code != 200:
             if response.status_code in {401, 403, 429}:
@@ -316,40 +327,21 @@ async def scrape_url(url: str, session: httpx.AsyncClient) -> Dict:
                 logger.warning(f"scrape_url: Got status {response.status_code} for {url}")
             return None
         
-        # Parse HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-        
-        # Extract title
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else url
-        
-        # Extract main content
-        # Try common content containers
-        content = ""
-        for selector in ['article', 'main', '.content', '#content', '.post', '.entry']:
-            container = soup.select_one(selector)
-            if container:
-                content = container.get_text(separator=' ', strip=True)
-                break
-        
-        # Fallback to body
-        if not content:
-            body = soup.find('body')
-            if body:
-                content = body.get_text(separator=' ', strip=True)
-        
-        # Clean and truncate
-        content = ' '.join(content.split())  # Normalize whitespace
-        content = content[:5000]  # Limit to 5000 chars
-
-        if len(content) < 200:
-            logger.info(f"scrape_url: Insufficient extracted content for {url} ({len(content)} chars)")
+        extracted = await run_cpu(
+            "extract_main_content",
+            extract_main_content_task,
+            response.text,
+            url,
+            5000,
+            size=len(response.text),
+        )
+        if not extracted:
+            logger.info(f"scrape_url: Insufficient extracted content for {url}")
             return None
 
+        title_text = extracted["title"]
+        content = extracted["content"]
+
         logger.info(f"scrape_url: Successfully scraped {url} ({len(content)} chars)")
         
         return {
@@ -381,6 +373,11 @@ def _build_snippet_fallback(item: Dict) -> Dict | None:
     }
 
 
+def snippet_docs(ranked: List[Dict]) -> List[Dict]:
+    """Search results as documents built from their snippets alone (no page fetch)."""
+    return [doc for doc in (_build_snippet_fallback(item) for item in ranked) if doc]
+
+
 async def search_and_scrape(queries: List[str], max_urls: int = 10) -> List[Dict]:
     """
     Search multiple queries and scrape top results in parallel.
@@ -392,6 +389,14 @@ async def search_and_scrape(queries: List[str], max_urls: int = 10) -> List[Dict
     Returns:
         List of {"url": str, "title": str, "content": str}
     """
+    ranked = await search_ranked(queries, max_urls=max_urls)
+    if not ranked:
+        return []
+    return await scrape_ranked(ranked)
+
+
+async def search_ranked(queries: List[str], max_urls: int = 10) -> List[Dict]:
+    """Step 1 of search_and_scrape: search up to 3 queries concurrently and rank the unique results."""
     logger.info(f"search_and_scrape: Processing {len(queries)} queries, max_urls={max_urls}")
     
     # Step 1: Search all queries concurrently
@@ -423,8 +428,11 @@ async def search_and_scrape(queries: List[str], max_urls: int = 10) -> List[Dict
         return []
     
     # Rank URLs before scraping so stronger sources win first.
-    all_urls = _rank_search_results(all_urls, max_urls=max_urls)
-    
+    return _rank_search_results(all_urls, max_urls=max_urls)
+
+
+async def scrape_ranked(all_urls: List[Dict]) -> List[Dict]:
+    """Step 2 of search_and_scrape: fetch ranked results; pages that cannot be scraped fall back to their snippet."""
     logger.info(
         "search_and_scrape: Scraping %s ranked URLs domains=%s",
         len(all_urls),
@@ -435,24 +443,28 @@ async def search_and_scrape(queries: List[str], max_urls: int = 10) -> List[Dict
     scraped = []
     snippet_fallbacks = 0
     
-    async with httpx.AsyncClient() as session:
-        # Process in batches of 5
-        for i in range(0, len(all_urls), 5):
-            batch = all_urls[i:i+5]
-            
-            tasks = [scrape_url(item["url"], session) for item in batch]
+    # Process in batches of 5
+    for i in range(0, len(all_urls), 5):
+        batch = all_urls[i:i+5]
+        
+        if deadline.tight("scrape"):
+            # Not enough request budget left to fetch pages: the search snippets have to do
+            deadline.degrade("scrape", "search snippets instead of scraping")
+            results = [None] * len(batch)
+        else:
+            tasks = [scrape_url(item["url"]) for item in batch]
             results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for item, result in zip(batch, results):
-                if isinstance(result, dict) and result:
-                    scraped.append(result)
-                    continue
-
-                snippet_doc = _build_snippet_fallback(item)
-                if snippet_doc:
-                    snippet_fallbacks += 1
-                    scraped.append(snippet_doc)
-                    logger.info(f"search_and_scrape: Using snippet fallback for {item['url']}")
+        
+        for item, result in zip(batch, results):
+            if isinstance(result, dict) and result:
+                scraped.append(result)
+                continue
+
+            snippet_doc = _build_snippet_fallback(item)
+            if snippet_doc:
+                snippet_fallbacks += 1
+                scraped.append(snippet_doc)
+                logger.info(f"search_and_scrape: Using snippet fallback for {item['url']}")
     
     logger.info(
         f"search_and_scrape: Prepared {len(scraped)} usable sources from {len(all_urls)} URLs "
@@ -484,6 +496,29 @@ def extract_noun_phrases(text: str) -> List[str]:
     return phrases
 
 
+def cluster_keyword_phrases(unique_phrases: List[str], top_n: int) -> Tuple[List[str], int]:
+    """TF-IDF + K-means over candidate phrases; CPU-bound, run via the CPU pool."""
+    # TF-IDF vectorization
+    vectorizer = TfidfVectorizer(max_features=50, stop_words='english')
+    tfidf_matrix = vectorizer.fit_transform(unique_phrases)
+
+    # K-means clustering (2-5 clusters)
+    n_clusters = min(5, max(2, len(unique_phrases) // 10))
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    kmeans.fit(tfidf_matrix)
+
+    # Get top phrases from each cluster
+    keywords = []
+    for cluster_id in range(n_clusters):
+        cluster_phrases = [unique_phrases[i] for i in range(len(unique_phrases)) if kmeans.labels_[i] == cluster_id]
+
+        # Take top 4 from each cluster
+        keywords.extend(cluster_phrases[:4])
+
+    # Deduplicate and limit
+    return list(dict.fromkeys(keywords))[:top_n], n_clusters
+
+
 async def extract_keywords_rag(scraped_data: List[Dict], top_n: int = 20) -> Dict:
     """
     Extract keywords using temporary RAG (K-means clustering).
@@ -535,26 +570,22 @@ async def extract_keywords_rag(scraped_data: List[Dict], top_n: int = 20) -> Dic
             "sources": [d["url"] for d in scraped_data]
         }
     
+    if deadline.tight("keywords"):
+        deadline.degrade("keywords", "longest phrases instead of clustering")
+        return {
+            "keywords": sorted(unique_phrases, key=len, reverse=True)[:top_n],
+            "sources": [d["url"] for d in scraped_data]
+        }
+
     try:
-        # TF-IDF vectorization
-        vectorizer = TfidfVectorizer(max_features=50, stop_words='english')
-        tfidf_matrix = vectorizer.fit_transform(unique_phrases)
-        
-        # K-means clustering (2-5 clusters)
-        n_clusters = min(5, max(2, len(unique_phrases) // 10))
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        kmeans.fit(tfidf_matrix)
-        
-        # Get top phrases from each cluster
-        keywords = []
-        for cluster_id in range(n_clusters):
-            cluster_phrases = [unique_phrases[i] for i in range(len(unique_phrases)) if kmeans.labels_[i] == cluster_id]
-            
-            # Take top 4 from each cluster
-            keywords.extend(cluster_phrases[:4])
-        
-        # Deduplicate and limit
-        keywords = list(dict.fromkeys(keywords))[:top_n]
+        keywords, n_clusters = await run_cpu(
+            "keyword_clustering",
+            cluster_keywords_task,
+            unique_phrases,
+            top_n,
+            size=len(unique_phrases),
+            inline_below=CLUSTER_INLINE_MAX_PHRASES,
+        )
         
         logger.info(f"extract_keywords_rag: Extracted {len(keywords)} keywords from {n_clusters} clusters")
         
@@ -0,0 +1,161 @@
+"""
+Hedged JSON generation: first valid response wins.
+
+The primary provider (as chosen by llm_router) gets LLM_HEDGE_DELAY_SECONDS
+to answer on its own. After that a second request goes to the task's
+alternative provider, and whichever response passes the caller's
+`validate` first is used; the other request is cancelled. If neither passes,
+the first response that parsed at all is returned so the normal repair
+round still applies.
+
+Every hedge is an extra paid call, so the hedge rate, wins per leg and
+end-to-end latency percentiles are kept for GET /metrics.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from services import llm_router
+from services.gemini_service import _record_llm_execution, get_last_llm_execution
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 200
+
+_STATS: Dict[str, Any] = {
+    "requests": 0,
+    "hedged": 0,
+    "primaryWins": 0,
+    "hedgeWins": 0,
+    "noValidResponse": 0,
+    "cancelledLegs": 0,
+    "latencies": deque(maxlen=LATENCY_WINDOW),
+}
+
+
+async def _run_leg(task: str, provider: str, messages, max_tokens: int, temperature: float, required_keys=None):
+    """One hedge leg; returns its parsed JSON plus the routing/execution state it set in its own context."""
+    llm_router.reset_routing()
+    data = await llm_router.call_routed_json(
+        task,
+        messages,
+        max_tokens,
+        temperature,
+        provider=provider,
+        failover=False,
+        required_keys=required_keys,
+    )
+    return data, llm_router.capture_routing(), get_last_llm_execution()
+
+
+def _adopt(result) -> Dict[str, Any]:
+    data, decisions, execution = result
+    llm_router.restore_routing(decisions)
+    _record_llm_execution(execution["provider"], execution["model"])
+    return data
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+
+async def hedged_json(
+    task: str,
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    temperature: float,
+    validate: Callable[[Dict[str, Any]], bool],
+    required_keys: Optional[List[str]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Returns (data, hedge_info) where hedge_info says whether a hedge was sent
+    and which leg won.
+    """
+    started = time.perf_counter()
+    _STATS["requests"] += 1
+    primary = llm_router.choose_provider(task)["provider"]
+    alternative = llm_router.alternative_for(task, primary)
+    info: Dict[str, Any] = {"primary": primary, "hedged": False, "winner": "primary"}
+    legs = {
+        asyncio.create_task(_run_leg(task, primary, messages, max_tokens, temperature, required_keys)): "primary",
+    }
+
+    def start_hedge(why: str) -> None:
+        logger.info("llm_hedge_start task=%s primary=%s hedge=%s reason=%s", task, primary, alternative, why)
+        legs[asyncio.create_task(_run_leg(task, alternative, messages, max_tokens, temperature, required_keys))] = "hedge"
+        info.update({"hedged": True, "hedge": alternative})
+        _STATS["hedged"] += 1
+
+    fallback_result = None
+    first_error: Optional[BaseException] = None
+    try:
+        done, pending = await asyncio.wait(legs, timeout=settings.LLM_HEDGE_DELAY_SECONDS)
+        if not done and alternative:
+            start_hedge(f"no answer after {settings.LLM_HEDGE_DELAY_SECONDS}s")
+            pending = set(legs)
+
+        while done or pending:
+            for leg in done:
+                if leg.exception() is not None:
+                    first_error = first_error or leg.exception()
+                    logger.warning("llm_hedge_leg_failed leg=%s error=%s", legs[leg], leg.exception())
+                    if not info["hedged"] and alternative:
+                        start_hedge("primary failed")
+                        pending = {running for running in legs if not running.done()}
+                    continue
+                result = leg.result()
+                if validate(result[0]):
+                    info["winner"] = legs[leg]
+                    _STATS["hedgeWins" if legs[leg] == "hedge" else "primaryWins"] += 1
+                    return _adopt(result), info
+                if fallback_result is None:
+                    fallback_result = (legs[leg], result)
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for leg in legs:
+            if not leg.done():
+                leg.cancel()
+                _STATS["cancelledLegs"] += 1
+        _STATS["latencies"].append((time.perf_counter() - started) * 1000)
+
+    if fallback_result is None:
+        raise first_error
+    _STATS["noValidResponse"] += 1
+    info["winner"] = fallback_result[0]
+    info["valid"] = False
+    return _adopt(fallback_result[1]), info
+
+
+def get_hedge_stats() -> Dict[str, Any]:
+    requests = max(_STATS["requests"], 1)
+    latencies = list(_STATS["latencies"])
+    return {
+        "enabled": settings.LLM_HEDGE_ENABLED,
+        "delaySeconds": settings.LLM_HEDGE_DELAY_SECONDS,
+        "requests": _STATS["requests"],
+        "hedged": _STATS["hedged"],
+        "hedgeRate": round(_STATS["hedged"] / requests, 3),
+        "primaryWins": _STATS["primaryWins"],
+        "hedgeWins": _STATS["hedgeWins"],
+        "noValidResponse": _STATS["noValidResponse"],
+        "cancelledLegs": _STATS["cancelledLegs"],
+        "latencyP50Ms": _percentile(latencies, 0.5),
+        "latencyP99Ms": _percentile(latencies, 0.99),
+    }
+
+
+def reset_hedge_stats() -> None:
+    for key, value in _STATS.items():
+        if isinstance(value, deque):
+            value.clear()
+        else:
+            _STATS[key] = 0
@@ -0,0 +1,391 @@
+"""
+LLM routing across Gemini and Groq.
+
+Each provider/model keeps an EWMA of latency and error rate plus a short
+window of recent latencies for p90. Every call picks a provider within its
+task's quality policy: the preferred provider is used unless it is
+unavailable (quota or open circuit, see provider_health), its p90 is over
+the task's budget, its error rate is too high, or its rate-limit headroom is
+nearly gone, and the alternative is in better shape.
+
+The decisions taken while serving a request are kept in a contextvar and
+reported in the routers' `diagnostics["routing"]`.
+"""
+
+import contextvars
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from config import settings
+from services import provider_health
+from services.gemini_service import (
+    _record_llm_execution,
+    _record_llm_usage,
+    call_gemini,
+    call_gemini_json,
+    call_groq,
+    get_last_llm_execution,
+    get_last_llm_usage,
+    reset_llm_usage,
+    stream_gemini,
+    stream_groq,
+)
+from utils import deadline, singleflight
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 50
+
+# Per-task quality policy: which provider the task prefers, which one it may
+# move to, and the settings attribute holding its p90 latency budget.
+TASK_POLICIES: Dict[str, Dict[str, str]] = {
+    "content": {"preferred": "gemini", "alternative": "groq", "p90_budget": "LLM_ROUTER_CONTENT_MAX_P90_SECONDS"},
+    "topics": {"preferred": "groq", "alternative": "gemini", "p90_budget": "LLM_ROUTER_TOPICS_MAX_P90_SECONDS"},
+}
+
+_STATS: Dict[str, Dict[str, Any]] = {}
+ROUTING_DECISIONS: contextvars.ContextVar = contextvars.ContextVar("llm_routing_decisions", default=())
+
+
+def _model_for(provider: str) -> str:
+    return settings.GEMINI_MODEL if provider == "gemini" else settings.GROQ_MODEL
+
+
+def _is_configured(provider: str) -> bool:
+    return bool(settings.GEMINI_API_KEY if provider == "gemini" else settings.GROQ_API_KEY)
+
+
+def _stats(provider: str, model: str) -> Dict[str, Any]:
+    return _STATS.setdefault(f"{provider}:{model}", {
+        "calls": 0,
+        "errors": 0,
+        "ewmaLatencyMs": None,
+        "ewmaErrorRate": 0.0,
+        "latencies": deque(maxlen=LATENCY_WINDOW),
+        "routed": 0,
+        "rerouted": 0,
+    })
+
+
+def _p90(latencies: Deque[float]) -> Optional[float]:
+    if len(latencies) < settings.LLM_ROUTER_MIN_SAMPLES:
+        return None
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+
+
+def record_outcome(provider: str, model: str, latency_ms: Optional[float], ok: bool) -> None:
+    """Feed one call's outcome into the provider's EWMA latency / error rate."""
+    alpha = settings.LLM_ROUTER_EWMA_ALPHA
+    stats = _stats(provider, model)
+    stats["calls"] += 1
+    stats["ewmaErrorRate"] = (1 - alpha) * stats["ewmaErrorRate"] + alpha * (0.0 if ok else 1.0)
+    if not ok:
+        stats["errors"] += 1
+        return
+    if latency_ms is not None:
+        stats["latencies"].append(latency_ms)
+        previous = stats["ewmaLatencyMs"]
+        stats["ewmaLatencyMs"] = latency_ms if previous is None else (1 - alpha) * previous + alpha * latency_ms
+
+
+def _snapshot(provider: str) -> Dict[str, Any]:
+    model = _model_for(provider)
+    stats = _stats(provider, model)
+    p90 = _p90(stats["latencies"])
+    return {
+        "provider": provider,
+        "model": model,
+        "available": _is_configured(provider) and provider_health.is_available(provider, model),
+        "p90Ms": round(p90, 1) if p90 is not None else None,
+        "ewmaLatencyMs": round(stats["ewmaLatencyMs"], 1) if stats["ewmaLatencyMs"] is not None else None,
+        "errorRate": round(stats["ewmaErrorRate"], 3),
+        "headroom": provider_health.get_headroom(provider, model),
+    }
+
+
+def _degradation(snapshot: Dict[str, Any], p90_budget_ms: float) -> Optional[str]:
+    if not snapshot["available"]:
+        return "unavailable"
+    if snapshot["errorRate"] > settings.LLM_ROUTER_MAX_ERROR_RATE:
+        return f"error rate {snapshot['errorRate']:.2f}"
+    if snapshot["headroom"] is not None and snapshot["headroom"] < settings.LLM_ROUTER_MIN_HEADROOM:
+        return f"quota headroom {snapshot['headroom']:.2f}"
+    if snapshot["p90Ms"] is not None and snapshot["p90Ms"] > p90_budget_ms:
+        return f"p90 {snapshot['p90Ms'] / 1000:.1f}s over {p90_budget_ms / 1000:.0f}s budget"
+    return None
+
+
+def choose_provider(task: str) -> Dict[str, Any]:
+    """Pick the provider for one call of `task` and explain why."""
+    policy = TASK_POLICIES.get(task, TASK_POLICIES["content"])
+    p90_budget_ms = float(getattr(settings, policy["p90_budget"])) * 1000
+    preferred = _snapshot(policy["preferred"])
+    alternative = _snapshot(policy["alternative"])
+
+    provider, reason = preferred["provider"], "preferred"
+    problem = _degradation(preferred, p90_budget_ms)
+    if problem:
+        alternative_problem = _degradation(alternative, p90_budget_ms)
+        if alternative_problem is None:
+            provider, reason = alternative["provider"], f"{preferred['provider']} {problem}"
+        else:
+            reason = f"preferred despite {problem}; {alternative['provider']} {alternative_problem}"
+
+    return {
+        "task": task,
+        "provider": provider,
+        "model": _model_for(provider),
+        "reason": reason,
+        "rerouted": provider != policy["preferred"],
+        "candidates": {preferred["provider"]: preferred, alternative["provider"]: alternative},
+    }
+
+
+def pinned_decision(task: str, provider: str, reason: str = "pinned") -> Dict[str, Any]:
+    policy = TASK_POLICIES.get(task, TASK_POLICIES["content"])
+    return {
+        "task": task,
+        "provider": provider,
+        "model": _model_for(provider),
+        "reason": reason,
+        "rerouted": provider != policy["preferred"],
+    }
+
+
+def alternative_for(task: str, provider: str) -> Optional[str]:
+    """The other provider in `task`'s policy, if it is configured and not blocked."""
+    policy = TASK_POLICIES.get(task, TASK_POLICIES["content"])
+    other = policy["alternative"] if provider == policy["preferred"] else policy["preferred"]
+    if not _is_configured(other) or not provider_health.is_available(other, _model_for(other)):
+        return None
+    return other
+
+
+def _remember(decision: Dict[str, Any]) -> None:
+    ROUTING_DECISIONS.set(ROUTING_DECISIONS.get() + (decision,))
+
+
+def reset_routing() -> None:
+    """Start a fresh per-request decision log (call at the top of each generation)."""
+    ROUTING_DECISIONS.set(())
+
+
+def capture_routing() -> tuple:
+    """Raw decisions logged in the current context, for handing back from a child task."""
+    return ROUTING_DECISIONS.get()
+
+
+def restore_routing(decisions: tuple) -> None:
+    """Append decisions captured in a child task to the current context's log."""
+    ROUTING_DECISIONS.set(ROUTING_DECISIONS.get() + tuple(decisions))
+
+
+def get_routing_decisions() -> List[Dict[str, Any]]:
+    return [
+        {key: value for key, value in decision.items() if key != "candidates"}
+        for decision in ROUTING_DECISIONS.get()
+    ]
+
+
+async def _call_provider(provider: str, messages, max_tokens: int, temperature: float, json_mode: bool) -> str:
+    if provider == "gemini":
+        return await call_gemini(messages, max_tokens, temperature, json_mode)
+    return await call_groq(messages, max_tokens, temperature, json_mode)
+
+
+async def _call_provider_shared(provider: str, messages, max_tokens: int, temperature: float, json_mode: bool) -> str:
+    """
+    `_call_provider`, with identical concurrent prompts sharing one call. The
+    call runs in its own task, so the executed provider and token usage it
+    records are carried back into this caller's context.
+    """
+
+    async def _leader():
+        text = await _call_provider(provider, messages, max_tokens, temperature, json_mode)
+        return text, get_last_llm_execution(), get_last_llm_usage()
+
+    key = singleflight.key_for(provider, messages, max_tokens, temperature, json_mode)
+    text, executed, usage = await singleflight.run("llm", key, _leader)
+    _record_llm_execution(executed["provider"], executed["model"])
+    if usage:
+        _record_llm_usage(usage["outputTokens"], usage["truncated"])
+    return text
+
+
+async def call_routed(
+    task: str,
+    messages: List[Dict[str, str]],
+    max_tokens: int = 2000,
+    temperature: float = 0.7,
+    json_mode: bool = False,
+    provider: Optional[str] = None,
+    failover: bool = True,
+) -> str:
+    """
+    Route one LLM call for `task`. If the chosen provider fails outright, the
+    other provider is tried once before the error propagates.
+
+    `provider` pins the call instead of choosing (used by hedging), and
+    `failover=False` lets the error propagate straight away.
+    """
+    decision = choose_provider(task) if provider is None else pinned_decision(task, provider)
+    if provider is None and decision["provider"] == "gemini" and deadline.tight("llm"):
+        faster = alternative_for(task, "gemini")
+        if faster:
+            deadline.degrade("llm", f"{faster} instead of gemini")
+            decision = pinned_decision(task, faster, "request deadline")
+    provider = decision["provider"]
+    stats = _stats(provider, decision["model"])
+    stats["routed"] += 1
+    if decision["rerouted"]:
+        stats["rerouted"] += 1
+        logger.info("llm_route task=%s provider=%s reason=%s", task, provider, decision["reason"])
+
+    started = time.perf_counter()
+    reset_llm_usage()
+    try:
+        text = await _call_provider_shared(provider, messages, max_tokens, temperature, json_mode)
+    except Exception as exc:
+        record_outcome(provider, decision["model"], None, ok=False)
+        policy = TASK_POLICIES.get(task, TASK_POLICIES["content"])
+        other = policy["alternative"] if provider == policy["preferred"] else policy["preferred"]
+        if not failover or not _is_configured(other):
+            decision["executedProvider"] = provider
+            _remember(decision)
+            raise
+        logger.warning("llm_route_failover task=%s from=%s to=%s error=%s", task, provider, other, exc)
+        decision["failover"] = other
+        started = time.perf_counter()
+        try:
+            text = await _call_provider_shared(other, messages, max_tokens, temperature, json_mode)
+        except Exception:
+            record_outcome(other, _model_for(other), None, ok=False)
+            decision["executedProvider"] = other
+            _remember(decision)
+            raise
+
+    latency_ms = (time.perf_counter() - started) * 1000
+    executed = get_last_llm_execution()
+    executed_provider = executed.get("provider", provider)
+    if executed_provider == decision.get("failover", provider):
+        record_outcome(executed_provider, executed.get("model", _model_for(executed_provider)), latency_ms, ok=True)
+    else:
+        # call_gemini fell back to Groq internally: Gemini failed this call, and the
+        # mixed latency says nothing about either provider.
+        record_outcome(provider, decision["model"], None, ok=False)
+    decision["executedProvider"] = executed_provider
+    decision["latencyMs"] = round(latency_ms, 1)
+    _remember(decision)
+    return text
+
+
+async def call_routed_json(
+    task: str,
+    messages: List[Dict[str, str]],
+    max_tokens: int = 2000,
+    temperature: float = 0.7,
+    provider: Optional[str] = None,
+    failover: bool = True,
+    raw_response: Optional[str] = None,
+    required_keys: Optional[List[str]] = None,
+) -> Dict:
+    async def routed(working_messages, max_tokens, temperature, json_mode=True):
+        return await call_routed(
+            task,
+            working_messages,
+            max_tokens,
+            temperature,
+            json_mode,
+            provider=provider,
+            failover=failover,
+        )
+
+    return await call_gemini_json(
+        messages,
+        max_tokens,
+        temperature,
+        call=routed,
+        raw_response=raw_response,
+        required_keys=required_keys,
+    )
+
+
+def _stream_provider(provider: str, messages, max_tokens: int, temperature: float, json_mode: bool) -> AsyncIterator[str]:
+    if provider == "gemini":
+        return stream_gemini(messages, max_tokens, temperature, json_mode)
+    return stream_groq(messages, max_tokens, temperature, json_mode)
+
+
+async def stream_routed(
+    task: str,
+    messages: List[Dict[str, str]],
+    max_tokens: int = 2000,
+    temperature: float = 0.7,
+    json_mode: bool = False,
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of call_routed. Failover to the other provider only
+    happens if the chosen one fails before producing any output.
+    """
+    decision = choose_provider(task)
+    decision["streamed"] = True
+    candidates = [decision["provider"]]
+    policy = TASK_POLICIES.get(task, TASK_POLICIES["content"])
+    other = policy["alternative"] if decision["provider"] == policy["preferred"] else policy["preferred"]
+    if _is_configured(other):
+        candidates.append(other)
+
+    stats = _stats(decision["provider"], decision["model"])
+    stats["routed"] += 1
+    if decision["rerouted"]:
+        stats["rerouted"] += 1
+
+    for index, provider in enumerate(candidates):
+        model = _model_for(provider)
+        started = time.perf_counter()
+        produced = False
+        try:
+            async for chunk in _stream_provider(provider, messages, max_tokens, temperature, json_mode):
+                if not produced:
+                    produced = True
+                    decision["firstChunkMs"] = round((time.perf_counter() - started) * 1000, 1)
+                yield chunk
+        except Exception as exc:
+            record_outcome(provider, model, None, ok=False)
+            if produced or index == len(candidates) - 1:
+                decision["executedProvider"] = provider
+                _remember(decision)
+                raise
+            logger.warning("llm_route_failover task=%s from=%s to=%s error=%s", task, provider, candidates[index + 1], exc)
+            decision["failover"] = candidates[index + 1]
+            continue
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        record_outcome(provider, model, latency_ms, ok=True)
+        decision["executedProvider"] = provider
+        decision["latencyMs"] = round(latency_ms, 1)
+        _remember(decision)
+        return
+
+
+def get_router_stats() -> Dict[str, Any]:
+    providers = {}
+    for key, stats in sorted(_STATS.items()):
+        p90 = _p90(stats["latencies"])
+        providers[key] = {
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "routed": stats["routed"],
+            "rerouted": stats["rerouted"],
+            "ewmaLatencyMs": round(stats["ewmaLatencyMs"], 1) if stats["ewmaLatencyMs"] is not None else None,
+            "p90Ms": round(p90, 1) if p90 is not None else None,
+            "errorRate": round(stats["ewmaErrorRate"], 3),
+        }
+    return {"policies": {task: dict(policy) for task, policy in TASK_POLICIES.items()}, "providers": providers}
+
+
+def reset_router_stats() -> None:
+    _STATS.clear()
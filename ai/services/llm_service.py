@@ -2,51 +2,40 @@
 
 """
 LLM Service - Handles all LLM interactions
-- Groq (fast) for topic generation
-- Gemini (quality) for content generation
+- Groq (fast) preferred for topic generation
+- Gemini (quality) preferred for content generation
+Provider choice per call is made by services.llm_router.
 """
 
 import logging
 import json
 import re
-from typing import Any, Dict, List, Tuple
-
-import httpx
-from langdetect import detect
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
 from config import settings
+from services import generation_cache, llm_hedging, llm_router, long_form, repair_planner, token_budget
+from services.cpu_executor import run_cpu
+from services.cpu_tasks import LANGDETECT_INLINE_MAX_CHARS, detect_language_task, score_content_metrics_task
+from services.gemini_service import get_last_llm_execution, get_last_llm_usage, with_json_instruction
 from services.prompt_builder import build_topic_prompt, blog_system, linkedin_system, instagram_system
 from services.render_service import (
     blog_to_html, blog_to_plain,
     linkedin_to_html, linkedin_to_plain,
-    instagram_to_html, instagram_to_plain
+    instagram_to_html, instagram_to_plain,
+    blog_section_to_html, render_sections,
 )
-from services.text_quality_service import score_content_metrics
+from utils import deadline
+from utils.json_stream import IncrementalJSONParser, JSONStreamError
 
 logger = logging.getLogger(__name__)
 
-
-async def chat_groq(messages: List[Dict[str, str]], max_tokens: int, temperature: float = 0.7) -> str:
-    """Call Groq API (fast, for topics)"""
-    if not settings.GROQ_API_KEY:
-        raise RuntimeError("GROQ_API_KEY missing")
-    
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {"Authorization": f"Bearer {settings.GROQ_API_KEY}", "Content-Type": "application/json"}
-    
-    payload = {
-        "model": settings.GROQ_MODEL,
-        "messages": messages,
-        "max_tokens": max_tokens,
-        "temperature": temperature,
-        "response_format": {"type": "json_object"},
-    }
-    
-    async with httpx.AsyncClient(timeout=60) as client:
-        r = await client.post(url, headers=headers, json=payload)
-        r.raise_for_status()
-        data = r.json()
-        return data["choices"][0]["message"]["content"]
+METRICS_INLINE_MAX_CHARS = 1000  # ~2.5 ms to score inline; longer posts would hold the event loop longer
+# Fields a locally repaired payload must still have before the LLM repair round-trip is skipped
+REQUIRED_CONTENT_KEYS = {
+    "blog": ["sections"],
+    "linkedin": ["body"],
+    "instagram": ["caption"],
+}
 
 
 async def generate_topics_json(
@@ -60,10 +49,14 @@ async def generate_topics_json(
     retrieved_context: Dict[str, Any],
     include_trends: bool = True,
     content_goals: str = "",
-    preferred_content_types: List[str] | None = None
+    preferred_content_types: List[str] | None = None,
+    bypass_cache: bool = False,
+    namespace: str = "",
 ):
     """
-    Generate topics using GROQ (optimized for speed).
+    Generate topics, routed to Groq by default (optimized for speed).
+    Results are served from generation_cache unless `bypass_cache` is set;
+    semantic matches stay within `namespace` (user/language/niche).
     """
     # Build prompt with context
     snippets = retrieved_context.get("snippets", []) if retrieved_context else []
@@ -83,14 +76,43 @@ async def generate_topics_json(
         preferred_content_types or []
     )
     
-    logger.info("llm_topics_start model=groq niche=%s count=%s", niche, count)
+    cache_probe = await generation_cache.lookup(
+        "topics",
+        generation_cache.cache_key("topics", [{"role": "system", "content": system}, user], 0.7, 900),
+        strict_fields={
+            "namespace": namespace,
+            "language": language,
+            "count": count,
+            "includeTrends": include_trends,
+            "region": region,
+            "season": season,
+        },
+        semantic_fields={
+            "niche": niche,
+            "persona": json.dumps(persona, sort_keys=True, default=str),
+            "seedKeywords": ", ".join(seed_keywords or []),
+            "contentGoals": content_goals,
+            "preferredContentTypes": ", ".join(preferred_content_types or []),
+        },
+        bypass=bypass_cache,
+    )
+    if cache_probe["value"] is not None:
+        clusters, filtered, diagnostics = cache_probe["value"]
+        diagnostics["cache"] = cache_probe["provenance"]
+        return clusters, filtered, diagnostics
+
+    logger.info("llm_topics_start niche=%s count=%s", niche, count)
     
-    # Call Groq for speed
-    raw = await chat_groq(
+    llm_router.reset_routing()
+    raw = await llm_router.call_routed(
+        "topics",
         [{"role": "system", "content": system}, user],
         max_tokens=900,
-        temperature=0.7
+        temperature=0.7,
+        json_mode=True,
     )
+    routing = llm_router.get_routing_decisions()
+    topics_provider = routing[-1]["executedProvider"] if routing else "groq"
     
     # Parse JSON
     try:
@@ -99,7 +121,7 @@ async def generate_topics_json(
         # Fallback: extract JSON from response
         m = re.search(r"\{[\s\S]*\}\s*$", raw)
         if not m:
-            raise ValueError(f"Invalid JSON from Groq: {raw[:200]}")
+            raise ValueError(f"Invalid JSON from {topics_provider}: {raw[:200]}")
         data = json.loads(m.group(0))
     
     # Process ideas
@@ -142,7 +164,6 @@ async def generate_topics_json(
                 candidates.append(norm)
     
     # Filter duplicates and validate
-    from langdetect.lang_detect_exception import LangDetectException
     filtered, seen = [], set()
     
     for it in candidates:
@@ -157,11 +178,6 @@ async def generate_topics_json(
         if len(t) < 20 or len(t) > 120:
             continue
         
-        try:
-            _ = detect(t)
-        except LangDetectException:
-            pass
-        
         seen.add(k)
         filtered.append({
             "ideaText": t,
@@ -171,6 +187,8 @@ async def generate_topics_json(
             "language": language,
         })
     
+    llm_idea_count = len(filtered)
+
     def _append_fallback(title: str, keyword: str, rationale: str, trend_tag: str) -> None:
         normalized_title = " ".join(str(title or "").split()).strip()
         if not normalized_title:
@@ -223,30 +241,21 @@ async def generate_topics_json(
     diagnostics = {
         "usedRAG": retrieved_context.get("usedRAG", False) if retrieved_context else False,
         "clustersCount": len(clusters),
-        "model": "groq"
+        "model": topics_provider,
+        "routing": routing,
+        "cache": cache_probe["provenance"],
     }
     
-    logger.info("llm_topics_complete model=groq count=%s requested=%s", len(filtered), count)
+    logger.info("llm_topics_complete model=%s count=%s requested=%s", topics_provider, len(filtered), count)
     
+    if llm_idea_count >= count:
+        # Answers padded with template ideas are not replayed; the next call asks the LLM again
+        generation_cache.store(cache_probe, (clusters, filtered, diagnostics))
     return clusters, filtered, diagnostics
 
 
-async def generate_content_json(
-    platform: str,
-    language: str,
-    topic_or_idea: str,
-    tone: str,
-    target_length: int,
-    focus_keyword: str,
-    style_guide: List[str],
-    retrieved_context: Dict[str, Any]
-):
-    """
-    Generate content using GEMINI (optimized for quality).
-    """
-    # Import Gemini service
-    from services.gemini_service import call_gemini_json, get_last_llm_execution
-    
+def _research_context_block(retrieved_context: Dict[str, Any]) -> str:
+    """Format research keywords and snippets for the content prompts."""
     # Build context
     ctx_lines = []
     if retrieved_context:
@@ -254,6 +263,10 @@ async def generate_content_json(
         if keywords:
             ctx_lines.append(f"Relevant keywords and angles: {', '.join(keywords[:15])}")
         snippets = retrieved_context.get("snippets", [])
+        if keywords:
+            # The research bundle also carries the keywords as a pseudo-source; don't send them twice
+            repeated = ", ".join(keywords[:15])
+            snippets = [sn for sn in snippets if not (isinstance(sn, dict) and sn.get("text") == repeated)]
         for i, sn in enumerate(snippets[:10], 1):
             if isinstance(sn, dict):
                 title = sn.get("title", "")
@@ -270,18 +283,30 @@ async def generate_content_json(
             else:
                 ctx_lines.append(f"[Source {i}] {str(sn)}")
     
-    context_block = "\n".join(ctx_lines) or "No additional context"
+    return "\n".join(ctx_lines) or "No additional context"
+
+
+def _build_content_messages(
+    platform: str,
+    language: str,
+    topic_or_idea: str,
+    tone: str,
+    target_length: int,
+    focus_keyword: str,
+    style_guide: List[str],
+    retrieved_context: Dict[str, Any]
+) -> Tuple[List[Dict[str, str]], int]:
+    """Build the system/user messages and the output token budget for one platform."""
+    context_block = _research_context_block(retrieved_context)
     
     # Select system prompt
     if platform == "blog":
         system = blog_system(language, focus_keyword, target_length)
-        max_tokens = 2000
     elif platform == "linkedin":
         system = linkedin_system(language)
-        max_tokens = 800
     else:  # instagram
         system = instagram_system(language)
-        max_tokens = 700
+    max_tokens = token_budget.estimate_max_tokens(platform, language, target_length)
     
     user_content = f"""Topic: {topic_or_idea}
 Tone: {tone}
@@ -291,23 +316,30 @@ Research context (use for ideas, don't copy):
 {context_block}
 """
     
-    logger.info(
-        "llm_content_start model=%s platform=%s context_sources=%s",
-        settings.GEMINI_MODEL,
-        platform,
-        len((retrieved_context or {}).get("snippets", [])),
-    )
-    
-    # Call Gemini for quality
-    data = await call_gemini_json(
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user_content}
-        ],
-        max_tokens=max_tokens,
-        temperature=0.7
-    )
-    
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_content}
+    ]
+    return messages, max_tokens
+
+
+async def _finalize_content(
+    data: Dict[str, Any],
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    *,
+    platform: str,
+    language: str,
+    topic_or_idea: str,
+    focus_keyword: str,
+    target_length: int,
+    retrieved_context: Dict[str, Any],
+    extra_diagnostics: Dict[str, Any] | None = None,
+):
+    """
+    Validate, repair if needed, render and score a parsed LLM payload.
+    Returns (packaged, diagnostics, metrics).
+    """
     # SAFETY CHECK: Fix incorrect Gemini response structure
     # Sometimes Gemini returns {"html": "...", "title": "..."} instead of the structured format
     if platform == "blog":
@@ -358,47 +390,85 @@ Research context (use for ideas, don't copy):
     expected_language = (language or "en").split("-")[0].lower()
 
     try:
-        detected_language = detect(sample_text[:200]).lower() if sample_text else ""
+        detected_language = (
+            (
+                await run_cpu(
+                    "langdetect",
+                    detect_language_task,
+                    sample_text[:200],
+                    size=len(sample_text[:200]),
+                    inline_below=LANGDETECT_INLINE_MAX_CHARS,
+                )
+            ).lower()
+            if sample_text
+            else ""
+        )
         if detected_language and detected_language != expected_language:
             repair_issues.append(f"Output language must be {expected_language}")
     except Exception:
         pass
     
-    # Repair if needed
-    if repair_issues:
+    # Repair if needed: rewrite only the failing sections when the issues can be
+    # pinned on them, otherwise regenerate the whole payload
+    repair_summary = None
+    if repair_issues and deadline.tight("repair"):
+        logger.warning(f"content_repair: skipped for the request deadline, issues {'; '.join(repair_issues)}")
+        deadline.degrade("repair", "kept unrepaired output")
+        repair_summary = {"mode": "skipped"}
+    elif repair_issues:
         logger.warning(f"content_repair: fixing {'; '.join(repair_issues)}")
+        plan = []
+        if platform == "blog":
+            plan = await repair_planner.plan_section_repairs(data.get("sections") or [], target_length, language)
+        if repair_planner.sections_repairable(repair_issues, plan, data):
+            repair_summary = await repair_planner.repair_sections(
+                data,
+                plan,
+                topic_or_idea=topic_or_idea,
+                focus_keyword=focus_keyword,
+                language=language,
+            )
+            data, _normalization_notes, _ = _prepare_blog_payload(
+                data,
+                topic_or_idea,
+                focus_keyword,
+                target_length,
+            )
+        else:
+            repair_summary = {"mode": "full"}
         
-        repair_prompt = f"""The previous response had these issues:
+            repair_prompt = f"""The previous response had these issues:
 {'; '.join(repair_issues)}
 
 Please fix these issues and return the corrected JSON in the EXACT structure specified."""
         
-        try:
-            data = await call_gemini_json(
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": user_content},
-                    {"role": "assistant", "content": json.dumps(data)},
-                    {"role": "user", "content": repair_prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.4
-            )
-            
-            # Apply safety check again after repair
-            if platform == "blog":
-                if "html" in data and "sections" not in data:
-                    data["sections"] = [{"h2": "Introduction", "body": f"Content about {topic_or_idea}"}]
-                    del data["html"]
-                data, _normalization_notes, _ = _prepare_blog_payload(
-                    data,
-                    topic_or_idea,
-                    focus_keyword,
-                    target_length,
+            try:
+                data = await llm_router.call_routed_json(
+                    "content",
+                    messages=[
+                        *messages,
+                        {"role": "assistant", "content": json.dumps(data)},
+                        {"role": "user", "content": repair_prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=0.4,
+                    required_keys=REQUIRED_CONTENT_KEYS.get(platform),
                 )
+            
+                # Apply safety check again after repair
+                if platform == "blog":
+                    if "html" in data and "sections" not in data:
+                        data["sections"] = [{"h2": "Introduction", "body": f"Content about {topic_or_idea}"}]
+                        del data["html"]
+                    data, _normalization_notes, _ = _prepare_blog_payload(
+                        data,
+                        topic_or_idea,
+                        focus_keyword,
+                        target_length,
+                    )
                     
-        except Exception as e:
-            logger.warning(f"Repair failed: {e}, using original")
+            except Exception as e:
+                logger.warning(f"Repair failed: {e}, using original")
     
     # Render HTML + plain text using your existing renderers
     if platform == "blog":
@@ -429,9 +499,21 @@ Please fix these issues and return the corrected JSON in the EXACT structure spe
         "model": llm_execution.get("model", settings.GEMINI_MODEL),
         "provider": llm_execution.get("provider", "gemini"),
         "liveSources": (retrieved_context or {}).get("liveSources", 0),
-        "indexedSources": (retrieved_context or {}).get("indexedSources", 0)
+        "indexedSources": (retrieved_context or {}).get("indexedSources", 0),
+        "routing": llm_router.get_routing_decisions(),
     }
-    metrics = score_content_metrics(packaged.get("html", ""), plain, language)
+    if repair_summary:
+        diagnostics["repair"] = repair_summary
+    diagnostics.update(extra_diagnostics or {})
+    metrics = await run_cpu(
+        "content_metrics",
+        score_content_metrics_task,
+        packaged.get("html", ""),
+        plain,
+        language,
+        size=len(plain),
+        inline_below=METRICS_INLINE_MAX_CHARS,
+    )
     
     logger.info(
         "llm_content_complete provider=%s model=%s platform=%s length=%s repair=%s",
@@ -445,6 +527,236 @@ Please fix these issues and return the corrected JSON in the EXACT structure spe
     return packaged, diagnostics, metrics
 
 
+async def generate_content_json(
+    platform: str,
+    language: str,
+    topic_or_idea: str,
+    tone: str,
+    target_length: int,
+    focus_keyword: str,
+    style_guide: List[str],
+    retrieved_context: Dict[str, Any],
+    bypass_cache: bool = False,
+    namespace: str = "",
+):
+    """
+    Generate content, routed to Gemini by default (optimized for quality).
+    Results are served from generation_cache unless `bypass_cache` is set;
+    semantic matches stay within `namespace`, the research namespace whose
+    indexed context the content was built from.
+    Blogs of LONG_FORM_MIN_WORDS or more are written outline-first, section
+    bodies in parallel (services/long_form.py).
+    """
+    messages, max_tokens = _build_content_messages(
+        platform, language, topic_or_idea, tone, target_length, focus_keyword, style_guide, retrieved_context
+    )
+    
+    cache_probe = await generation_cache.lookup(
+        platform,
+        generation_cache.cache_key("content", messages, 0.7, max_tokens),
+        strict_fields={
+            "namespace": namespace,
+            "platform": platform,
+            "language": language,
+            "tone": tone,
+            "targetLength": target_length,
+        },
+        semantic_fields={
+            "topic": topic_or_idea,
+            "focusKeyword": focus_keyword,
+            "styleGuide": "; ".join(style_guide or []),
+        },
+        bypass=bypass_cache,
+    )
+    if cache_probe["value"] is not None:
+        packaged, diagnostics, metrics = cache_probe["value"]
+        diagnostics["cache"] = cache_probe["provenance"]
+        return packaged, diagnostics, metrics
+
+    logger.info(
+        "llm_content_start model=%s platform=%s context_sources=%s",
+        settings.GEMINI_MODEL,
+        platform,
+        len((retrieved_context or {}).get("snippets", [])),
+    )
+    
+    llm_router.reset_routing()
+    extra_diagnostics = {}
+    data = None
+    if long_form.use_long_form(platform, target_length):
+        try:
+            long_form_result = await long_form.generate_long_form_blog(
+                language=language,
+                topic_or_idea=topic_or_idea,
+                tone=tone,
+                target_length=target_length,
+                focus_keyword=focus_keyword,
+                style_guide=style_guide,
+                context_block=_research_context_block(retrieved_context),
+            )
+        except Exception as exc:
+            logger.warning("long_form_failed error=%s, falling back to a single call", exc)
+            long_form_result = None
+        if long_form_result:
+            data, extra_diagnostics["longForm"] = long_form_result
+
+    if data is None and settings.LLM_HEDGE_ENABLED:
+        data, extra_diagnostics["hedge"] = await llm_hedging.hedged_json(
+            "content",
+            messages,
+            max_tokens,
+            0.7,
+            validate=lambda candidate: _is_valid_payload(candidate, platform, topic_or_idea, focus_keyword, target_length),
+            required_keys=REQUIRED_CONTENT_KEYS.get(platform),
+        )
+    elif data is None:
+        data = await llm_router.call_routed_json(
+            "content",
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=0.7,
+            required_keys=REQUIRED_CONTENT_KEYS.get(platform),
+        )
+
+    usage = get_last_llm_usage() if "longForm" not in extra_diagnostics else None
+    truncated = bool(usage and usage["truncated"])
+    if usage:
+        token_budget.observe(
+            get_last_llm_execution()["provider"],
+            language,
+            token_budget.payload_words(data),
+            usage["outputTokens"],
+        )
+    extra_diagnostics["tokenBudget"] = {
+        "mode": token_budget.budgeting_mode(),
+        "maxTokens": max_tokens,
+        "truncated": truncated,
+    }
+
+    packaged, diagnostics, metrics = await _finalize_content(
+        data,
+        messages,
+        max_tokens,
+        platform=platform,
+        language=language,
+        topic_or_idea=topic_or_idea,
+        focus_keyword=focus_keyword,
+        target_length=target_length,
+        retrieved_context=retrieved_context,
+        extra_diagnostics=extra_diagnostics,
+    )
+    token_budget.record_generation(platform, truncated, diagnostics["repairAttempted"])
+    diagnostics["cache"] = cache_probe["provenance"]
+    if _is_valid_payload(packaged["structured"], platform, topic_or_idea, focus_keyword, target_length):
+        generation_cache.store(cache_probe, (packaged, diagnostics, metrics))
+    return packaged, diagnostics, metrics
+
+
+async def stream_content_events(
+    platform: str,
+    language: str,
+    topic_or_idea: str,
+    tone: str,
+    target_length: int,
+    focus_keyword: str,
+    style_guide: List[str],
+    retrieved_context: Dict[str, Any]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streaming variant of generate_content_json. Yields (event, payload):
+    "delta" for each chunk of raw LLM output; "section" for each blog section
+    as soon as its JSON closes (provisional), and again after validation and
+    repair for any section whose final HTML differs; then one "final" with
+    {"content", "diagnostics", "metrics"}. A later "section" event replaces
+    an earlier one with the same index.
+    """
+    messages, max_tokens = _build_content_messages(
+        platform, language, topic_or_idea, tone, target_length, focus_keyword, style_guide, retrieved_context
+    )
+    logger.info("llm_content_stream_start platform=%s context_sources=%s", platform, len((retrieved_context or {}).get("snippets", [])))
+
+    llm_router.reset_routing()
+    temperature = 0.4  # same cap call_gemini_json applies to JSON output
+    chunks: List[str] = []
+    parser = IncrementalJSONParser()
+    streamed_sections: Dict[int, str] = {}
+    async for chunk in llm_router.stream_routed(
+        "content",
+        with_json_instruction(messages),
+        max_tokens,
+        temperature,
+        json_mode=True,
+    ):
+        chunks.append(chunk)
+        yield "delta", {"text": chunk}
+        if parser is None:
+            continue
+        try:
+            events = parser.feed(chunk)
+        except JSONStreamError as exc:
+            logger.warning("llm_content_stream_unparseable: %s, sections will follow the final parse", exc)
+            parser = None
+            continue
+        if platform != "blog":
+            continue
+        for event in events:
+            if event.key == "sections" and event.index is not None and isinstance(event.value, dict):
+                section_html = blog_section_to_html(event.value)
+                streamed_sections[event.index] = section_html
+                yield "section", {
+                    "index": event.index,
+                    "kind": "section",
+                    "h2": event.value.get("h2", ""),
+                    "html": section_html,
+                    "provisional": True,
+                }
+
+    if parser is not None and parser.done:
+        data = parser.close()
+    else:
+        data = await llm_router.call_routed_json(
+            "content",
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            raw_response="".join(chunks),
+            required_keys=REQUIRED_CONTENT_KEYS.get(platform),
+        )
+    packaged, diagnostics, metrics = await _finalize_content(
+        data,
+        messages,
+        max_tokens,
+        platform=platform,
+        language=language,
+        topic_or_idea=topic_or_idea,
+        focus_keyword=focus_keyword,
+        target_length=target_length,
+        retrieved_context=retrieved_context,
+        extra_diagnostics={"streamed": True},
+    )
+    for index, section in enumerate(render_sections(platform, packaged["structured"])):
+        if streamed_sections.get(index) != section["html"]:
+            yield "section", {"index": index, **section, "provisional": False}
+    yield "final", {"content": packaged, "diagnostics": diagnostics, "metrics": metrics}
+
+
+def _is_valid_payload(
+    data: Dict[str, Any],
+    platform: str,
+    topic_or_idea: str,
+    focus_kw: str,
+    target_length: int,
+) -> bool:
+    """True when a raw LLM payload can be used without a repair round."""
+    if not isinstance(data, dict):
+        return False
+    if platform == "blog":
+        _data, _notes, repair_issues = _prepare_blog_payload(data, topic_or_idea, focus_kw, target_length)
+        return not repair_issues
+    field = "body" if platform == "linkedin" else "caption"
+    return bool(str(data.get(field) or "").strip())
+
+
 def _prepare_blog_payload(
     json_obj: Dict[str, Any],
     topic_or_idea: str,
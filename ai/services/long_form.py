@@ -0,0 +1,201 @@
+"""
+Outline-then-sections generation for long-form blogs.
+
+A 2,000-4,000 word article does not fit one call: it gets truncated at the
+output cap and latency grows with length. Instead one short call plans the
+article (title, h1, h2s with talking points, meta), then every section body
+is written concurrently with the shared research context and its own word
+budget. At most LONG_FORM_MAX_CONCURRENCY section calls run at once so the
+fan-out stays inside provider rate limits; circuit breaking and routing
+still apply per call through llm_router.
+
+Sections that fail come back with an empty body, which the repair planner
+in _finalize_content picks up like any other empty section.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from services import llm_router, token_budget
+from services.gemini_service import get_last_llm_execution, get_last_llm_usage
+from services.prompt_builder import blog_outline_system, blog_section_system
+
+logger = logging.getLogger(__name__)
+
+OUTLINE_MAX_TOKENS = 900
+MIN_SECTIONS = 4
+MAX_SECTIONS = 12
+
+
+def use_long_form(platform: str, target_length: int) -> bool:
+    return platform == "blog" and target_length >= settings.LONG_FORM_MIN_WORDS
+
+
+def section_count_for(target_length: int) -> int:
+    return max(MIN_SECTIONS, min(MAX_SECTIONS, round(target_length / max(1, settings.LONG_FORM_SECTION_WORDS))))
+
+
+def _outline_sections(outline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    sections = []
+    for sec in outline.get("sections") or []:
+        if not isinstance(sec, dict):
+            continue
+        h2 = " ".join(str(sec.get("h2") or "").split()).strip()
+        if not h2:
+            continue
+        points = [str(point) for point in (sec.get("points") or []) if str(point).strip()]
+        sections.append({"h2": h2, "points": points})
+    return sections
+
+
+def _section_words(target_length: int, count: int) -> List[int]:
+    """Split the target evenly; the remainder goes to the earliest sections."""
+    base, extra = divmod(target_length, count)
+    return [base + (1 if index < extra else 0) for index in range(count)]
+
+
+async def _write_section(
+    semaphore: asyncio.Semaphore,
+    index: int,
+    outline: Dict[str, Any],
+    sections: List[Dict[str, Any]],
+    words: int,
+    *,
+    language: str,
+    tone: str,
+    focus_keyword: str,
+    context_block: str,
+) -> Tuple[str, tuple]:
+    section = sections[index]
+    plan = "\n".join(
+        f"{'>> ' if i == index else ''}{i + 1}. {sec['h2']}" for i, sec in enumerate(sections)
+    )
+    user_content = f"""Article: {outline.get('h1') or outline.get('title')}
+Tone: {tone}
+Outline (you are writing the section marked >>):
+{plan}
+
+Section: {section['h2']}
+Talking points: {'; '.join(section['points']) or 'use your judgement'}
+Length: about {words} words
+
+Research context (use for ideas, don't copy):
+{context_block}
+"""
+    async with semaphore:
+        llm_router.reset_routing()
+        result = await llm_router.call_routed_json(
+            "content",
+            messages=[
+                {"role": "system", "content": blog_section_system(language, focus_keyword)},
+                {"role": "user", "content": user_content},
+            ],
+            max_tokens=token_budget.estimate_section_tokens(words, language),
+            temperature=0.7,
+            required_keys=["body"],
+        )
+        body = " ".join(str(result.get("body") or "").split()).strip()
+        usage = get_last_llm_usage()
+        if usage:
+            token_budget.observe(get_last_llm_execution()["provider"], language, len(body.split()), usage["outputTokens"])
+        return body, llm_router.capture_routing()
+
+
+async def generate_long_form_blog(
+    *,
+    language: str,
+    topic_or_idea: str,
+    tone: str,
+    target_length: int,
+    focus_keyword: str,
+    style_guide: List[str],
+    context_block: str,
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Returns (blog payload, info) or None when no usable outline came back, in
+    which case the caller falls back to single-call generation.
+    """
+    started = time.perf_counter()
+    section_count = section_count_for(target_length)
+    outline = await llm_router.call_routed_json(
+        "content",
+        messages=[
+            {"role": "system", "content": blog_outline_system(language, focus_keyword, target_length, section_count)},
+            {
+                "role": "user",
+                "content": f"""Topic: {topic_or_idea}
+Tone: {tone}
+Style guide: {style_guide}
+
+Research context (use for ideas, don't copy):
+{context_block}
+""",
+            },
+        ],
+        max_tokens=OUTLINE_MAX_TOKENS,
+        temperature=0.6,
+        required_keys=["sections"],
+    )
+    sections = _outline_sections(outline)
+    outline_ms = (time.perf_counter() - started) * 1000
+    if len(sections) < 2:
+        logger.warning("long_form_outline_unusable sections=%s", len(sections))
+        return None
+
+    budgets = _section_words(target_length, len(sections))
+    semaphore = asyncio.Semaphore(max(1, settings.LONG_FORM_MAX_CONCURRENCY))
+    results = await asyncio.gather(
+        *(
+            _write_section(
+                semaphore,
+                index,
+                outline,
+                sections,
+                budgets[index],
+                language=language,
+                tone=tone,
+                focus_keyword=focus_keyword,
+                context_block=context_block,
+            )
+            for index in range(len(sections))
+        ),
+        return_exceptions=True,
+    )
+
+    bodies: List[str] = []
+    failed: List[int] = []
+    for index, result in enumerate(results):
+        if isinstance(result, BaseException):
+            logger.warning("long_form_section_failed index=%s error=%s", index, result)
+            failed.append(index)
+            bodies.append("")
+            continue
+        body, decisions = result
+        llm_router.restore_routing(decisions)
+        bodies.append(body)
+
+    data = {
+        "title": outline.get("title") or topic_or_idea,
+        "h1": outline.get("h1") or outline.get("title") or topic_or_idea,
+        "sections": [{"h2": sec["h2"], "body": body} for sec, body in zip(sections, bodies)],
+        "meta": outline.get("meta") if isinstance(outline.get("meta"), dict) else {},
+        "images": outline.get("images") if isinstance(outline.get("images"), list) else [],
+    }
+    info = {
+        "sections": len(sections),
+        "sectionWords": budgets,
+        "failedSections": failed,
+        "outlineMs": round(outline_ms, 1),
+        "totalMs": round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info(
+        "long_form_complete sections=%s failed=%s outline_ms=%.0f total_ms=%.0f",
+        len(sections),
+        len(failed),
+        outline_ms,
+        info["totalMs"],
+    )
+    return data, info
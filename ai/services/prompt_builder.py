@@ -86,6 +86,42 @@ Rules:
 DO NOT include an "html" field in the JSON. Only return: title, h1, sections, meta, images."""
 
 
+def blog_outline_system(language: str, focus_kw: str, target_length: int, section_count: int) -> str:
+    return f"""You are a senior SEO copywriter planning a long-form article. Write strictly in {language}.
+
+Return ONLY the outline as JSON in EXACTLY this structure:
+
+{{
+  "title": "...",
+  "h1": "...",
+  "sections": [
+    {{"h2": "...", "points": ["...", "..."]}}
+  ],
+  "meta": {{"description": "...", "slug": "..."}},
+  "images": [{{"prompt": "...", "alt": "..."}}]
+}}
+
+Rules:
+- One H1 including the focus keyword: {focus_kw}
+- Exactly {section_count} sections for a ~{target_length}-word article; the first introduces the topic, the last concludes
+- 2-4 short talking points per section; no body text yet
+- Meta description 140-160 chars including {focus_kw}
+- Provide 1-3 image prompts + ALT text"""
+
+
+def blog_section_system(language: str, focus_kw: str) -> str:
+    return f"""You are a senior SEO copywriter writing one section of a long-form article. Write strictly in {language}.
+
+Return JSON in EXACTLY this structure:
+
+{{"body": "..."}}
+
+Rules:
+- Cover only this section's talking points; other sections are written separately, so do not repeat them
+- Plain paragraphs, no headings or markdown inside the body
+- Use the primary keyword ({focus_kw}) naturally where it fits, without stuffing"""
+
+
 def linkedin_system(language: str) -> str:
     return f"""Write a LinkedIn post strictly in {language} with a professional, narrative-driven tone.
 
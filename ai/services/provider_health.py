@@ -0,0 +1,282 @@
+"""
+Process-wide health state for LLM providers, keyed by provider and model.
+
+Each provider/model pair runs a small circuit breaker:
+
+    closed ──(N consecutive failures / unsupported model)──▶ open
+    open ──(cooldown elapsed)──▶ half_open ──(probe succeeds)──▶ closed
+                                         └──(probe fails)──▶ open (cooldown doubled)
+
+Quota exhaustion is tracked separately as a "blocked until" timestamp taken
+from the provider's advertised retry delay, so once one request sees a 429,
+every other request skips that provider until the reset instead of sleeping
+on its own.
+
+When PROVIDER_HEALTH_STATE_FILE is set, quota and open-circuit deadlines are
+merged through that JSON file so every worker process on the host shares them.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATES: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.RLock()
+_FILE_MTIME: Dict[str, float] = {}
+
+
+def _key(provider: str, model: str) -> str:
+    return f"{provider}:{model}"
+
+
+def _state(key: str) -> Dict[str, Any]:
+    return _STATES.setdefault(key, {
+        "state": CLOSED,
+        "consecutiveFailures": 0,
+        "openUntil": 0.0,
+        "openSeconds": 0.0,
+        "quotaUntil": 0.0,
+        "probeStartedAt": 0.0,
+        "lastReason": "",
+        "shortCircuited": 0,
+        "headroom": None,
+        "transitions": {},
+    })
+
+
+def _transition(key: str, state: Dict[str, Any], new_state: str, reason: str) -> None:
+    old_state = state["state"]
+    if old_state == new_state:
+        return
+    state["state"] = new_state
+    state["lastReason"] = reason
+    label = f"{old_state}->{new_state}"
+    state["transitions"][label] = state["transitions"].get(label, 0) + 1
+    logger.warning("provider_circuit_transition key=%s from=%s to=%s reason=%s", key, old_state, new_state, reason)
+
+
+# ---------------------------------------------------------------------------
+# Optional cross-worker sharing
+# ---------------------------------------------------------------------------
+
+def _read_shared() -> Dict[str, Dict[str, float]]:
+    path = settings.PROVIDER_HEALTH_STATE_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _sync_from_shared() -> None:
+    path = settings.PROVIDER_HEALTH_STATE_FILE
+    if not path:
+        return
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return
+    if _FILE_MTIME.get(path) == mtime:
+        return
+    _FILE_MTIME[path] = mtime
+
+    now = time.time()
+    for key, shared in _read_shared().items():
+        state = _state(key)
+        quota_until = float(shared.get("quotaUntil", 0.0))
+        open_until = float(shared.get("openUntil", 0.0))
+        if quota_until > state["quotaUntil"]:
+            state["quotaUntil"] = quota_until
+        if open_until > now and open_until > state["openUntil"]:
+            state["openUntil"] = open_until
+            state["openSeconds"] = max(state["openSeconds"], float(shared.get("openSeconds", 0.0)))
+            _transition(key, state, OPEN, str(shared.get("reason") or "shared"))
+
+
+def _publish(key: str, state: Dict[str, Any]) -> None:
+    path = settings.PROVIDER_HEALTH_STATE_FILE
+    if not path:
+        return
+    shared = _read_shared()
+    entry = shared.get(key) or {}
+    shared[key] = {
+        "quotaUntil": max(float(entry.get("quotaUntil", 0.0)), state["quotaUntil"]),
+        "openUntil": state["openUntil"] if state["state"] != CLOSED else 0.0,
+        "openSeconds": state["openSeconds"],
+        "reason": state["lastReason"],
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(shared, handle)
+        os.replace(tmp_path, path)
+        _FILE_MTIME[path] = os.path.getmtime(path)
+    except OSError as exc:
+        logger.warning("provider_health: could not write shared state %s: %s", path, exc)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def acquire(provider: str, model: str) -> Optional[str]:
+    """
+    Ask whether a call to provider/model may go ahead.
+
+    Returns None when it may, otherwise a short reason to log and fall back on.
+    In half_open only one probe call is let through at a time.
+    """
+    key = _key(provider, model)
+    with _LOCK:
+        _sync_from_shared()
+        state = _state(key)
+        now = time.time()
+
+        if state["quotaUntil"] > now:
+            state["shortCircuited"] += 1
+            return f"quota exhausted for another {int(state['quotaUntil'] - now)}s"
+
+        if state["state"] == OPEN:
+            if state["openUntil"] > now:
+                state["shortCircuited"] += 1
+                return f"circuit open for another {int(state['openUntil'] - now)}s ({state['lastReason']})"
+            _transition(key, state, HALF_OPEN, "cooldown elapsed")
+
+        if state["state"] == HALF_OPEN:
+            probe_expired = now - state["probeStartedAt"] > settings.PROVIDER_CIRCUIT_OPEN_SECONDS
+            if state["probeStartedAt"] and not probe_expired:
+                state["shortCircuited"] += 1
+                return "circuit half-open, probe in flight"
+            state["probeStartedAt"] = now
+
+        return None
+
+
+def is_available(provider: str, model: str) -> bool:
+    """Non-claiming check for routing: False while quota-blocked or the circuit is open."""
+    key = _key(provider, model)
+    with _LOCK:
+        _sync_from_shared()
+        state = _state(key)
+        now = time.time()
+        if state["quotaUntil"] > now:
+            return False
+        return not (state["state"] == OPEN and state["openUntil"] > now)
+
+
+def record_headroom(provider: str, model: str, remaining: Optional[float], limit: Optional[float]) -> None:
+    """Store the remaining share of the provider's rate limit, as reported in response headers."""
+    if remaining is None or not limit:
+        return
+    with _LOCK:
+        _state(_key(provider, model))["headroom"] = max(0.0, min(1.0, remaining / limit))
+
+
+def get_headroom(provider: str, model: str) -> Optional[float]:
+    """Remaining rate-limit share (0..1), 0 while quota-blocked, None when never reported."""
+    with _LOCK:
+        state = _state(_key(provider, model))
+        if state["quotaUntil"] > time.time():
+            return 0.0
+        return state["headroom"]
+
+
+def record_success(provider: str, model: str) -> None:
+    key = _key(provider, model)
+    with _LOCK:
+        state = _state(key)
+        was_open = state["state"] != CLOSED
+        state["consecutiveFailures"] = 0
+        state["probeStartedAt"] = 0.0
+        state["openSeconds"] = 0.0
+        state["openUntil"] = 0.0
+        _transition(key, state, CLOSED, "call succeeded")
+        if was_open:
+            _publish(key, state)
+
+
+def record_quota_exhausted(provider: str, model: str, retry_after_seconds: float, daily: bool = False) -> float:
+    """Block provider/model until the advertised reset; returns the blocked-until timestamp."""
+    key = _key(provider, model)
+    cooldown = settings.PROVIDER_DAILY_QUOTA_COOLDOWN_SECONDS if daily else retry_after_seconds
+    with _LOCK:
+        state = _state(key)
+        state["quotaUntil"] = max(state["quotaUntil"], time.time() + max(cooldown, 0.0))
+        state["probeStartedAt"] = 0.0
+        state["lastReason"] = "daily quota" if daily else "rate limited"
+        logger.warning("provider_quota_blocked key=%s seconds=%.0f daily=%s", key, cooldown, daily)
+        _publish(key, state)
+        return state["quotaUntil"]
+
+
+def record_failure(provider: str, model: str, reason: str, *, open_now: bool = False, open_seconds: Optional[float] = None) -> bool:
+    """
+    Count a failed call. Opens the circuit after PROVIDER_CIRCUIT_FAILURE_THRESHOLD
+    consecutive failures, on a failed half-open probe, or immediately with `open_now`.
+
+    Returns True when the circuit is open after this failure.
+    """
+    key = _key(provider, model)
+    with _LOCK:
+        state = _state(key)
+        state["consecutiveFailures"] += 1
+        state["lastReason"] = reason
+        failed_probe = state["state"] == HALF_OPEN
+        state["probeStartedAt"] = 0.0
+
+        should_open = (
+            open_now
+            or failed_probe
+            or state["consecutiveFailures"] >= settings.PROVIDER_CIRCUIT_FAILURE_THRESHOLD
+        )
+        if not should_open:
+            return state["state"] == OPEN
+
+        if open_seconds is not None:
+            cooldown = open_seconds
+        elif failed_probe and state["openSeconds"]:
+            cooldown = min(state["openSeconds"] * 2, settings.PROVIDER_CIRCUIT_MAX_OPEN_SECONDS)
+        else:
+            cooldown = settings.PROVIDER_CIRCUIT_OPEN_SECONDS
+        state["openSeconds"] = cooldown
+        state["openUntil"] = time.time() + cooldown
+        _transition(key, state, OPEN, reason)
+        _publish(key, state)
+        return True
+
+
+def get_provider_health_stats() -> Dict[str, Dict[str, Any]]:
+    now = time.time()
+    with _LOCK:
+        _sync_from_shared()
+        return {
+            key: {
+                "state": state["state"],
+                "consecutiveFailures": state["consecutiveFailures"],
+                "openForSeconds": round(max(state["openUntil"] - now, 0.0), 1) if state["state"] == OPEN else 0.0,
+                "quotaBlockedForSeconds": round(max(state["quotaUntil"] - now, 0.0), 1),
+                "shortCircuited": state["shortCircuited"],
+                "headroom": state["headroom"],
+                "lastReason": state["lastReason"],
+                "transitions": dict(state["transitions"]),
+            }
+            for key, state in sorted(_STATES.items())
+        }
+
+
+def reset_provider_health() -> None:
+    with _LOCK:
+        _STATES.clear()
+        _FILE_MTIME.clear()
@@ -2,7 +2,11 @@ from typing import List, Dict, Any, Optional
 from config import settings
 from utils.text_processing import chunk_text
 from services.scraper_service import candidate_urls
-from services.embedding_service import embed_texts
+from services.blocking_io import run_blocking
+from services.embedding_service import embed_texts_async
+from services.cpu_executor import run_cpu
+from services.cpu_tasks import extract_paragraph_text_task
+from utils import singleflight
 from utils.cache import get_if_fresh, set_with_ttl
 import asyncio, uuid, logging
 
@@ -151,7 +155,18 @@ async def quick_seed_now(
     ULTRA-OPTIMIZED: Uses cached snippets from SerpAPI.
     Cache prevents redundant API calls and embedding operations.
     Falls back to synthetic seed data if API unavailable.
+    Concurrent seeds of one namespace share a single run (utils.singleflight).
     """
+    return await singleflight.run(
+        "seed", namespace, _quick_seed, user_id, language, niche, region, season, seed_keywords, namespace
+    )
+
+
+async def _quick_seed(
+    user_id: str, language: str, niche: str,
+    region: Optional[str], season: Optional[str],
+    seed_keywords: List[str], namespace: str
+):
     key = f"seeded:{namespace}"
     if get_if_fresh(key):
         logger.info("quick_seed cache HIT", extra={"namespace": namespace})
@@ -194,8 +209,8 @@ async def quick_seed_now(
     
     # OPTIMIZATION: Embed in ONE batch call (Cohere supports batch)
     if texts:
-        embs = embed_texts(texts)
-        _store(namespace, texts, metas, embs)
+        embs = await embed_texts_async(texts)
+        await _store_async(namespace, texts, metas, embs)
     
     # Cache for 6 hours to avoid redundant work
     set_with_ttl(key, True, settings.CACHE_TTL_SECONDS)
@@ -289,11 +304,13 @@ async def _build_index(
         for i, html in enumerate(htmls):
             if html and len(html) > 200:
                 # Extract text from HTML
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(html, "html.parser")
-                for tag in soup(["script","style","nav","footer","header","noscript"]):
-                    tag.extract()
-                txt = " ".join([p.get_text(" ", strip=True) for p in soup.find_all(["p","li"])])[:6000]
+                txt = await run_cpu(
+                    "extract_paragraph_text",
+                    extract_paragraph_text_task,
+                    html,
+                    6000,
+                    size=len(html),
+                )
                 
                 if txt:
                     chunks = chunk_text(txt, max_words=120)
@@ -319,8 +336,8 @@ async def _build_index(
             metas.append({"url": f"seed:{sk}", "language": language, "niche": niche, "source": "seed", "snippet": synthetic[:320]})
     
     # OPTIMIZED: Batch embedding in optimized chunks
-    embs = embed_texts(texts)
-    _store(namespace, texts, metas, embs)
+    embs = await embed_texts_async(texts)
+    await _store_async(namespace, texts, metas, embs)
     logger.info("build_index_complete", extra={"ns": namespace, "chunks": len(texts)})
 
 def _store(ns: str, texts: List[str], metas: List[Dict[str, Any]], embs: List[List[float]]):
@@ -332,6 +349,13 @@ def _store(ns: str, texts: List[str], metas: List[Dict[str, Any]], embs: List[Li
     else:
         _memory_upsert(ns, texts, metas, embs)
 
+async def _store_async(ns: str, texts: List[str], metas: List[Dict[str, Any]], embs: List[List[float]]):
+    backend = settings.VECTOR_BACKEND.lower()
+    if backend in {"qdrant", "pgvector"}:
+        await run_blocking(backend, _store, ns, texts, metas, embs)
+    else:
+        _store(ns, texts, metas, embs)
+
 async def retrieve_context(
     user_id: str, language: str, niche: Optional[str], persona: Optional[Dict[str, Any]],
     topic: str, focus_keyword: Optional[str], include_trends: bool, namespace: str, top_k: int = 30
@@ -342,11 +366,11 @@ async def retrieve_context(
     if focus_keyword:
         query_text += f"Focus keyword: {focus_keyword}. "
     try:
-        q_vec = embed_texts([query_text])[0]
+        q_vec = (await embed_texts_async([query_text]))[0]
     except Exception:
         return {"snippets": [], "usedRAG": False}
 
-    hits = _search(namespace, q_vec, top_k=top_k)
+    hits = await _search_async(namespace, q_vec, top_k=top_k)
     seen, snippets = set(), []
     for h in hits:
         url = h.get("payload", {}).get("url")
@@ -368,3 +392,9 @@ def _search(ns: str, qvec: List[float], top_k: int):
         return _pg_search(ns, qvec, top_k)
     else:
         return _memory_search(ns, qvec, top_k)
+
+async def _search_async(ns: str, qvec: List[float], top_k: int):
+    backend = settings.VECTOR_BACKEND.lower()
+    if backend in {"qdrant", "pgvector"}:
+        return await run_blocking(backend, _search, ns, qvec, top_k)
+    return _search(ns, qvec, top_k)
@@ -19,12 +19,9 @@ def blog_to_html(data: Dict[str, Any]) -> str:
     if h1:
         parts.append(f"<h1>{h1}</h1>")
     for sec in sections:
-        h2 = html.escape(sec.get("h2", ""))
-        body = sec.get("body", "")
-        if h2:
-            parts.append(f"<h2>{h2}</h2>")
-        if body:
-            parts.append(_p(body))
+        section_html = blog_section_to_html(sec)
+        if section_html:
+            parts.append(section_html)
     if faqs:
         parts.append("<section class='faqs'>")
         for f in faqs:
@@ -38,6 +35,16 @@ def blog_to_html(data: Dict[str, Any]) -> str:
         parts.append("<!-- image-prompts: " + html.escape(str(images)) + " -->")
     return "\n".join(parts)
 
+def blog_section_to_html(sec: Dict[str, Any]) -> str:
+    h2 = html.escape(sec.get("h2", ""))
+    body = sec.get("body", "")
+    parts: List[str] = []
+    if h2:
+        parts.append(f"<h2>{h2}</h2>")
+    if body:
+        parts.append(_p(body))
+    return "\n".join(parts)
+
 def blog_to_plain(data: Dict[str, Any]) -> str:
     title = (data.get("title", "") or "").strip()
     h1 = (data.get("h1", "") or "").strip()
@@ -89,3 +96,14 @@ def instagram_to_plain(data: Dict[str, Any]) -> str:
     if tag_line:
         return caption + "\n\n" + tag_line
     return caption
+
+def render_sections(platform: str, data: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Per-section HTML for streaming: one entry per blog section, a single one for social posts."""
+    if platform == "blog":
+        return [
+            {"kind": "section", "h2": sec.get("h2", ""), "html": blog_section_to_html(sec)}
+            for sec in data.get("sections", []) or []
+        ]
+    if platform == "linkedin":
+        return [{"kind": "post", "html": linkedin_to_html(data)}]
+    return [{"kind": "post", "html": instagram_to_html(data)}]
@@ -0,0 +1,183 @@
+"""
+Section-level repair for blog payloads.
+
+Instead of resending the whole conversation and regenerating the article
+when it comes back too short or in the wrong language, find the sections
+that are actually at fault and rewrite only those, concurrently, with small
+single-section prompts. The rewritten sections are merged back into the
+structured payload before rendering.
+
+A section is flagged when its body is
+- empty,
+- shorter than SHORT_SECTION_RATIO of its share of the target length
+  (the same ratio _prepare_blog_payload uses for the whole article, so a
+  short article always has at least one short section), or
+- detected in another language than requested (only for bodies long
+  enough for langdetect to be trusted).
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from services import llm_router, token_budget
+from services.cpu_executor import run_cpu
+from services.cpu_tasks import LANGDETECT_INLINE_MAX_CHARS, detect_language_task
+
+logger = logging.getLogger(__name__)
+
+SHORT_SECTION_RATIO = 0.65
+LANGDETECT_MIN_WORDS = 12
+
+
+async def _section_language(body: str) -> str:
+    sample = body[:400]
+    try:
+        return (
+            await run_cpu("langdetect", detect_language_task, sample, size=len(sample), inline_below=LANGDETECT_INLINE_MAX_CHARS)
+        ).lower()
+    except Exception:
+        return ""
+
+
+async def plan_section_repairs(
+    sections: List[Dict[str, str]],
+    target_length: int,
+    language: str,
+) -> List[Dict[str, Any]]:
+    """
+    Returns one entry per failing section:
+    {"index", "reasons", "words", "targetWords"}.
+    """
+    if not sections:
+        return []
+    expected_language = (language or "en").split("-")[0].lower()
+    per_section = max(1, int(target_length / len(sections)))
+    word_counts = [len(str(sec.get("body") or "").split()) for sec in sections]
+
+    checked = [index for index, words in enumerate(word_counts) if words >= LANGDETECT_MIN_WORDS]
+    detected = await asyncio.gather(*(_section_language(sections[index]["body"]) for index in checked))
+    languages = dict(zip(checked, detected))
+
+    plan = []
+    for index, words in enumerate(word_counts):
+        reasons = []
+        if words == 0:
+            reasons.append("empty body")
+        elif words < SHORT_SECTION_RATIO * per_section:
+            reasons.append("too short")
+        if languages.get(index) and languages[index] != expected_language:
+            reasons.append(f"wrong language ({languages[index]})")
+        if reasons:
+            plan.append({"index": index, "reasons": reasons, "words": words, "targetWords": per_section})
+    return plan
+
+
+def _section_messages(
+    data: Dict[str, Any],
+    item: Dict[str, Any],
+    *,
+    topic_or_idea: str,
+    focus_keyword: str,
+    language: str,
+) -> List[Dict[str, str]]:
+    sections = data.get("sections") or []
+    section = sections[item["index"]]
+    outline = "\n".join(f"{i + 1}. {sec.get('h2', '')}" for i, sec in enumerate(sections))
+    system = (
+        "You rewrite a single section of a blog article. "
+        f"Write in language '{language}'. "
+        'Return ONLY JSON: {"h2": "section heading", "body": "section text"}'
+    )
+    user = f"""Article: {data.get('h1') or data.get('title') or topic_or_idea}
+Focus keyword: {focus_keyword}
+Outline:
+{outline}
+
+Rewrite section {item['index'] + 1}. Problems: {', '.join(item['reasons'])}.
+Target length: about {item['targetWords']} words of body text, plain paragraphs, no headings inside the body.
+
+Current section:
+{json.dumps(section, ensure_ascii=False)}"""
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+async def _regenerate_one(data, item, *, topic_or_idea, focus_keyword, language):
+    llm_router.reset_routing()
+    max_tokens = token_budget.estimate_section_tokens(item["targetWords"], language)
+    result = await llm_router.call_routed_json(
+        "content",
+        messages=_section_messages(
+            data,
+            item,
+            topic_or_idea=topic_or_idea,
+            focus_keyword=focus_keyword,
+            language=language,
+        ),
+        max_tokens=max_tokens,
+        temperature=0.4,
+        required_keys=["body"],
+    )
+    return result, llm_router.capture_routing()
+
+
+async def repair_sections(
+    data: Dict[str, Any],
+    plan: List[Dict[str, Any]],
+    *,
+    topic_or_idea: str,
+    focus_keyword: str,
+    language: str,
+) -> Dict[str, Any]:
+    """
+    Regenerate the planned sections concurrently and merge them into `data`
+    in place. A section whose rewrite fails (or comes back empty) keeps its
+    original text. Returns a summary for diagnostics.
+    """
+    results = await asyncio.gather(
+        *(
+            _regenerate_one(data, item, topic_or_idea=topic_or_idea, focus_keyword=focus_keyword, language=language)
+            for item in plan
+        ),
+        return_exceptions=True,
+    )
+
+    repaired: List[int] = []
+    failed: List[int] = []
+    sections = data.get("sections") or []
+    for item, result in zip(plan, results):
+        index = item["index"]
+        if isinstance(result, BaseException):
+            logger.warning("section_repair_failed index=%s error=%s", index, result)
+            failed.append(index)
+            continue
+        rewrite, decisions = result
+        llm_router.restore_routing(decisions)
+        body = " ".join(str((rewrite or {}).get("body") or "").split()).strip()
+        if not body:
+            failed.append(index)
+            continue
+        h2 = " ".join(str(rewrite.get("h2") or "").split()).strip()
+        sections[index] = {"h2": h2 or sections[index].get("h2", ""), "body": body}
+        repaired.append(index)
+
+    logger.info("section_repair planned=%s repaired=%s failed=%s", len(plan), repaired, failed)
+    return {
+        "mode": "sections",
+        "planned": [{"index": item["index"], "reasons": item["reasons"]} for item in plan],
+        "repaired": repaired,
+        "failed": failed,
+    }
+
+
+def sections_repairable(repair_issues: List[str], plan: List[Dict[str, Any]], data: Optional[Dict[str, Any]]) -> bool:
+    """Section-level repair only makes sense when every issue can be pinned on specific sections."""
+    if not plan or not (data or {}).get("sections"):
+        return False
+    section_level = ("Content is significantly shorter than target length", "Output language must be")
+    if not all(issue.startswith(section_level) for issue in repair_issues):
+        return False
+    if any(issue.startswith("Output language must be") for issue in repair_issues):
+        return any(reason.startswith("wrong language") for item in plan for reason in item["reasons"])
+    return True
@@ -3,9 +3,13 @@ import feedparser, httpx, logging, asyncio
 from urllib.parse import quote_plus, urlparse
 from urllib import robotparser
 from config import settings
+from services.blocking_io import run_blocking
+from utils import singleflight
 
 logger = logging.getLogger(__name__)
 
+FEED_TIMEOUT = 15  # seconds
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -28,6 +32,10 @@ def _allowed(url: str) -> bool:
         return True
 
 async def fetch_html(url: str) -> str:
+    """Fetch one page; concurrent fetches of the same URL share one request."""
+    return await singleflight.run("scrape", ("html", url), _fetch_html, url)
+
+async def _fetch_html(url: str) -> str:
     if not _allowed(url):
         return ""
     try:
@@ -56,7 +64,7 @@ async def google_news_items(query: str) -> List[Dict]:
     q = quote_plus(query)
     url = f"https://news.google.com/rss/search?q={q}&hl={settings.GN_HL}&gl={settings.GN_GL}&ceid={settings.GN_CEID}"
     try:
-        fp = feedparser.parse(url)
+        fp = await run_blocking("feedparser", feedparser.parse, url, timeout=FEED_TIMEOUT)
         return [{"title": e.get("title",""), "url": e.get("link","")} for e in fp.entries[:10]]
     except Exception:
         return []
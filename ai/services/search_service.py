@@ -2,20 +2,28 @@
 
 import httpx
 import logging
-import asyncio
 from typing import List, Dict
 from config import settings
+from services.blocking_io import run_blocking
+from utils import singleflight
 
 logger = logging.getLogger(__name__)
 
+DDG_SEARCH_TIMEOUT = 15  # seconds
+FEED_TIMEOUT = 15  # seconds
+
 async def google_search(query: str, num_results: int = 5) -> List[Dict[str, str]]:
     """
     Multi-tier search with automatic fallback:
     1. SerpAPI (best quality, 100/month limit)
     2. DuckDuckGo (unlimited, decent quality)
     3. Google News RSS (backup for news content)
+
+    Identical concurrent queries share one search (utils.singleflight).
     """
-    
+    return await singleflight.run("search", ("google", query, num_results), _google_search, query, num_results)
+
+async def _google_search(query: str, num_results: int) -> List[Dict[str, str]]:
     # Tier 1: Try SerpAPI first (best quality)
     serpapi_key = getattr(settings, 'SERPAPI_KEY', None)
     if serpapi_key:
@@ -91,9 +99,8 @@ async def _duckduckgo_search(query: str, num_results: int) -> List[Dict[str, str
         logger.error("ddgs not installed. Run: pip install -r requirements.txt")
         return []
     
-    # Run sync DDG search in thread pool
-    loop = asyncio.get_event_loop()
-    results = await loop.run_in_executor(None, _sync_ddg_search, query, num_results)
+    # Run sync DDG search on the dedicated DDGS pool
+    results = await run_blocking("ddgs", _sync_ddg_search, query, num_results, timeout=DDG_SEARCH_TIMEOUT)
     return results
 
 def _sync_ddg_search(query: str, num_results: int) -> List[Dict[str, str]]:
@@ -128,7 +135,7 @@ async def _google_news_search(query: str, num_results: int) -> List[Dict[str, st
     q = quote_plus(query)
     url = f"https://news.google.com/rss/search?q={q}&hl=en&gl=US&ceid=US:en"
     
-    fp = feedparser.parse(url)
+    fp = await run_blocking("feedparser", feedparser.parse, url, timeout=FEED_TIMEOUT)
     results = []
     
     for entry in fp.entries[:num_results]:
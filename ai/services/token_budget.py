@@ -0,0 +1,163 @@
+"""
+Adaptive output-token budgets for content generation.
+
+max_tokens used to be fixed per platform (blog 2000, LinkedIn 800,
+Instagram 700) whatever the target length or language, so long blogs in
+token-dense languages were truncated every time and paid for a repair call.
+
+The budget is now target words x tokens-per-word x (1 + headroom). The
+tokens-per-word ratio starts from a per-language prior and per-provider
+tokenizer factor, and is refined with an EWMA over observed outputs
+(completion tokens / words actually produced, JSON overhead included).
+
+Truncation and repair rates are counted per budgeting mode ("fixed" when
+TOKEN_BUDGET_ADAPTIVE is off, "adaptive" otherwise) so the two can be
+compared on GET /metrics.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+LEGACY_MAX_TOKENS = {"blog": 2000, "linkedin": 800, "instagram": 700}
+PLATFORM_MIN_TOKENS = {"blog": 1200, "linkedin": 600, "instagram": 500}
+# LinkedIn/Instagram prompts pin their own length; targetLength only caps it
+PLATFORM_MAX_WORDS = {"linkedin": 450, "instagram": 220}
+FIXED_OVERHEAD_TOKENS = 150  # title, meta, image prompts, JSON scaffolding
+SECTION_MIN_TOKENS = 300
+SECTION_MAX_TOKENS = 2000
+MIN_OBSERVED_WORDS = 40
+
+# Output tokens per content word, JSON keys and markup included
+LANGUAGE_PRIORS = {
+    "en": 1.6,
+    "es": 1.9,
+    "fr": 1.9,
+    "it": 1.9,
+    "pt": 1.9,
+    "nl": 2.0,
+    "de": 2.1,
+    "pl": 2.4,
+    "tr": 2.5,
+    "ru": 2.6,
+    "ar": 2.8,
+    "zh": 2.5,
+    "ja": 3.0,
+    "ko": 3.0,
+    "hi": 3.2,
+}
+DEFAULT_PRIOR = 2.2
+PROVIDER_FACTORS = {"gemini": 1.0, "groq": 1.1}
+
+_LOCK = threading.Lock()
+_RATIOS: Dict[str, Dict[str, Any]] = {}
+_OUTCOMES: Dict[str, Dict[str, int]] = {}
+
+
+def _language_key(language: Optional[str]) -> str:
+    return (language or "en").split("-")[0].lower()
+
+
+def _key(provider: str, language: str) -> str:
+    return f"{provider}:{_language_key(language)}"
+
+
+def _prior(provider: str, language: str) -> float:
+    return LANGUAGE_PRIORS.get(_language_key(language), DEFAULT_PRIOR) * PROVIDER_FACTORS.get(provider, 1.0)
+
+
+def tokens_per_word(provider: str, language: str) -> float:
+    with _LOCK:
+        learned = _RATIOS.get(_key(provider, language))
+    return learned["ratio"] if learned else _prior(provider, language)
+
+
+def _budget_ratio(language: str, providers: Optional[Iterable[str]]) -> float:
+    # The provider is only known after routing, so budget for the hungriest candidate
+    return max(tokens_per_word(provider, language) for provider in (providers or PROVIDER_FACTORS))
+
+
+def payload_words(data: Any) -> int:
+    """Words in every string value of a parsed payload."""
+    if isinstance(data, str):
+        return len(data.split())
+    if isinstance(data, dict):
+        return sum(payload_words(value) for value in data.values())
+    if isinstance(data, list):
+        return sum(payload_words(value) for value in data)
+    return 0
+
+
+def observe(provider: str, language: str, words: int, output_tokens: Optional[int]) -> None:
+    """Fold one observed output into the provider/language ratio."""
+    if not output_tokens or words < MIN_OBSERVED_WORDS:
+        return
+    sample = min(6.0, max(0.5, output_tokens / words))
+    alpha = settings.TOKEN_BUDGET_EWMA_ALPHA
+    key = _key(provider, language)
+    with _LOCK:
+        state = _RATIOS.setdefault(key, {"ratio": _prior(provider, language), "samples": 0})
+        state["ratio"] = (1 - alpha) * state["ratio"] + alpha * sample
+        state["samples"] += 1
+    logger.debug("token_budget_observe key=%s sample=%.2f ratio=%.2f", key, sample, state["ratio"])
+
+
+def budgeting_mode() -> str:
+    return "adaptive" if settings.TOKEN_BUDGET_ADAPTIVE else "fixed"
+
+
+def estimate_max_tokens(
+    platform: str,
+    language: str,
+    target_length: int,
+    providers: Optional[Iterable[str]] = None,
+) -> int:
+    if not settings.TOKEN_BUDGET_ADAPTIVE:
+        return LEGACY_MAX_TOKENS.get(platform, LEGACY_MAX_TOKENS["blog"])
+    words = max(1, target_length)
+    if platform in PLATFORM_MAX_WORDS:
+        words = min(words, PLATFORM_MAX_WORDS[platform])
+    budget = words * _budget_ratio(language, providers) * (1 + settings.TOKEN_BUDGET_HEADROOM) + FIXED_OVERHEAD_TOKENS
+    floor = PLATFORM_MIN_TOKENS.get(platform, PLATFORM_MIN_TOKENS["blog"])
+    return int(min(settings.TOKEN_BUDGET_MAX_OUTPUT_TOKENS, max(floor, budget)))
+
+
+def estimate_section_tokens(words: int, language: str, providers: Optional[Iterable[str]] = None) -> int:
+    """max_tokens for a single-section call of about `words` words."""
+    budget = words * _budget_ratio(language, providers) * (1 + settings.TOKEN_BUDGET_HEADROOM) + 50
+    return int(min(SECTION_MAX_TOKENS, max(SECTION_MIN_TOKENS, budget)))
+
+
+def record_generation(platform: str, truncated: bool, repaired: bool) -> None:
+    mode = budgeting_mode()
+    with _LOCK:
+        outcome = _OUTCOMES.setdefault(mode, {"calls": 0, "truncated": 0, "repaired": 0})
+        outcome["calls"] += 1
+        outcome["truncated"] += int(truncated)
+        outcome["repaired"] += int(repaired)
+    if truncated:
+        logger.info("token_budget_truncated platform=%s mode=%s", platform, mode)
+
+
+def get_token_budget_stats() -> Dict[str, Any]:
+    with _LOCK:
+        ratios = {key: {"ratio": round(state["ratio"], 3), "samples": state["samples"]} for key, state in _RATIOS.items()}
+        outcomes = {
+            mode: {
+                **counts,
+                "truncationRate": round(counts["truncated"] / counts["calls"], 3) if counts["calls"] else 0.0,
+                "repairRate": round(counts["repaired"] / counts["calls"], 3) if counts["calls"] else 0.0,
+            }
+            for mode, counts in _OUTCOMES.items()
+        }
+    return {"mode": budgeting_mode(), "ratios": ratios, "outcomes": outcomes}
+
+
+def reset_token_budget() -> None:
+    with _LOCK:
+        _RATIOS.clear()
+        _OUTCOMES.clear()
@@ -128,30 +128,33 @@ async def test_rag_extraction():
 
 
 async def test_groq_llm():
-    """Test 4: Groq LLM (for topics)"""
-    print("\n[TEST 4] Groq LLM (Topics)")
+    """Test 4: routed LLM call (router + circuit breaker, as the service uses it)"""
+    print("\n[TEST 4] Routed LLM (Content)")
     try:
-        from services.llm_service import chat_groq
+        from services import llm_router
         
         start = datetime.now()
-        response = await chat_groq(
+        response = await llm_router.call_routed(
+            "content",
             [
                 {"role": "system", "content": "You are a helpful assistant. Return JSON only."},
                 {"role": "user", "content": '{"test": "Generate a simple JSON response"}'}
             ],
             max_tokens=100,
-            temperature=0.7
+            temperature=0.7,
+            json_mode=True,
         )
         duration = (datetime.now() - start).total_seconds()
         
         assert response
         data = json.loads(response)
-        print(f"  → Groq response received")
+        decision = llm_router.get_routing_decisions()[-1]
+        print(f"  → Response received from {decision['executedProvider']}")
         print(f"  → Sample: {str(data)[:50]}...")
-        runner.log_success("Groq LLM", duration)
+        runner.log_success("Routed LLM", duration)
         
     except Exception as e:
-        runner.log_failure("Groq LLM", e)
+        runner.log_failure("Routed LLM", e)
 
 
 async def test_gemini_llm():
@@ -22,6 +22,17 @@ from fastapi.testclient import TestClient
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from main import app
+from services import generation_cache, idempotency
+
+
+@pytest.fixture(autouse=True)
+def _fresh_generation_cache():
+    """Generation results and idempotent responses are kept in-process; start every test empty."""
+    generation_cache.reset_generation_cache()
+    idempotency.reset_idempotency()
+    yield
+    generation_cache.reset_generation_cache()
+    idempotency.reset_idempotency()
 
 
 @pytest.fixture(scope="session")
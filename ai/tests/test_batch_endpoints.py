@@ -0,0 +1,151 @@
+"""
+tests/test_batch_endpoints.py
+POST /content/generate-batch and /topic/suggest-batch — NDJSON in completion order.
+Research and generation are stubbed — no external API calls.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from config import settings
+from main import app
+from services import batch_service, generation_service
+
+
+def _content_item(topic, platform="linkedin"):
+    return {
+        "userId": "u1",
+        "platform": platform,
+        "topicOrIdea": topic,
+        "focusKeyword": "remote work",
+        "includeTrend": False,
+    }
+
+
+def _topic_item(niche, count=3):
+    return {"userId": "u1", "niche": niche, "persona": {"role": "founder"}, "count": count, "includeTrends": False}
+
+
+async def _post_lines(path, payload):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(path, json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+@pytest.fixture
+def content_stubs(monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_CONCURRENCY", 2)
+    state = {"research": [], "running": 0, "peak": 0}
+
+    async def fake_research(**kwargs):
+        state["research"].append(kwargs["topic_or_idea"])
+        await asyncio.sleep(0.02)
+        return {
+            "retrievedContext": {"snippets": []},
+            "indexedPolicy": {"reason": "stubbed", "overlapTerms": []},
+            "indexedNamespace": "test",
+            "useIndexedContext": False,
+            "ragMode": "stubbed",
+        }
+
+    async def fake_generate(*, platform, topic_or_idea, **kwargs):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        try:
+            await asyncio.sleep(0.2 if topic_or_idea == "Slow topic" else 0.02)
+        finally:
+            state["running"] -= 1
+        if topic_or_idea == "Broken topic":
+            raise RuntimeError("provider down")
+        return {"plainText": f"{platform}: {topic_or_idea}"}, {"model": "fake"}, None
+
+    monkeypatch.setattr(generation_service, "get_content_research_bundle", fake_research)
+    monkeypatch.setattr(generation_service, "generate_content_json", fake_generate)
+    return state
+
+
+@pytest.mark.unit
+async def test_content_batch_streams_in_completion_order_and_isolates_failures(content_stubs):
+    items = [
+        _content_item("Slow topic"),
+        _content_item("Remote rituals"),
+        _content_item("Remote rituals", platform="instagram"),
+        _content_item("Broken topic"),
+    ]
+
+    lines = await _post_lines("/content/generate-batch", {"items": items})
+
+    results, summary = lines[:-1], lines[-1]
+    assert results[-1]["index"] == 0  # the slow item finishes last
+    by_index = {line["index"]: line for line in results}
+    assert by_index[2]["status"] == "ok"
+    assert by_index[2]["result"]["contentForEditor"]["plainText"] == "instagram: Remote rituals"
+    assert by_index[3] == {"index": 3, "status": "error", "error": "provider down", "ms": by_index[3]["ms"]}
+    assert (summary["done"], summary["items"], summary["ok"], summary["failed"]) == (True, 4, 3, 1)
+    assert summary["researchRuns"] == 3
+    assert sorted(content_stubs["research"]) == ["Broken topic", "Remote rituals", "Slow topic"]
+    assert content_stubs["peak"] <= 2
+
+
+@pytest.mark.unit
+async def test_topic_batch_shares_research_between_identical_inputs(monkeypatch):
+    research_calls = []
+
+    async def fake_research(req):
+        research_calls.append(req.niche)
+        return "ns", {"snippets": []}, 0
+
+    async def fake_topics(**kwargs):
+        if kwargs["niche"] == "broken":
+            raise RuntimeError("quota")
+        ideas = [{"title": f"{kwargs['niche']} idea {i}"} for i in range(kwargs["count"])]
+        return [{"label": kwargs["niche"], "ideas": ideas}], ideas, {}
+
+    monkeypatch.setattr(generation_service, "topic_research", fake_research)
+    monkeypatch.setattr(generation_service, "generate_topics_json", fake_topics)
+
+    lines = await _post_lines(
+        "/topic/suggest-batch",
+        {"items": [_topic_item("saas"), _topic_item("saas", count=5), _topic_item("broken")]},
+    )
+
+    by_index = {line["index"]: line for line in lines[:-1]}
+    assert len(by_index[1]["result"]["ideas"]) == 5
+    assert by_index[1]["result"]["diagnostics"]["namespace"] == "ns"
+    assert by_index[2]["status"] == "error"
+    assert research_calls == ["saas", "broken"]
+    assert lines[-1]["researchRuns"] == 2
+
+
+@pytest.mark.unit
+async def test_closing_the_stream_cancels_pending_items():
+    cancelled = []
+
+    async def worker(item):
+        try:
+            await asyncio.sleep(0.01 if item == 0 else 5)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    lines = batch_service.ndjson_lines([0, 1, 2], worker, 3, {}, "test_batch")
+    first = json.loads(await lines.__anext__())
+    await lines.aclose()
+    await asyncio.sleep(0)
+
+    assert first["result"] == 0
+    assert sorted(cancelled) == [1, 2]
+
+
+@pytest.mark.unit
+def test_batch_size_is_bounded(client):
+    response = client.post("/topic/suggest-batch", json={"items": [_topic_item("saas")] * 26})
+
+    assert response.status_code == 422
@@ -0,0 +1,84 @@
+"""
+tests/test_blocking_io.py
+Unit tests for blocking_io — named thread pools for blocking SDK calls.
+No external API calls.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services import blocking_io
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools(monkeypatch):
+    blocking_io.shutdown_blocking_pools()
+    monkeypatch.setattr(blocking_io.settings, "BLOCKING_POOL_SIZES", "slow=1,fast=2")
+    yield
+    blocking_io.shutdown_blocking_pools()
+
+
+@pytest.mark.unit
+def test_parse_pool_sizes_ignores_invalid_entries():
+    assert blocking_io.parse_pool_sizes("ddgs=4, gemini=8,bad=x,,qdrant=0") == {
+        "ddgs": 4,
+        "gemini": 8,
+        "qdrant": 1,
+    }
+
+
+@pytest.mark.unit
+async def test_run_blocking_returns_result_and_records_stats():
+    result = await blocking_io.run_blocking("fast", lambda a, b=0: a + b, 2, b=3)
+
+    assert result == 5
+    stats = blocking_io.get_blocking_pool_stats()["fast"]
+    assert stats["maxWorkers"] == 2
+    assert stats["completed"] == 1
+    assert stats["active"] == 0
+
+
+@pytest.mark.unit
+async def test_run_blocking_times_out_without_blocking_other_pools():
+    release = threading.Event()
+
+    slow = asyncio.create_task(blocking_io.run_blocking("slow", release.wait, 5, timeout=0.1))
+    started = time.perf_counter()
+    fast_result = await blocking_io.run_blocking("fast", lambda: "ok")
+    fast_elapsed = time.perf_counter() - started
+
+    with pytest.raises(asyncio.TimeoutError):
+        await slow
+    release.set()
+
+    assert fast_result == "ok"
+    assert fast_elapsed < 0.1
+    assert blocking_io.get_blocking_pool_stats()["slow"]["timeouts"] == 1
+
+
+@pytest.mark.unit
+async def test_cancelled_caller_drops_queued_call():
+    release = threading.Event()
+    ran = []
+
+    first = asyncio.create_task(blocking_io.run_blocking("slow", release.wait, 5))
+    queued = asyncio.create_task(blocking_io.run_blocking("slow", ran.append, "queued"))
+    await asyncio.sleep(0.05)
+
+    saturated = blocking_io.get_blocking_pool_stats()["slow"]
+    assert saturated["saturation"] == 1.0
+    assert saturated["queued"] == 1
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    release.set()
+    await first
+
+    assert ran == []
+    stats = blocking_io.get_blocking_pool_stats()["slow"]
+    assert stats["cancelled"] == 1
+    assert stats["queued"] == 0
@@ -0,0 +1,116 @@
+"""
+tests/test_content_multi.py
+POST /content/generate-multi — one research bundle, platforms generated concurrently.
+Research and generation are stubbed — no external API calls.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from main import app
+from services import content_pipeline, generation_service
+
+PAYLOAD = {
+    "userId": "test-user-001",
+    "platforms": ["blog", "linkedin", "instagram"],
+    "language": "en",
+    "topicOrIdea": "Top productivity tips for remote teams",
+    "focusKeyword": "remote productivity",
+    "targetLength": 900,
+    "targetLengths": {"instagram": 120},
+    "includeTrend": False,
+}
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    state = {"research": 0, "calls": [], "running": 0, "peak": 0, "fail": set()}
+
+    async def fake_research(**kwargs):
+        state["research"] += 1
+        return {
+            "retrievedContext": {"snippets": [{"title": "Study", "url": "https://example.com", "text": "async wins"}]},
+            "indexedPolicy": {"reason": "stubbed", "overlapTerms": []},
+            "indexedNamespace": "test",
+            "useIndexedContext": False,
+            "ragMode": "stubbed",
+        }
+
+    async def fake_generate(*, platform, target_length, retrieved_context, **kwargs):
+        state["calls"].append((platform, target_length, id(retrieved_context)))
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            state["running"] -= 1
+        if platform in state["fail"]:
+            raise RuntimeError(f"{platform} provider down")
+        return {"plainText": f"{platform} post"}, {"model": "fake"}, None
+
+    monkeypatch.setattr(generation_service, "get_content_research_bundle", fake_research)
+    monkeypatch.setattr(content_pipeline, "generate_content_json", fake_generate)
+    return state
+
+
+async def _post(payload):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/content/generate-multi", json=payload)
+
+
+@pytest.mark.unit
+async def test_research_once_and_platforms_run_concurrently(stubs):
+    response = await _post(PAYLOAD)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert stubs["research"] == 1
+    assert stubs["peak"] == 3
+    assert len({context_id for _, _, context_id in stubs["calls"]}) == 1
+    assert {platform: length for platform, length, _ in stubs["calls"]} == {"blog": 900, "linkedin": 300, "instagram": 120}
+    assert set(body["results"]) == {"blog", "linkedin", "instagram"}
+    assert body["results"]["linkedin"]["contentForEditor"]["plainText"] == "linkedin post"
+    assert body["results"]["blog"]["diagnostics"]["ragMode"] == "stubbed"
+    assert body["diagnostics"]["platforms"]["instagram"]["status"] == "ok"
+    assert body["errors"] == {}
+
+
+@pytest.mark.unit
+async def test_failing_platform_is_isolated(stubs):
+    stubs["fail"] = {"instagram"}
+
+    response = await _post(PAYLOAD)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body["results"]) == {"blog", "linkedin"}
+    assert body["errors"] == {"instagram": "instagram provider down"}
+    assert body["diagnostics"]["platforms"]["instagram"]["status"] == "failed"
+
+
+@pytest.mark.unit
+async def test_all_platforms_failing_is_an_error(stubs):
+    stubs["fail"] = {"blog", "linkedin", "instagram"}
+
+    response = await _post(PAYLOAD)
+
+    assert response.status_code == 500
+
+
+@pytest.mark.unit
+async def test_unknown_platform_is_rejected(stubs):
+    response = await _post({**PAYLOAD, "platforms": ["blog", "tiktok"]})
+
+    assert response.status_code == 422
+    assert stubs["research"] == 0
+
+
+@pytest.mark.unit
+async def test_target_lengths_only_accept_known_platforms(stubs):
+    response = await _post({**PAYLOAD, "targetLengths": {"tiktok": 60}})
+
+    assert response.status_code == 422
+    assert stubs["research"] == 0
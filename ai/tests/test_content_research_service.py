@@ -29,7 +29,6 @@ async def test_content_research_reuses_inflight_and_cached_result(monkeypatch):
             "token": cache_token,
         }
 
-    content_research_service._RESEARCH_IN_FLIGHT.clear()
     monkeypatch.setattr(content_research_service, "_build_content_research", fake_build)
 
     kwargs = {
@@ -0,0 +1,132 @@
+"""
+tests/test_content_stream.py
+POST /content/generate/stream — Server-Sent Events with stubbed research and LLM streams.
+No external API calls.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import routers.content as content_router
+from models.requests import ContentGenerateRequest
+from services import generation_service, llm_router, provider_health
+from services.cpu_tasks import detect_language_task
+
+CHUNK_DELAY = 0.05
+
+BLOG_PAYLOAD = {
+    "title": "Remote productivity playbook",
+    "h1": "Remote productivity for distributed teams",
+    "sections": [
+        {"h2": "Agree on async rituals", "body": "Written updates replace most status meetings and keep everyone aligned."},
+        {"h2": "Protect focus time", "body": "Shared calendars block deep work so remote teams ship without constant interruptions."},
+    ],
+    "meta": {"description": "How remote teams stay productive.", "slug": "remote-productivity"},
+}
+
+
+async def _fake_research_bundle(**kwargs):
+    return {
+        "retrievedContext": {
+            "snippets": [{"title": "Remote work study", "url": "https://example.com/study", "text": "..."}],
+            "liveSources": 1,
+            "indexedSources": 0,
+        },
+        "indexedPolicy": {"reason": "stubbed", "overlapTerms": []},
+        "indexedNamespace": "test",
+        "useIndexedContext": False,
+        "ragMode": "live",
+    }
+
+
+@pytest.fixture
+def stubbed_stream(monkeypatch):
+    raw = json.dumps(BLOG_PAYLOAD)
+    pieces = [raw[i:i + 40] for i in range(0, len(raw), 40)]
+
+    async def fake_stream(provider, messages, max_tokens, temperature, json_mode):
+        from services.gemini_service import _record_llm_execution
+
+        for piece in pieces:
+            await asyncio.sleep(CHUNK_DELAY)
+            yield piece
+        _record_llm_execution(provider, llm_router._model_for(provider))
+
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_router, "_stream_provider", fake_stream)
+    monkeypatch.setattr(generation_service, "get_content_research_bundle", _fake_research_bundle)
+    detect_language_task("warm up the language profiles before timing")
+    return pieces
+
+
+def _parse_sse(raw_events):
+    parsed = []
+    for block in raw_events:
+        lines = dict(line.split(": ", 1) for line in block.strip().splitlines())
+        parsed.append((lines["event"], json.loads(lines["data"])))
+    return parsed
+
+
+@pytest.mark.unit
+async def test_stream_emits_research_deltas_sections_and_final(stubbed_stream):
+    request = {
+        "userId": "test-user-001",
+        "platform": "blog",
+        "language": "en",
+        "topicOrIdea": "Remote productivity",
+        "focusKeyword": "remote productivity",
+        "targetLength": 25,
+    }
+    # httpx's ASGITransport buffers whole bodies, so read the StreamingResponse directly to see arrival times.
+    response = await content_router.generate_content_stream(ContentGenerateRequest(**request))
+    assert response.media_type == "text/event-stream"
+    arrivals = []
+    buffer = ""
+    started = time.perf_counter()
+    async for text in response.body_iterator:
+        buffer += text
+        while "\n\n" in buffer:
+            block, buffer = buffer.split("\n\n", 1)
+            arrivals.append((time.perf_counter() - started, block))
+    total = time.perf_counter() - started
+
+    events = _parse_sse([block for _, block in arrivals])
+    names = [name for name, _ in events]
+    assert names[:3] == ["status", "research", "status"]
+    assert names.count("delta") == len(stubbed_stream)
+    assert names.count("section") == 2
+    assert names[-1] == "final"
+
+    research = events[1][1]
+    assert research["sources"] == [{"title": "Remote work study", "url": "https://example.com/study"}]
+
+    first_delta_at = next(at for at, block in arrivals if block.startswith("event: delta"))
+    assert first_delta_at < total / 2
+
+    final = events[-1][1]
+    assert final["contentForEditor"]["structured"]["sections"][0]["h2"] == "Agree on async rituals"
+    assert final["diagnostics"]["ragMode"] == "live"
+    assert final["diagnostics"]["routing"][0]["streamed"] is True
+    sections = [payload for name, payload in events if name == "section"]
+    assert [section["provisional"] for section in sections] == [True, True]
+    assert "<h2>Protect focus time</h2>" in sections[1]["html"]
+    last_delta = len(names) - 1 - names[::-1].index("delta")
+    assert names.index("section") < last_delta  # sections arrive while the LLM is still streaming
+
+
+@pytest.mark.unit
+async def test_stream_final_event_reports_the_request_deadline(stubbed_stream):
+    request = ContentGenerateRequest(
+        userId="test-user-001", platform="blog", topicOrIdea="Remote productivity", focusKeyword="remote productivity",
+        targetLength=25,
+    )
+    response = await content_router.generate_content_stream(request, request_timeout="20")
+    raw = "".join([text async for text in response.body_iterator])
+
+    name, final = _parse_sse([block for block in raw.split("\n\n") if block.strip()])[-1]
+    assert name == "final"
+    assert final["diagnostics"]["deadline"]["budgetMs"] == 20000
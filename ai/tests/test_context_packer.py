@@ -0,0 +1,97 @@
+"""
+tests/test_context_packer.py
+Unit tests for context_packer — relevant, de-duplicated sentences within a token budget.
+No external API calls.
+"""
+
+import pytest
+
+from services import content_research_service
+from services.context_packer import estimate_tokens, pack_documents, split_sentences
+from services.llm_service import _research_context_block
+
+QUERY = "remote work productivity"
+
+DOCS = [
+    {
+        "url": "https://a.example",
+        "title": "A",
+        "content": (
+            "We use cookies to improve your experience on this website. Skip to content. "
+            "Remote work productivity depends on clear written communication between team members. "
+            "Teams that document decisions asynchronously ship faster and hold fewer meetings. "
+            "Our office has a very nice coffee machine in the kitchen area."
+        ),
+    },
+    {
+        "url": "https://b.example",
+        "title": "B",
+        "content": (
+            "Sign up for our newsletter today and get exclusive deals every week. "
+            "Remote work productivity depends on clear written communication between team members! "
+            "Distributed teams protect deep focus time with shared calendars and quiet hours. "
+            "Asynchronous updates reduce meeting load and improve remote productivity."
+        ),
+    },
+]
+
+
+@pytest.mark.unit
+def test_split_drops_boilerplate_and_fragments():
+    sentences = split_sentences("Accept all cookies now please okay. Too short. " + DOCS[0]["content"])
+    assert not any("cookie" in sentence.lower() for sentence in sentences)
+    assert "Too short." not in sentences
+    assert sentences[0].startswith("Remote work productivity")
+
+
+@pytest.mark.unit
+def test_pack_prefers_relevant_sentences_and_removes_duplicates():
+    packed = pack_documents(DOCS, QUERY, "en", token_budget=80)
+    text = " ".join(snippet["text"] for snippet in packed["snippets"])
+
+    assert text.count("clear written communication") == 1
+    assert "coffee machine" not in text
+    assert "newsletter" not in text
+    assert packed["stats"]["duplicates"] >= 1
+    assert packed["stats"]["tokens"] <= 80
+    assert {snippet["url"] for snippet in packed["snippets"]} == {"https://a.example", "https://b.example"}
+
+
+@pytest.mark.unit
+def test_pack_respects_budget_and_source_share():
+    long_doc = {
+        "url": "https://long.example",
+        "title": "Long",
+        "content": " ".join(f"Remote work productivity tip number {i} is to write things down clearly." for i in range(200)),
+    }
+    packed = pack_documents([long_doc], QUERY, "en", token_budget=300)
+
+    assert packed["stats"]["tokens"] <= 300 * 0.4
+    assert estimate_tokens(packed["snippets"][0]["text"]) < estimate_tokens(long_doc["content"]) / 10
+
+
+@pytest.mark.unit
+def test_context_block_does_not_repeat_keywords():
+    block = _research_context_block(
+        {
+            "keywords": ["async", "focus time"],
+            "snippets": [
+                {"title": "Relevant angles", "url": "", "text": "async, focus time"},
+                {"title": "A", "url": "https://a.example", "text": "Packed sentence."},
+            ],
+        }
+    )
+    assert block.count("async, focus time") == 1
+    assert "[Source 1]\nTitle: A" in block
+
+
+@pytest.mark.unit
+async def test_research_falls_back_to_page_prefixes(monkeypatch):
+    async def failing_run_cpu(*args, **kwargs):
+        raise RuntimeError("pool down")
+
+    monkeypatch.setattr(content_research_service, "run_cpu", failing_run_cpu)
+    snippets, stats = await content_research_service._pack_live_context(DOCS, QUERY, "en")
+
+    assert stats is None
+    assert snippets[0]["text"].startswith("We use cookies")
@@ -0,0 +1,108 @@
+"""
+tests/test_cpu_executor.py
+Unit tests for cpu_executor — process-pool offload of CPU-bound stages.
+No external API calls.
+"""
+
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from services import cpu_executor
+from services.cpu_tasks import cluster_keywords_task, detect_language_task
+
+
+@pytest.fixture
+def fresh_pool(monkeypatch):
+    cpu_executor.shutdown_cpu_pool()
+    monkeypatch.setattr(cpu_executor, "_STATS", {})
+    yield
+    cpu_executor.shutdown_cpu_pool()
+
+
+@pytest.mark.unit
+async def test_run_cpu_runs_inline_when_pool_disabled(monkeypatch, fresh_pool):
+    monkeypatch.setattr(cpu_executor.settings, "CPU_POOL_WORKERS", 0)
+
+    result = await cpu_executor.run_cpu("sum", sum, [1, 2, 3], size=10_000_000)
+
+    assert result == 6
+    stats = cpu_executor.get_cpu_pool_stats()
+    assert stats["started"] is False
+    assert stats["stages"]["sum"]["inline"] == 1
+    assert stats["stages"]["sum"]["pooled"] == 0
+
+
+@pytest.mark.unit
+async def test_run_cpu_skips_pool_for_small_inputs(monkeypatch, fresh_pool):
+    monkeypatch.setattr(cpu_executor.settings, "CPU_POOL_WORKERS", 1)
+
+    result = await cpu_executor.run_cpu("langdetect", detect_language_task, "hello", size=5, inline_below=200)
+
+    assert isinstance(result, str)
+    assert cpu_executor.get_cpu_pool_stats()["started"] is False
+    assert cpu_executor.get_cpu_pool_stats()["stages"]["langdetect"]["inline"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+async def test_run_cpu_uses_pool_and_records_queue_and_run_time(monkeypatch, fresh_pool):
+    monkeypatch.setattr(cpu_executor.settings, "CPU_POOL_WORKERS", 1)
+    phrases = [f"content marketing idea {i}" for i in range(30)] + [f"coffee brewing tip {i}" for i in range(30)]
+
+    keywords, n_clusters = await cpu_executor.run_cpu(
+        "keyword_clustering",
+        cluster_keywords_task,
+        phrases,
+        10,
+        size=len(phrases),
+        inline_below=20,
+    )
+
+    assert 2 <= n_clusters <= 5
+    assert 0 < len(keywords) <= 10
+    stage = cpu_executor.get_cpu_pool_stats()["stages"]["keyword_clustering"]
+    assert stage["pooled"] == 1
+    assert stage["queueMsMax"] >= 0
+    assert stage["runMsTotal"] > 0
+
+
+class _BrokenPool(Executor):
+    def __init__(self):
+        self.shutdown_calls = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shutdown_calls.append(cancel_futures)
+
+
+@pytest.mark.unit
+async def test_broken_pool_is_shut_down_and_replaced(monkeypatch, fresh_pool):
+    monkeypatch.setattr(cpu_executor.settings, "CPU_POOL_WORKERS", 1)
+    broken = _BrokenPool()
+    monkeypatch.setattr(cpu_executor, "_POOL", broken)
+    monkeypatch.setattr(cpu_executor, "ProcessPoolExecutor", lambda **kwargs: ThreadPoolExecutor(max_workers=1))
+
+    result = await cpu_executor.run_cpu("sum", sum, [1, 2, 3], size=10_000_000)
+
+    assert result == 6
+    assert broken.shutdown_calls == [True]
+    assert cpu_executor._POOL is not broken
+    stage = cpu_executor.get_cpu_pool_stats()["stages"]["sum"]
+    assert (stage["errors"], stage["pooled"], stage["inline"]) == (1, 1, 0)  # re-run on the new pool, not inline
+
+
+@pytest.mark.unit
+async def test_pooled_task_errors_are_counted(monkeypatch, fresh_pool):
+    monkeypatch.setattr(cpu_executor.settings, "CPU_POOL_WORKERS", 1)
+    monkeypatch.setattr(cpu_executor, "_POOL", ThreadPoolExecutor(max_workers=1))
+
+    with pytest.raises(ValueError):
+        await cpu_executor.run_cpu("parse", int, "not a number", size=10_000_000)
+
+    assert cpu_executor.get_cpu_pool_stats()["stages"]["parse"]["errors"] == 1
@@ -0,0 +1,131 @@
+"""
+tests/test_deadline.py
+Unit tests for the per-request deadline and the stages that degrade under it.
+No external API calls.
+"""
+
+import asyncio
+
+import pytest
+
+from services import gemini_service, generation_service, live_search_service, llm_router, provider_health
+from utils import deadline
+
+
+@pytest.fixture(autouse=True)
+def no_deadline():
+    deadline.clear()
+    yield
+    deadline.clear()
+
+
+@pytest.mark.unit
+def test_budget_from_header_and_no_deadline_by_default(monkeypatch):
+    monkeypatch.setattr(deadline.settings, "REQUEST_DEADLINE_SECONDS", 90.0)
+    monkeypatch.setattr(deadline.settings, "REQUEST_DEADLINE_MAX_SECONDS", 300.0)
+    assert deadline.budget_from_header("12.5") == 12.5
+    assert deadline.budget_from_header(None) == 90.0
+    assert deadline.budget_from_header("soon") == 90.0
+    assert deadline.budget_from_header("-1", default=150.0) == 150.0
+    assert deadline.budget_from_header("9999") == 300.0
+
+    assert deadline.remaining() is None
+    assert deadline.cap(8) == 8
+    assert not deadline.tight("scrape")
+    assert deadline.report() is None
+
+
+@pytest.mark.unit
+async def test_timeouts_are_capped_and_child_tasks_report_into_the_request():
+    deadline.start(5.0)
+    assert 4.0 < deadline.cap(8) <= 5.0
+    assert deadline.cap(60, minimum=10.0) == 10.0
+    assert deadline.tight("scrape")
+
+    async def stage():
+        deadline.degrade("keywords", "longest phrases instead of clustering")
+        deadline.degrade("keywords", "longest phrases instead of clustering")
+
+    await asyncio.create_task(stage())
+
+    report = deadline.report()
+    assert report["budgetMs"] == 5000
+    assert report["exceeded"] is False
+    assert [item["stage"] for item in report["degradations"]] == ["keywords"]
+
+
+@pytest.mark.unit
+async def test_tight_budget_uses_search_snippets_instead_of_scraping(monkeypatch):
+    scraped = []
+
+    async def fake_search(query, max_results=5):
+        return [{"title": f"{query} result", "url": f"https://example.com/{len(query)}", "snippet": "A useful snippet."}]
+
+    async def fake_scrape(url):
+        scraped.append(url)
+        return {"url": url, "title": "page", "content": "full page"}
+
+    monkeypatch.setattr(live_search_service, "search_ddg", fake_search)
+    monkeypatch.setattr(live_search_service, "scrape_url", fake_scrape)
+
+    deadline.start(20.0)
+    docs = await live_search_service.search_and_scrape(["saas pricing", "saas onboarding guide"], max_urls=4)
+
+    assert scraped == []
+    assert docs and all(doc["snippetOnly"] for doc in docs)
+    assert deadline.degraded("scrape")
+
+    deadline.start(120.0)
+    await live_search_service.search_and_scrape(["saas pricing"], max_urls=4)
+    assert len(scraped) == 1
+
+
+@pytest.mark.unit
+async def test_tight_budget_routes_content_to_groq(monkeypatch):
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_router.settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_router.settings, "PROVIDER_HEALTH_STATE_FILE", "")
+    calls = []
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        calls.append(provider)
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        return f"from {provider}"
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+
+    await llm_router.call_routed("content", [{"role": "user", "content": "a"}])
+    deadline.start(10.0)
+    await llm_router.call_routed("content", [{"role": "user", "content": "b"}])
+
+    assert calls == ["gemini", "groq"]
+    assert llm_router.get_routing_decisions()[-1]["reason"] == "request deadline"
+    assert deadline.report()["degradations"][0]["action"] == "groq instead of gemini"
+    llm_router.reset_router_stats()
+
+
+@pytest.mark.unit
+def test_content_endpoint_reports_the_deadline(client, monkeypatch):
+    async def fake_research(req):
+        deadline.degrade("scrape", "search snippets instead of scraping")
+        return {
+            "retrievedContext": {"snippets": []},
+            "ragMode": "live-only",
+            "indexedPolicy": {},
+            "indexedNamespace": "ns",
+        }
+
+    async def fake_generate(**kwargs):
+        return {"plainText": "body"}, {}, {}
+
+    monkeypatch.setattr(generation_service, "content_research", fake_research)
+    monkeypatch.setattr(generation_service, "generate_content_json", fake_generate)
+    body = {"userId": "u1", "platform": "blog", "topicOrIdea": "SaaS onboarding", "focusKeyword": "onboarding"}
+
+    response = client.post("/content/generate", json=body, headers={"X-Request-Timeout": "15"})
+
+    report = response.json()["diagnostics"]["deadline"]
+    assert report["budgetMs"] == 15000
+    assert report["degradations"][0]["stage"] == "scrape"
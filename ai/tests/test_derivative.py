@@ -0,0 +1,117 @@
+"""
+tests/test_derivative.py
+Derivative generation — LinkedIn/Instagram variants condensed from a finished blog.
+The provider call is stubbed — no external API calls.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from main import app
+from services import derivative_service, gemini_service, generation_service, llm_router, provider_health
+
+FILLER = "Our office plants were watered on Tuesday and the printer was restocked with fresh paper again. "
+BLOG = {
+    "title": "Remote work productivity",
+    "h1": "Remote work productivity habits that stick",
+    "meta": {"description": "How distributed teams stay productive with written decisions and focus time."},
+    "sections": [
+        {
+            "h2": "Write decisions down",
+            "body": "Remote work productivity improves when teams write every decision down in one shared place. " + FILLER * 12,
+        },
+        {
+            "h2": "Protect focus time",
+            "body": "Distributed teams protect deep focus time with quiet hours and fewer recurring meetings. " + FILLER * 12,
+        },
+    ],
+}
+LINKEDIN_BODY = (
+    "Last year our remote team almost burned out. We started writing decisions down and protecting focus time. "
+    "Here are three tips that changed how we work together every single week. What would you try first?"
+)
+INSTAGRAM_CAPTION = (
+    "Remote work does not have to feel chaotic. We write our decisions down and guard our focus hours. "
+    "Save this post for your next planning day and tell us which habit you will try first."
+)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    prompts = []
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        prompts.append((messages[0]["content"], messages[-1]["content"], max_tokens))
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        if "LinkedIn" in messages[0]["content"]:
+            return json.dumps({"body": LINKEDIN_BODY, "hashtags": ["remotework"]})
+        return json.dumps({"caption": INSTAGRAM_CAPTION, "hashtags": ["remotework"]})
+
+    async def no_research(**kwargs):
+        raise AssertionError("derivative mode must not run research")
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+    monkeypatch.setattr(generation_service, "get_content_research_bundle", no_research)
+    yield prompts
+    llm_router.reset_router_stats()
+
+
+async def _post(payload):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/content/derive", json=payload)
+
+
+@pytest.mark.unit
+async def test_summary_keeps_relevant_sentences_within_budget():
+    summary, stats = await derivative_service.summarize_blog(BLOG, "en", "remote work productivity")
+
+    assert summary.startswith("Title: Remote work productivity habits that stick")
+    assert "Summary: How distributed teams" in summary
+    assert "- Write decisions down: Remote work productivity improves" in summary
+    assert "- Protect focus time: Distributed teams protect deep focus time" in summary
+    assert summary.count("printer") <= 2
+    assert stats["packed"] is True
+    assert stats["summaryTokens"] < stats["sourceTokens"] / 3
+
+
+@pytest.mark.unit
+async def test_derive_endpoint_generates_variants_from_summary(fake_llm):
+    response = await _post({"userId": "u1", "blog": BLOG, "platforms": ["linkedin", "instagram"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["errors"] == {}
+    assert body["results"]["linkedin"]["contentForEditor"]["structured"]["body"] == LINKEDIN_BODY
+    assert body["results"]["instagram"]["contentForEditor"]["structured"]["caption"] == INSTAGRAM_CAPTION
+    assert body["results"]["linkedin"]["diagnostics"]["derivedFrom"]["title"] == BLOG["h1"]
+    assert body["diagnostics"]["summary"]["summaryTokens"] < body["diagnostics"]["summary"]["sourceTokens"]
+    assert len(fake_llm) == 2
+    assert all("Blog summary:" in user and "Research context" not in user for _, user, _ in fake_llm)
+
+
+@pytest.mark.unit
+async def test_blog_without_sections_is_rejected(fake_llm):
+    response = await _post({"userId": "u1", "blog": {"h1": "Empty", "sections": []}, "platforms": ["linkedin"]})
+
+    assert response.status_code == 422
+    assert fake_llm == []
+
+
+@pytest.mark.unit
+async def test_derive_endpoint_reports_the_request_deadline(fake_llm):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/content/derive",
+            json={"userId": "u1", "blog": BLOG, "platforms": ["linkedin"]},
+            headers={"X-Request-Timeout": "20"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["diagnostics"]["deadline"]["budgetMs"] == 20000
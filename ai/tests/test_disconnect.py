@@ -0,0 +1,186 @@
+"""
+tests/test_disconnect.py
+Unit tests for cancelling request work on client disconnect while shared work survives.
+No external API calls.
+"""
+
+import asyncio
+
+import pytest
+
+from models.requests import ContentGenerateRequest
+from models.responses import ContentGenerateResponse
+from services import content_research_service, generation_service, idempotency
+from utils import disconnect, singleflight
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    disconnect.reset_disconnect_stats()
+    singleflight.reset_singleflight_stats()
+    yield
+    disconnect.reset_disconnect_stats()
+    singleflight.reset_singleflight_stats()
+
+
+class _Client:
+    """ASGI receive channel that reports http.disconnect once `leave()` is called."""
+
+    def __init__(self):
+        self._gone = asyncio.Event()
+
+    def leave(self):
+        self._gone.set()
+
+    async def receive(self):
+        await self._gone.wait()
+        return {"type": "http.disconnect"}
+
+
+def _research_kwargs():
+    return {
+        "user_id": "u1",
+        "language": "en",
+        "topic_or_idea": "Disconnect handling",
+        "focus_keyword": "disconnects",
+        "include_trend": False,
+        "niche": "backend",
+        "seed_keywords": [],
+        "region": None,
+        "season": None,
+        "persona": None,
+        "namespace": "u1:en:disconnect-test",
+    }
+
+
+@pytest.mark.unit
+async def test_disconnect_cancels_the_request_work():
+    client = _Client()
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    running = asyncio.create_task(disconnect.run_until_disconnected(client, "test", work()))
+    await asyncio.sleep(0.01)
+    client.leave()
+
+    with pytest.raises(disconnect.ClientDisconnected):
+        await running
+    assert cancelled.is_set()
+    assert await disconnect.run_until_disconnected(_Client(), "test", asyncio.sleep(0, result="ok")) == "ok"
+    assert disconnect.get_disconnect_stats()["routes"]["test"] == {"watched": 2, "completed": 1, "disconnected": 1, "detached": 0}
+    assert disconnect.get_disconnect_stats()["cancelled"] == 1
+
+
+@pytest.mark.unit
+async def test_shared_research_runs_until_its_last_waiter_leaves(monkeypatch):
+    started, cancelled = asyncio.Event(), asyncio.Event()
+    release = asyncio.Event()
+
+    async def fake_build(**kwargs):
+        started.set()
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {"retrievedContext": {"snippets": []}, "token": kwargs["namespace"]}
+
+    monkeypatch.setattr(content_research_service, "_build_content_research", fake_build)
+    first, second = _Client(), _Client()
+    requests = [
+        asyncio.create_task(
+            disconnect.run_until_disconnected(
+                client, "research", content_research_service.get_content_research_bundle(**_research_kwargs())
+            )
+        )
+        for client in (first, second)
+    ]
+    await started.wait()
+    await asyncio.sleep(0.01)
+
+    first.leave()
+    with pytest.raises(disconnect.ClientDisconnected):
+        await requests[0]
+    assert not cancelled.is_set()  # the other request still waits for the build
+
+    release.set()
+    assert (await requests[1])["token"] == "u1:en:disconnect-test"
+
+    # Both waiters leave: the build is cancelled
+    release.clear()
+    started.clear()
+    monkeypatch.setattr(content_research_service, "get_if_fresh", lambda key: None)
+    clients = [_Client(), _Client()]
+    requests = [
+        asyncio.create_task(
+            disconnect.run_until_disconnected(
+                client, "research", content_research_service.get_content_research_bundle(**_research_kwargs())
+            )
+        )
+        for client in clients
+    ]
+    await started.wait()
+    for client in clients:
+        client.leave()
+    for request in requests:
+        with pytest.raises(disconnect.ClientDisconnected):
+            await request
+    await asyncio.sleep(0.01)
+    assert cancelled.is_set()
+    assert singleflight.get_singleflight_stats()["groups"]["research"]["abandoned"] == 1
+
+
+@pytest.mark.unit
+async def test_idempotent_execution_survives_disconnect_for_the_retry():
+    release = asyncio.Event()
+    runs = []
+
+    async def execute():
+        runs.append(1)
+        await release.wait()
+        return ContentGenerateResponse(contentForEditor={"plainText": "done"}, diagnostics={})
+
+    request = ContentGenerateRequest(userId="u1", platform="blog", topicOrIdea="Retries", focusKeyword="retries")
+    client = _Client()
+    first = asyncio.create_task(
+        disconnect.run_until_disconnected(
+            client, "content", idempotency.run_idempotent("t", "key", request, execute, ContentGenerateResponse)
+        )
+    )
+    await asyncio.sleep(0.01)
+    client.leave()
+    with pytest.raises(disconnect.ClientDisconnected):
+        await first
+    assert idempotency.get_idempotency_stats()["detached"] == 1
+    stats = disconnect.get_disconnect_stats()
+    assert stats["routes"]["content"] == {"watched": 1, "completed": 0, "disconnected": 1, "detached": 1}
+    assert stats["cancelled"] == 0  # the execution keeps running for the retry
+
+    release.set()
+    result, replayed = await idempotency.run_idempotent("t", "key", request, execute, ContentGenerateResponse)
+    assert result.contentForEditor["plainText"] == "done"
+    assert replayed in ("in-flight", "stored")
+    assert len(runs) == 1
+
+
+@pytest.mark.unit
+def test_topic_endpoint_answers_499_after_disconnect(client, monkeypatch, topic_suggest_payload):
+    async def slow_suggest(req, research=None):
+        await asyncio.sleep(30)
+
+    async def gone(request):
+        return None
+
+    monkeypatch.setattr(generation_service, "suggest_topics", slow_suggest)
+    monkeypatch.setattr(disconnect, "_wait_for_disconnect", gone)
+
+    response = client.post("/topic/suggest", json=topic_suggest_payload)
+
+    assert response.status_code == 499
+    assert client.get("/metrics").json()["disconnects"]["routes"]["topic.suggest"]["disconnected"] == 1
@@ -0,0 +1,99 @@
+"""
+tests/test_gemini_concurrency.py
+Concurrent POST /content/generate calls must overlap on the event loop.
+The research bundle and the Gemini async client are stubbed — no external API calls.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from main import app
+from services import gemini_service, generation_service
+from services.cpu_tasks import detect_language_task
+
+GEMINI_DELAY = 0.4
+CONCURRENT_REQUESTS = 5
+
+
+class _FakeAsyncModels:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def generate_content(self, model, contents, config):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(GEMINI_DELAY)
+        finally:
+            self.in_flight -= 1
+        body = "Remote teams stay productive when they agree on clear async rituals and shared goals."
+        return SimpleNamespace(text=json.dumps({"body": body, "hashtags": ["#remotework"]}))
+
+
+async def _fake_research_bundle(**kwargs):
+    return {
+        "retrievedContext": [],
+        "indexedPolicy": {"reason": "stubbed", "overlapTerms": []},
+        "indexedNamespace": "test",
+        "useIndexedContext": False,
+        "ragMode": "stubbed",
+    }
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    models = _FakeAsyncModels()
+    fake_client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    monkeypatch.setattr(gemini_service, "GEMINI_AVAILABLE", True)
+    monkeypatch.setattr(gemini_service, "GENAI_NEW_VERSION", True)
+    monkeypatch.setattr(gemini_service.settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(gemini_service, "_get_genai_client", lambda: fake_client)
+    monkeypatch.setattr(generation_service, "get_content_research_bundle", _fake_research_bundle)
+    detect_language_task("warm up the language profiles before timing")
+    return models
+
+
+@pytest.mark.unit
+async def test_concurrent_content_requests_overlap(fake_gemini, linkedin_generate_payload):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.perf_counter()
+        # Distinct topics: identical concurrent prompts would be coalesced into one call
+        responses = await asyncio.gather(*[
+            client.post(
+                "/content/generate",
+                json={**linkedin_generate_payload, "topicOrIdea": f"{linkedin_generate_payload['topicOrIdea']} #{index}"},
+            )
+            for index in range(CONCURRENT_REQUESTS)
+        ])
+        elapsed = time.perf_counter() - started
+
+    assert [response.status_code for response in responses] == [200] * CONCURRENT_REQUESTS
+    assert fake_gemini.peak_in_flight == CONCURRENT_REQUESTS
+    assert elapsed < GEMINI_DELAY * CONCURRENT_REQUESTS / 2
+
+
+@pytest.mark.unit
+def test_genai_client_is_reused_across_calls(monkeypatch):
+    created = []
+    monkeypatch.setattr(gemini_service, "_GENAI_CLIENT", None)
+    monkeypatch.setattr(gemini_service, "_GENAI_CLIENT_KEY", None)
+    monkeypatch.setattr(gemini_service.settings, "GEMINI_API_KEY", "key-a")
+    monkeypatch.setattr(
+        gemini_service,
+        "genai_sdk",
+        SimpleNamespace(Client=lambda api_key: created.append(api_key) or SimpleNamespace(api_key=api_key)),
+    )
+
+    first = gemini_service._get_genai_client()
+    assert gemini_service._get_genai_client() is first
+
+    monkeypatch.setattr(gemini_service.settings, "GEMINI_API_KEY", "key-b")
+    assert gemini_service._get_genai_client() is not first
+    assert created == ["key-a", "key-b"]
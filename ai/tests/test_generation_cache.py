@@ -0,0 +1,187 @@
+"""
+tests/test_generation_cache.py
+Unit tests for generation_cache — exact and semantic reuse of generation results.
+No external API calls.
+"""
+
+import json
+
+import pytest
+
+from services import gemini_service, generation_cache, llm_router, provider_health
+from services.llm_service import generate_content_json, generate_topics_json
+
+SENTENCE = "Remote teams write decisions down so nobody waits for the next meeting to move on. "
+MESSAGES = [{"role": "system", "content": "system"}, {"role": "user", "content": "write"}]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    state = {"calls": 0, "body": (SENTENCE * 30).strip()}
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        state["calls"] += 1
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        return json.dumps(
+            {
+                "title": "Remote work",
+                "h1": "Remote work habits for distributed teams",
+                "sections": [{"h2": "Why written decisions beat meetings", "body": state["body"]}],
+            }
+        )
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+    yield state
+    llm_router.reset_router_stats()
+
+
+def _generate(bypass_cache=False, topic="Remote work", namespace="u1:en:remote"):
+    return generate_content_json(
+        platform="blog",
+        language="en",
+        topic_or_idea=topic,
+        tone="friendly",
+        target_length=450,
+        focus_keyword="remote work",
+        style_guide=[],
+        retrieved_context={},
+        bypass_cache=bypass_cache,
+        namespace=namespace,
+    )
+
+
+def _probe(key, **strict):
+    return {"scope": "blog", "key": key, "strict": strict, "semantic": {}, "embedding": None}
+
+
+@pytest.mark.unit
+async def test_repeat_request_is_served_from_cache(fake_llm):
+    first, first_diag, _ = await _generate()
+    second, second_diag, _ = await _generate()
+
+    assert fake_llm["calls"] == 1
+    assert first_diag["cache"]["hit"] is None
+    assert second_diag["cache"]["hit"] == "exact"
+    assert second_diag["cache"]["ttlSeconds"] == 86400
+    assert second == first
+    assert generation_cache.get_generation_cache_stats()["exactHits"] == 1
+
+
+@pytest.mark.unit
+async def test_bypass_regenerates_and_refreshes_entry(fake_llm):
+    await _generate()
+    fake_llm["body"] = (SENTENCE.replace("Remote", "Hybrid") * 30).strip()
+
+    fresh, diagnostics, _ = await _generate(bypass_cache=True)
+    cached, _, _ = await _generate()
+
+    assert fake_llm["calls"] == 2
+    assert diagnostics["cache"]["bypassed"] is True
+    assert cached == fresh
+
+
+@pytest.mark.unit
+async def test_invalid_result_is_not_cached(fake_llm):
+    fake_llm["body"] = "Too short."
+
+    await _generate()
+    await _generate()
+
+    assert generation_cache.get_generation_cache_stats()["stores"] == 0
+
+
+@pytest.mark.unit
+def test_key_ignores_small_budget_drift_and_ttls_parse():
+    assert generation_cache.cache_key("content", MESSAGES, 0.7, 2100) == generation_cache.cache_key("content", MESSAGES, 0.7, 2300)
+    assert generation_cache.cache_key("content", MESSAGES, 0.7, 2100) != generation_cache.cache_key("content", MESSAGES, 0.7, 3000)
+    assert generation_cache._parse_ttls("blog=60, topics = 5,bad=x") == {"blog": 60, "topics": 5}
+
+
+@pytest.mark.unit
+async def test_entries_expire_and_lru_evicts(monkeypatch):
+    monkeypatch.setattr(generation_cache.settings, "GENERATION_CACHE_MAX_ENTRIES", 2)
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(generation_cache.time, "time", lambda: clock["now"])
+
+    for key in ("a", "b"):
+        generation_cache.store(_probe(key), key)
+    assert (await generation_cache.lookup("blog", "a"))["value"] == "a"  # "a" is now most recent
+    generation_cache.store(_probe("c"), "c")
+
+    assert (await generation_cache.lookup("blog", "b"))["value"] is None
+    assert generation_cache.get_generation_cache_stats()["evictions"] == 1
+    clock["now"] += 86401
+    assert (await generation_cache.lookup("blog", "a"))["value"] is None
+
+
+@pytest.mark.unit
+async def test_semantic_tier_matches_near_duplicates_with_same_strict_fields(monkeypatch):
+    monkeypatch.setattr(generation_cache.settings, "GENERATION_CACHE_SEMANTIC", True)
+    vectors = {"remote work tips": [1.0, 0.0], "tips for remote work": [0.99, 0.05], "tax law": [0.0, 1.0]}
+
+    async def fake_embed(text):
+        return vectors[text.split(": ", 1)[1]]
+
+    monkeypatch.setattr(generation_cache, "_embed", fake_embed)
+    strict = {"platform": "blog", "language": "en"}
+
+    probe = await generation_cache.lookup("blog", "k1", strict, {"topic": "remote work tips"})
+    generation_cache.store(probe, "cached")
+
+    near = await generation_cache.lookup("blog", "k2", strict, {"topic": "tips for remote work"})
+    other_language = await generation_cache.lookup("blog", "k3", {**strict, "language": "de"}, {"topic": "tips for remote work"})
+    unrelated = await generation_cache.lookup("blog", "k4", strict, {"topic": "tax law"})
+
+    assert near["value"] == "cached"
+    assert near["provenance"]["hit"] == "semantic"
+    assert near["provenance"]["similarity"] >= 0.95
+    assert other_language["value"] is None
+    assert unrelated["value"] is None
+
+
+@pytest.mark.unit
+async def test_semantic_hits_stay_within_the_research_namespace(fake_llm, monkeypatch):
+    monkeypatch.setattr(generation_cache.settings, "GENERATION_CACHE_SEMANTIC", True)
+
+    async def fake_embed(text):
+        return [1.0, 0.0]  # every request is a near match; only the strict fields separate them
+
+    monkeypatch.setattr(generation_cache, "_embed", fake_embed)
+
+    await _generate(topic="Remote work", namespace="u1:en:remote")
+    _, same_user, _ = await _generate(topic="Remote work habits", namespace="u1:en:remote")
+    _, other_user, _ = await _generate(topic="Remote work habits", namespace="u2:en:remote")
+
+    assert same_user["cache"]["hit"] == "semantic"
+    assert other_user["cache"]["hit"] is None
+    assert fake_llm["calls"] == 2
+
+
+@pytest.mark.unit
+async def test_topics_padded_with_fallback_ideas_are_not_cached(monkeypatch):
+    calls = []
+    ideas = ["Remote onboarding checklists that actually get used", "Async standups for teams across time zones"]
+
+    async def fake_call_routed(task, messages, **kwargs):
+        calls.append(task)
+        return json.dumps({"clusters": [], "ideas": [{"ideaText": text} for text in ideas]})
+
+    monkeypatch.setattr(llm_router, "call_routed", fake_call_routed)
+
+    def generate(count):
+        return generate_topics_json(
+            language="en", niche="remote work", persona={"role": "manager"}, seed_keywords=["remote work"],
+            region="", season="", count=count, retrieved_context={}, namespace="u1:en:remote",
+        )
+
+    _, padded, _ = await generate(count=4)
+    await generate(count=4)
+    assert len(padded) == 4 and len(calls) == 2  # two LLM ideas + two templates: asked again
+
+    await generate(count=2)
+    _, _, diagnostics = await generate(count=2)
+    assert diagnostics["cache"]["hit"] == "exact"
+    assert len(calls) == 3
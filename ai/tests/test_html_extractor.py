@@ -0,0 +1,106 @@
+"""
+tests/test_html_extractor.py
+Unit tests for html_extractor — shared main-content extraction.
+No external API calls.
+"""
+
+import pytest
+
+from services.html_extractor import (
+    LXML_AVAILABLE,
+    extract_main_content,
+    extract_paragraph_text,
+    resolve_engine,
+)
+
+ENGINES = ["legacy"] + (["lxml"] if LXML_AVAILABLE else [])
+
+ARTICLE_HTML = """
+<html>
+<head><title>Async Standups Explained</title><script>var tracking = true;</script></head>
+<body>
+  <nav><a href="/">Home</a> <a href="/news">News</a></nav>
+  <article class="story-body">
+    <p>Distributed teams are replacing daily video standups with written asynchronous updates, a survey says.</p>
+    <p>Respondents said the switch saved each engineer forty minutes a day and reduced meeting fatigue noticeably.</p>
+    <p>Managers warned that async updates only work when they are short, specific, and tied to a shared board.</p>
+  </article>
+  <footer><p>Copyright Example News. All rights reserved.</p></footer>
+</body>
+</html>
+"""
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ENGINES)
+def test_extract_main_content_returns_title_and_text(engine):
+    result = extract_main_content(ARTICLE_HTML, "https://example.com/a", engine=engine)
+
+    assert result["title"] == "Async Standups Explained"
+    assert "forty minutes a day" in result["content"]
+    assert "tracking" not in result["content"]
+    assert "All rights reserved" not in result["content"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ENGINES)
+def test_extract_main_content_applies_length_gate(engine):
+    html = "<html><head><title>Tiny</title></head><body><p>Too short.</p></body></html>"
+
+    assert extract_main_content(html, "https://example.com/tiny", engine=engine) is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ENGINES)
+def test_extract_main_content_truncates_to_max_chars(engine):
+    result = extract_main_content(ARTICLE_HTML, engine=engine, max_chars=250)
+
+    assert len(result["content"]) == 250
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ENGINES)
+def test_extract_main_content_falls_back_to_url_for_title(engine):
+    html = ARTICLE_HTML.replace("<title>Async Standups Explained</title>", "")
+
+    result = extract_main_content(html, "https://example.com/a", engine=engine)
+
+    assert result["title"] == "https://example.com/a"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ENGINES)
+def test_extract_paragraph_text_joins_paragraphs(engine):
+    text = extract_paragraph_text(ARTICLE_HTML, engine=engine)
+
+    assert "survey says" in text
+    assert "shared board" in text
+    assert "var tracking" not in text
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml not installed")
+def test_lxml_engine_skips_comment_and_sidebar_blocks():
+    html = """
+    <html><head><title>Pour-over guide</title></head><body>
+      <div class="post">
+        <p>Weigh your coffee and water, grind to the texture of coarse sand, and rinse the filter first.</p>
+        <p>Bloom the grounds for thirty seconds, then pour in slow spirals to keep extraction even.</p>
+        <p>If the cup tastes sour, grind finer; if it tastes bitter, grind coarser and adjust slowly.</p>
+      </div>
+      <div class="comments"><p>Great post, I tried this and my coffee is so much better now, thanks!</p></div>
+      <div class="sidebar widget"><p>Follow us on Instagram and Pinterest for daily coffee inspiration.</p></div>
+    </body></html>
+    """
+
+    result = extract_main_content(html, engine="lxml")
+
+    assert "slow spirals" in result["content"]
+    assert "Great post" not in result["content"]
+    assert "Follow us" not in result["content"]
+
+
+@pytest.mark.unit
+def test_resolve_engine_honours_explicit_legacy():
+    assert resolve_engine("legacy") == "legacy"
+    assert resolve_engine("auto") == ("lxml" if LXML_AVAILABLE else "legacy")
@@ -0,0 +1,160 @@
+"""
+tests/test_idempotency.py
+Unit tests for Idempotency-Key handling on the generation endpoints.
+Pipelines are stubbed — no external API calls.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+import routers.image as image_router
+from models.requests import ContentGenerateRequest
+from models.responses import ContentGenerateResponse
+from services import generation_service, idempotency
+
+
+def _request(topic="SaaS onboarding"):
+    return ContentGenerateRequest(userId="u1", platform="blog", topicOrIdea=topic, focusKeyword="onboarding")
+
+
+def _response(text):
+    return ContentGenerateResponse(contentForEditor={"plainText": text}, diagnostics={}, metrics={})
+
+
+@pytest.mark.unit
+async def test_retry_attaches_to_in_flight_execution():
+    runs = []
+    release = asyncio.Event()
+
+    async def execute():
+        runs.append(1)
+        await release.wait()
+        return _response("body")
+
+    first = asyncio.create_task(idempotency.run_idempotent("t", "k1", _request(), execute, ContentGenerateResponse))
+    await asyncio.sleep(0)
+    retry = asyncio.create_task(idempotency.run_idempotent("t", "k1", _request(), execute, ContentGenerateResponse))
+    await asyncio.sleep(0)
+    first.cancel()  # the original caller gives up; the retry still gets the result
+    release.set()
+
+    result, replayed = await retry
+    assert (result.contentForEditor["plainText"], replayed) == ("body", "in-flight")
+    assert len(runs) == 1
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    stored, replayed = await idempotency.run_idempotent("t", "k1", _request(), execute, ContentGenerateResponse)
+    assert (stored.contentForEditor["plainText"], replayed) == ("body", "stored")
+    assert len(runs) == 1
+
+
+@pytest.mark.unit
+async def test_failures_are_not_stored_and_stored_results_expire(monkeypatch):
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("provider down")
+        return _response("x" * 2000)
+
+    with pytest.raises(RuntimeError):
+        await idempotency.run_idempotent("t", "k2", _request(), flaky, ContentGenerateResponse)
+    _, replayed = await idempotency.run_idempotent("t", "k2", _request(), flaky, ContentGenerateResponse)
+    assert replayed is None and len(calls) == 2
+
+    stats = idempotency.get_idempotency_stats()
+    assert stats["stored"] == 1
+    assert stats["storedBytes"] < stats["rawBytes"]
+
+    monkeypatch.setattr(idempotency.settings, "IDEMPOTENCY_RETENTION_SECONDS", 0.0)
+    idempotency.reset_idempotency()
+    await idempotency.run_idempotent("t", "k2", _request(), flaky, ContentGenerateResponse)
+    _, replayed = await idempotency.run_idempotent("t", "k2", _request(), flaky, ContentGenerateResponse)
+    assert replayed is None and len(calls) == 4
+
+
+@pytest.mark.unit
+def test_content_endpoint_replays_and_rejects_reused_key(client, monkeypatch):
+    calls = []
+
+    async def fake_generate(req, research_bundle=None):
+        calls.append(req.topicOrIdea)
+        return _response(req.topicOrIdea)
+
+    monkeypatch.setattr(generation_service, "generate_content", fake_generate)
+    body = _request().model_dump()
+    headers = {"Idempotency-Key": "abc"}
+
+    first = client.post("/content/generate", json=body, headers=headers)
+    retry = client.post("/content/generate", json=body, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "stored"
+    assert retry.json() == first.json()
+    assert calls == ["SaaS onboarding"]
+
+    conflict = client.post("/content/generate", json={**body, "topicOrIdea": "other"}, headers=headers)
+    assert conflict.status_code == 422
+
+    client.post("/content/generate", json=body)
+    assert len(calls) == 2  # no key, no deduplication
+
+
+@pytest.mark.unit
+def test_image_endpoint_replays_stored_images(client, monkeypatch, image_generate_payload):
+    calls = []
+
+    async def fake_generate_images(prompts, **kwargs):
+        calls.append(prompts)
+        return [{"url": "https://img.example/1.png", "size": "512x512", "provider": "stub", "altText": prompts[0]}]
+
+    monkeypatch.setattr(image_router, "generate_images", fake_generate_images)
+    headers = {"Idempotency-Key": "img-1"}
+
+    first = client.post("/image/generate", json=image_generate_payload, headers=headers)
+    retry = client.post("/image/generate", json=image_generate_payload, headers=headers)
+    assert first.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "stored"
+    assert retry.json() == first.json()
+    assert len(calls) == 1
+
+
+@pytest.mark.unit
+async def test_store_is_bounded_by_compressed_bytes(monkeypatch):
+    async def execute():
+        return _response(os.urandom(7000).hex())  # ~7 KB once compressed
+
+    monkeypatch.setattr(idempotency.settings, "IDEMPOTENCY_MAX_BYTES", 10_000)
+    for key in ("b1", "b2", "b3"):
+        await idempotency.run_idempotent("t", key, _request(), execute, ContentGenerateResponse)
+
+    stats = idempotency.get_idempotency_stats()
+    assert stats["bytes"] <= 10_000
+    assert stats["stored"] == 1 and stats["evicted"] == 2
+    _, replayed = await idempotency.run_idempotent("t", "b3", _request(), execute, ContentGenerateResponse)
+    assert replayed == "stored"
+
+    monkeypatch.setattr(idempotency.settings, "IDEMPOTENCY_MAX_BYTES", 1_000)
+    await idempotency.run_idempotent("t", "b4", _request(), execute, ContentGenerateResponse)
+    assert idempotency.get_idempotency_stats()["notStored"] == 1
+
+
+@pytest.mark.unit
+def test_placeholder_only_images_are_not_stored(client, monkeypatch, image_generate_payload):
+    calls = []
+
+    async def fake_generate_images(prompts, **kwargs):
+        calls.append(prompts)
+        return [{"url": "data:image/png;base64,AAAA", "size": "512x512", "provider": "placeholder", "altText": "x"}]
+
+    monkeypatch.setattr(image_router, "generate_images", fake_generate_images)
+    headers = {"Idempotency-Key": "img-placeholder"}
+
+    client.post("/image/generate", json=image_generate_payload, headers=headers)
+    retry = client.post("/image/generate", json=image_generate_payload, headers=headers)
+    assert "Idempotent-Replayed" not in retry.headers
+    assert len(calls) == 2
@@ -0,0 +1,136 @@
+"""
+tests/test_job_queue.py
+Unit tests for the SQLite job queue, the job worker and the /jobs endpoints.
+Handlers are stubbed — no external API calls.
+"""
+
+import time
+
+import pytest
+
+from services import job_queue
+from workers import job_worker
+
+
+@pytest.fixture(autouse=True)
+def queue_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue.settings, "JOB_QUEUE_PATH", str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(job_queue.settings, "JOB_RETRY_BASE_SECONDS", 30.0)
+    return tmp_path
+
+
+class _Response:
+    def __init__(self, value):
+        self.value = value
+
+    def model_dump(self):
+        return {"value": self.value}
+
+
+def _topic(niche):
+    return {"userId": "u1", "niche": niche, "persona": {"role": "founder"}}
+
+
+@pytest.mark.unit
+def test_interactive_jobs_are_claimed_first():
+    scheduled = job_queue.submit("topics", {"items": [_topic("a")]}, "scheduled")
+    interactive = job_queue.submit("topics", {"items": [_topic("b")]}, "interactive")
+
+    assert job_queue.claim("w1")["id"] == interactive["id"]
+    assert job_queue.claim("w1")["id"] == scheduled["id"]
+    assert job_queue.claim("w1") is None
+    assert job_queue.claim("w2", ["interactive"]) is None
+
+
+@pytest.mark.unit
+def test_failed_attempt_backs_off_then_fails_for_good(monkeypatch):
+    job = job_queue.submit("topics", {"items": [_topic("a")]}, max_attempts=2)
+    job_queue.claim("w1")
+
+    assert job_queue.fail(job["id"], "w1", "provider down") == "queued"
+    retried = job_queue.get(job["id"])
+    assert retried["runAfter"] - time.time() > 20
+    assert job_queue.claim("w1") is None  # not due yet
+
+    now = time.time()
+    monkeypatch.setattr(job_queue.time, "time", lambda: now + 60)
+    assert job_queue.claim("w1")["attempts"] == 2
+    assert job_queue.fail(job["id"], "w1", "provider down again") == "failed"
+    assert job_queue.get(job["id"])["status"] == "failed"
+    assert job_queue.retry_delay(10) <= job_queue.settings.JOB_RETRY_MAX_SECONDS * 1.2
+
+
+@pytest.mark.unit
+def test_expired_lease_is_reclaimed_and_old_worker_loses_it(monkeypatch):
+    job = job_queue.submit("content", {"items": []})
+    job_queue.claim("w1")
+    now = time.time()
+    expired = now + job_queue.settings.JOB_LEASE_SECONDS + 1
+    monkeypatch.setattr(job_queue.time, "time", lambda: expired)
+
+    assert job_queue.claim("w2") is None  # the lost attempt backs off like a failed one
+    assert job_queue.get(job["id"])["status"] == "queued"
+    monkeypatch.setattr(job_queue.time, "time", lambda: expired + 60)
+    reclaimed = job_queue.claim("w2")
+    assert (reclaimed["id"], reclaimed["attempts"]) == (job["id"], 2)
+    assert not job_queue.heartbeat(job["id"], "w1")
+    assert not job_queue.complete(job["id"], "w1", {"items": []})
+    assert job_queue.complete(job["id"], "w2", {"items": []})
+
+
+@pytest.mark.unit
+def test_job_that_keeps_losing_its_worker_fails_at_max_attempts(monkeypatch):
+    job = job_queue.submit("content", {"items": []}, max_attempts=1)
+    job_queue.claim("w1")
+    now = time.time()
+    for expiry in range(1, 5):
+        later = now + expiry * (job_queue.settings.JOB_LEASE_SECONDS + job_queue.settings.JOB_RETRY_MAX_SECONDS * 2)
+        monkeypatch.setattr(job_queue.time, "time", lambda: later)
+        assert job_queue.claim("w2") is None
+
+    failed = job_queue.get(job["id"])
+    assert (failed["status"], failed["attempts"]) == ("failed", 1)
+    assert "lease expired" in failed["error"]
+
+
+@pytest.mark.unit
+async def test_worker_resumes_only_unfinished_items(monkeypatch):
+    monkeypatch.setattr(job_queue.settings, "JOB_RETRY_BASE_SECONDS", 0.0)
+    calls = []
+
+    async def flaky_suggest(req):
+        calls.append(req.niche)
+        if req.niche == "flaky" and calls.count("flaky") == 1:
+            raise RuntimeError("timeout")
+        return _Response(req.niche)
+
+    monkeypatch.setitem(job_worker.HANDLERS, "topics", flaky_suggest)
+    job = job_queue.submit("topics", {"items": [_topic("saas"), _topic("flaky"), _topic("travel")]})
+
+    processed = await job_worker.run_worker("test", concurrency=1, once=True)
+
+    finished = job_queue.get(job["id"])
+    assert processed == 2
+    assert finished["status"] == "succeeded"
+    assert finished["attempts"] == 2
+    assert sorted(calls) == ["flaky", "flaky", "saas", "travel"]
+    assert [item["result"]["value"] for item in finished["result"]["items"]] == ["saas", "flaky", "travel"]
+
+
+@pytest.mark.unit
+def test_jobs_api_submit_status_result_and_cancel(client):
+    bad = client.post("/jobs", json={"kind": "topics", "items": [{"userId": "u1"}]})
+    assert bad.status_code == 422
+    assert bad.json()["detail"]["item"] == 0
+
+    submitted = client.post("/jobs", json={"kind": "topics", "items": [_topic("saas")], "priority": "interactive"})
+    assert submitted.status_code == 202
+    job = submitted.json()
+    assert (job["status"], job["priority"], job["progress"]) == ("queued", "interactive", {"total": 1, "done": 0, "failed": 0})
+
+    assert client.get(f"/jobs/{job['id']}").json()["status"] == "queued"
+    assert client.get(f"/jobs/{job['id']}/result").status_code == 409
+    assert client.delete(f"/jobs/{job['id']}").json()["status"] == "cancelled"
+    assert client.delete(f"/jobs/{job['id']}").status_code == 409
+    assert client.get(f"/jobs/{job['id']}/result").json()["items"] == [{"index": 0, "status": "pending"}]
+    assert client.get("/jobs/missing").status_code == 404
@@ -0,0 +1,109 @@
+"""
+tests/test_json_repair.py
+Unit tests for utils/json_repair.py and the local-first repair path in call_gemini_json.
+No external API calls.
+"""
+
+import json
+
+import pytest
+
+from services import gemini_service
+from utils.json_repair import JSONRepairError, missing_required, repair_json
+
+
+@pytest.mark.unit
+def test_valid_json_needs_no_fixes():
+    payload = {"title": "T", "sections": [{"h2": "A", "body": "text"}], "meta": {"slug": "t"}}
+    assert repair_json(json.dumps(payload)) == (payload, [])
+
+
+@pytest.mark.unit
+def test_fences_trailing_commas_raw_newlines_and_inner_quotes():
+    raw = (
+        'Sure! ```json\n{"title": "x", "sections": ['
+        '{"h2": "A", "body": "He said "hi, there" to me"}, '
+        '{"h2": "B", "body": "line1\nline2"},]}\n```'
+    )
+    data, fixes = repair_json(raw)
+    assert data["sections"][0]["body"] == 'He said "hi, there" to me'
+    assert data["sections"][1]["body"] == "line1\nline2"
+    assert "escaped inner quotes" in fixes
+    assert "removed trailing commas" in fixes
+
+
+@pytest.mark.unit
+def test_non_json_syntax_is_normalized():
+    data, fixes = repair_json("{'title': 'it's fine', tags: [True, None] // note\n \"h1\": \"H\"}")
+    assert data == {"title": "it's fine", "tags": [True, None], "h1": "H"}
+    assert "quoted unquoted keys" in fixes
+    assert "inserted missing commas" in fixes
+
+
+@pytest.mark.unit
+def test_truncated_output_keeps_only_complete_sections():
+    raw = '{"title": "T", "sections": [{"h2": "A", "body": "done"}, {"h2": "B", "body": "cut off mid'
+    data, fixes = repair_json(raw)
+    assert data == {"title": "T", "sections": [{"h2": "A", "body": "done"}]}
+    assert "dropped truncated array items" in fixes
+
+
+@pytest.mark.unit
+def test_truncated_top_level_string_and_dangling_key():
+    assert repair_json('{"body": "half a post')[0] == {"body": "half a post"}
+    assert repair_json('{"title": "T", "descr')[0] == {"title": "T"}
+    assert repair_json('{"title": "T", "ok": tru')[0] == {"title": "T"}
+
+
+@pytest.mark.unit
+def test_no_object_raises():
+    with pytest.raises(JSONRepairError):
+        repair_json("I cannot help with that.")
+
+
+@pytest.mark.unit
+def test_missing_required():
+    assert missing_required({"sections": [], "title": "T"}, ["title", "sections"]) == ["sections"]
+    assert missing_required({"body": "x"}, ["body"]) == []
+
+
+@pytest.fixture
+def counted_calls():
+    gemini_service.reset_json_repair_stats()
+    calls = []
+    yield calls
+    gemini_service.reset_json_repair_stats()
+
+
+@pytest.mark.unit
+async def test_local_repair_skips_llm_round_trip(counted_calls):
+    async def fake_call(messages, max_tokens, temperature, json_mode=False):
+        counted_calls.append(messages)
+        return '{"body": "A post with "quotes" inside", "hashtags": ["#a", "#b",]}'
+
+    data = await gemini_service.call_gemini_json([{"role": "user", "content": "x"}], call=fake_call, required_keys=["body"])
+
+    assert data["body"] == 'A post with "quotes" inside'
+    assert len(counted_calls) == 1
+    assert gemini_service.get_json_repair_stats()["localRepaired"] == 1
+
+
+@pytest.mark.unit
+async def test_llm_repair_runs_when_required_fields_are_lost(counted_calls):
+    async def fake_call(messages, max_tokens, temperature, json_mode=False):
+        counted_calls.append(messages)
+        if len(counted_calls) == 1:
+            return '{"title": "T", "sections": [{"h2": "A", "body": "cut'
+        return '{"title": "T", "sections": [{"h2": "A", "body": "fixed"}]}'
+
+    data = await gemini_service.call_gemini_json(
+        [{"role": "user", "content": "x"}],
+        call=fake_call,
+        required_keys=["sections"],
+    )
+
+    assert data["sections"] == [{"h2": "A", "body": "fixed"}]
+    assert "JSON validator" in counted_calls[1][0]["content"]
+    stats = gemini_service.get_json_repair_stats()
+    assert stats["llmRepaired"] == 1
+    assert stats["localRepaired"] == 0
@@ -0,0 +1,90 @@
+"""
+tests/test_json_stream.py
+Unit tests for utils.json_stream — incremental, tolerant JSON parsing of streamed LLM output.
+"""
+
+import json
+
+import pytest
+
+from utils.json_stream import IncrementalJSONParser, JSONStreamError, parse_json_tolerant
+
+PAYLOAD = {
+    "title": "Remote \"async\" work",
+    "sections": [
+        {"h2": "One", "body": "First \\u00e9 body"},
+        {"h2": "Two", "body": "Second body"},
+    ],
+    "faqs": [{"q": "Why?", "a": "Because."}],
+    "meta": {"description": "d", "slug": "s"},
+    "score": -1.5e2,
+    "draft": False,
+    "image": None,
+}
+
+
+def _feed_in_chunks(raw, size):
+    parser = IncrementalJSONParser()
+    events = []
+    for start in range(0, len(raw), size):
+        events.extend(parser.feed(raw[start:start + size]))
+    return parser, events
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 100_000])
+def test_chunking_does_not_change_result(size):
+    raw = json.dumps(PAYLOAD, indent=2)
+
+    parser, events = _feed_in_chunks(raw, size)
+
+    assert parser.close() == PAYLOAD
+    assert [(event.key, event.index) for event in events] == [
+        ("title", None),
+        ("sections", 0),
+        ("sections", 1),
+        ("faqs", 0),
+        ("meta", None),
+        ("score", None),
+        ("draft", None),
+        ("image", None),
+    ]
+
+
+@pytest.mark.unit
+def test_sections_are_emitted_before_the_document_closes():
+    raw = json.dumps(PAYLOAD)
+    cut = raw.index('"faqs"')
+
+    parser, events = _feed_in_chunks(raw[:cut], 16)
+
+    assert not parser.done
+    assert [event.value["h2"] for event in events if event.key == "sections"] == ["One", "Two"]
+
+
+@pytest.mark.unit
+def test_tolerates_fences_prose_raw_newlines_and_trailing_commas():
+    raw = 'Sure, here it is:\n```json\n{"title": "A\nB", "sections": [{"h2": "x", "body": "y",},],}\n```\nDone.'
+
+    assert parse_json_tolerant(raw) == {"title": "A\nB", "sections": [{"h2": "x", "body": "y"}]}
+
+
+@pytest.mark.unit
+def test_truncated_input_raises_unless_partial_is_allowed():
+    raw = '{"title": "T", "sections": [{"h2": "x", "body": "cut off mid'
+
+    with pytest.raises(JSONStreamError):
+        parse_json_tolerant(raw)
+    assert parse_json_tolerant(raw, allow_partial=True) == {
+        "title": "T",
+        "sections": [{"h2": "x", "body": "cut off mid"}],
+    }
+    assert parse_json_tolerant('{"title": "T", "meta":', allow_partial=True) == {"title": "T"}
+
+
+@pytest.mark.unit
+def test_structural_garbage_raises():
+    with pytest.raises(JSONStreamError):
+        parse_json_tolerant('{"title" "missing colon"}')
+    with pytest.raises(JSONStreamError):
+        parse_json_tolerant("no json here")
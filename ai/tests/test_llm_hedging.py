@@ -0,0 +1,91 @@
+"""
+tests/test_llm_hedging.py
+Unit tests for llm_hedging — speculative second request, first valid response wins.
+No external API calls.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from services import gemini_service, llm_hedging, llm_router, provider_health
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    llm_hedging.reset_hedge_stats()
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_router.settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_router.settings, "LLM_HEDGE_DELAY_SECONDS", 0.05)
+    yield
+    llm_hedging.reset_hedge_stats()
+    llm_router.reset_router_stats()
+
+
+def _providers(monkeypatch, behaviour):
+    """behaviour: provider -> (delay seconds, payload dict)."""
+    cancelled = []
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        delay, payload = behaviour[provider]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(provider)
+            raise
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        return json.dumps(payload)
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+    return cancelled
+
+
+def _has_body(data):
+    return bool(data.get("body"))
+
+
+MESSAGES = [{"role": "user", "content": "write"}]
+
+
+@pytest.mark.unit
+async def test_fast_primary_is_used_without_hedging(monkeypatch):
+    _providers(monkeypatch, {"gemini": (0.0, {"body": "gemini"}), "groq": (0.0, {"body": "groq"})})
+
+    data, info = await llm_hedging.hedged_json("content", MESSAGES, 100, 0.7, _has_body)
+
+    assert data == {"body": "gemini"}
+    assert info == {"primary": "gemini", "hedged": False, "winner": "primary"}
+    assert llm_hedging.get_hedge_stats()["hedgeRate"] == 0
+
+
+@pytest.mark.unit
+async def test_slow_primary_is_hedged_and_loser_cancelled(monkeypatch):
+    cancelled = _providers(monkeypatch, {"gemini": (5.0, {"body": "gemini"}), "groq": (0.0, {"body": "groq"})})
+    llm_router.reset_routing()
+
+    data, info = await llm_hedging.hedged_json("content", MESSAGES, 100, 0.7, _has_body)
+    await asyncio.sleep(0.01)  # let the cancelled leg and its provider call unwind
+
+    assert data == {"body": "groq"}
+    assert info["hedged"] is True
+    assert info["winner"] == "hedge"
+    assert cancelled == ["gemini"]
+    assert gemini_service.get_last_llm_execution()["provider"] == "groq"
+    assert [decision["provider"] for decision in llm_router.get_routing_decisions()] == ["groq"]
+    stats = llm_hedging.get_hedge_stats()
+    assert stats["hedgeWins"] == 1
+    assert stats["cancelledLegs"] == 1
+
+
+@pytest.mark.unit
+async def test_invalid_hedge_response_does_not_win(monkeypatch):
+    _providers(monkeypatch, {"gemini": (0.15, {"body": "gemini"}), "groq": (0.0, {"body": ""})})
+
+    data, info = await llm_hedging.hedged_json("content", MESSAGES, 100, 0.7, _has_body)
+
+    assert data == {"body": "gemini"}
+    assert info["hedged"] is True
+    assert info["winner"] == "primary"
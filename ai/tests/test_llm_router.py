@@ -0,0 +1,120 @@
+"""
+tests/test_llm_router.py
+Unit tests for llm_router — latency/error/quota-aware provider choice per task.
+No external API calls.
+"""
+
+import pytest
+
+from services import gemini_service, llm_router, provider_health
+
+
+@pytest.fixture(autouse=True)
+def fresh_router(monkeypatch):
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(llm_router.settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(llm_router.settings, "PROVIDER_HEALTH_STATE_FILE", "")
+    monkeypatch.setattr(llm_router.settings, "LLM_ROUTER_MIN_SAMPLES", 5)
+    monkeypatch.setattr(llm_router.settings, "LLM_ROUTER_CONTENT_MAX_P90_SECONDS", 15.0)
+    yield
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+
+
+@pytest.fixture
+def fake_providers(monkeypatch):
+    calls = []
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        calls.append(provider)
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        return f"from {provider}"
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+    return calls
+
+
+def _feed(provider, latency_ms, count=10):
+    for _ in range(count):
+        llm_router.record_outcome(provider, llm_router._model_for(provider), latency_ms, ok=True)
+
+
+@pytest.mark.unit
+def test_each_task_uses_its_preferred_provider_when_healthy():
+    assert llm_router.choose_provider("content")["provider"] == "gemini"
+    assert llm_router.choose_provider("topics")["provider"] == "groq"
+
+
+@pytest.mark.unit
+def test_content_moves_to_groq_when_gemini_p90_is_over_budget():
+    _feed("gemini", 20_000)
+    _feed("groq", 2_000)
+
+    decision = llm_router.choose_provider("content")
+
+    assert decision["provider"] == "groq"
+    assert decision["rerouted"] is True
+    assert "p90" in decision["reason"]
+
+
+@pytest.mark.unit
+def test_content_stays_on_gemini_when_groq_is_worse():
+    _feed("gemini", 20_000)
+    for _ in range(10):
+        llm_router.record_outcome("groq", llm_router._model_for("groq"), None, ok=False)
+
+    decision = llm_router.choose_provider("content")
+
+    assert decision["provider"] == "gemini"
+    assert decision["rerouted"] is False
+    assert decision["reason"].startswith("preferred despite")
+
+
+@pytest.mark.unit
+def test_quota_block_and_low_headroom_route_away():
+    provider_health.record_quota_exhausted("gemini", llm_router._model_for("gemini"), 60)
+    assert llm_router.choose_provider("content")["provider"] == "groq"
+
+    provider_health.reset_provider_health()
+    provider_health.record_headroom("groq", llm_router._model_for("groq"), 1, 100)
+    assert llm_router.choose_provider("topics")["provider"] == "gemini"
+
+
+@pytest.mark.unit
+async def test_call_routed_fails_over_and_reports_decisions(monkeypatch):
+    async def flaky_call(provider, messages, max_tokens, temperature, json_mode):
+        if provider == "groq":
+            raise RuntimeError("groq is down")
+        gemini_service._record_llm_execution("gemini", llm_router._model_for("gemini"))
+        return "from gemini"
+
+    monkeypatch.setattr(llm_router, "_call_provider", flaky_call)
+    llm_router.reset_routing()
+
+    assert await llm_router.call_routed("topics", [{"role": "user", "content": "hi"}]) == "from gemini"
+
+    [decision] = llm_router.get_routing_decisions()
+    assert decision["provider"] == "groq"
+    assert decision["failover"] == "gemini"
+    assert decision["executedProvider"] == "gemini"
+    stats = llm_router.get_router_stats()["providers"]
+    assert stats[f"groq:{llm_router._model_for('groq')}"]["errors"] == 1
+
+
+@pytest.mark.unit
+async def test_call_routed_json_parses_routed_response(monkeypatch, fake_providers):
+    async def json_call(provider, messages, max_tokens, temperature, json_mode):
+        fake_providers.append(provider)
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        return '```json\n{"body": "ok"}\n```'
+
+    monkeypatch.setattr(llm_router, "_call_provider", json_call)
+    llm_router.reset_routing()
+
+    data = await llm_router.call_routed_json("content", [{"role": "user", "content": "hi"}])
+
+    assert data == {"body": "ok"}
+    assert fake_providers == ["gemini"]
+    assert llm_router.get_routing_decisions()[0]["latencyMs"] >= 0
@@ -6,33 +6,34 @@ Requires in .env: GROQ_API_KEY
 """
 
 import pytest
-from services.llm_service import chat_groq, generate_topics_json
+from services import llm_router
+from services.llm_service import generate_topics_json
 
 
 # ---------------------------------------------------------------------------
-# chat_groq — real Groq call
+# llm_router.call_routed("topics") — real Groq call through the router
 # ---------------------------------------------------------------------------
 
 @pytest.mark.integration
-async def test_chat_groq_returns_string():
-    """chat_groq should return a non-empty string."""
+async def test_routed_topics_call_returns_string():
+    """A routed topics call (Groq by default) should return a non-empty string."""
     messages = [
         {"role": "system", "content": "You are a helpful assistant."},
         {"role": "user", "content": "Reply with exactly one word: Hello"}
     ]
-    result = await chat_groq(messages, max_tokens=10, temperature=0)
+    result = await llm_router.call_routed("topics", messages, max_tokens=10, temperature=0)
     assert isinstance(result, str)
     assert len(result.strip()) > 0
 
 
 @pytest.mark.integration
-async def test_chat_groq_respects_max_tokens():
+async def test_routed_topics_call_respects_max_tokens():
     """With very low max_tokens, response should be brief."""
     messages = [
         {"role": "system", "content": "You are a helpful assistant."},
         {"role": "user", "content": "Write a 1000-word essay about the moon."}
     ]
-    result = await chat_groq(messages, max_tokens=20, temperature=0)
+    result = await llm_router.call_routed("topics", messages, max_tokens=20, temperature=0)
     assert isinstance(result, str)
     assert len(result) < 500  # Generous upper bound
 
@@ -0,0 +1,115 @@
+"""
+tests/test_long_form.py
+Unit tests for long-form blog generation — outline call, then section bodies in parallel.
+No external API calls.
+"""
+
+import asyncio
+import json
+import re
+
+import pytest
+
+from services import gemini_service, llm_router, long_form, provider_health
+from services.llm_service import generate_content_json
+
+SENTENCE = "Distributed teams document decisions so that everyone can move forward without waiting on meetings. "
+HEADINGS = [
+    "Why remote teams need written decisions",
+    "How to run asynchronous status updates",
+    "Protecting deep focus time across time zones",
+    "Choosing the right collaboration tools",
+    "Keeping new hires connected from day one",
+    "What to measure when the whole team works remotely",
+]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(long_form.settings, "LONG_FORM_MAX_CONCURRENCY", 3)
+    state = {"calls": [], "running": 0, "peak": 0, "outline_sections": 6}
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        system = messages[0]["content"]
+        state["calls"].append((system, messages[-1]["content"]))
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            state["running"] -= 1
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        if "planning a long-form article" in system:
+            sections = [{"h2": heading, "points": ["a", "b"]} for heading in HEADINGS[: state["outline_sections"]]]
+            return json.dumps({"title": "Remote work", "h1": "Remote work guide", "sections": sections, "meta": {}})
+        if "writing one section" in system:
+            words = int(re.search(r"Length: about (\d+) words", messages[-1]["content"]).group(1))
+            section = re.search(r"Section: (.+)", messages[-1]["content"]).group(1)
+            body = (SENTENCE * (words // 14 + 1)).strip()
+            return json.dumps({"body": f"{section}. {body}"})
+        body = (SENTENCE * 20).strip()
+        return json.dumps({"title": "Single", "h1": "Single call", "sections": [{"h2": "Only", "body": body}]})
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+    yield state
+    llm_router.reset_router_stats()
+
+
+def _generate(target_length):
+    return generate_content_json(
+        platform="blog",
+        language="en",
+        topic_or_idea="Remote work",
+        tone="friendly",
+        target_length=target_length,
+        focus_keyword="remote work",
+        style_guide=[],
+        retrieved_context={"snippets": [{"title": "Study", "url": "https://example.com", "text": "async beats sync"}]},
+    )
+
+
+@pytest.mark.unit
+def test_section_count_and_word_split():
+    assert long_form.section_count_for(3500) == 10
+    assert long_form.section_count_for(200) == long_form.MIN_SECTIONS
+    assert long_form._section_words(1000, 3) == [334, 333, 333]
+
+
+@pytest.mark.unit
+async def test_long_blog_is_written_outline_first_in_parallel(fake_llm):
+    packaged, diagnostics, _ = await _generate(2100)
+
+    systems = [system for system, _ in fake_llm["calls"]]
+    assert "planning a long-form article" in systems[0]
+    assert sum("writing one section" in system for system in systems) == 6
+    assert 1 < fake_llm["peak"] <= 3
+    assert all("async beats sync" in user for _, user in fake_llm["calls"])
+
+    sections = packaged["structured"]["sections"]
+    assert [sec["h2"] for sec in sections] == HEADINGS
+    assert all(sec["body"].startswith(sec["h2"]) for sec in sections)
+    assert diagnostics["longForm"]["sections"] == 6
+    assert sum(diagnostics["longForm"]["sectionWords"]) == 2100
+    assert "repair" not in diagnostics
+    assert len(diagnostics["routing"]) == 7
+
+
+@pytest.mark.unit
+async def test_short_blog_keeps_single_call(fake_llm):
+    _, diagnostics, _ = await _generate(300)
+
+    assert "longForm" not in diagnostics
+    assert "planning a long-form article" not in fake_llm["calls"][0][0]
+
+
+@pytest.mark.unit
+async def test_unusable_outline_falls_back_to_single_call(fake_llm):
+    fake_llm["outline_sections"] = 1
+
+    packaged, diagnostics, _ = await _generate(2100)
+
+    assert "longForm" not in diagnostics
+    assert packaged["structured"]["h1"].endswith("Single call")
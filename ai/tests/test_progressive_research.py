@@ -0,0 +1,143 @@
+"""
+tests/test_progressive_research.py
+Unit tests for progressive content research: snippet bundle first, enriched bundle in the background.
+No external API calls.
+"""
+
+import asyncio
+
+import pytest
+
+from config import settings
+from services import content_research_service
+from services.rag_strategy import docs_to_snippets
+from utils import deadline
+
+RANKED = [
+    {"url": "https://a.example/pricing", "title": "SaaS pricing", "snippet": "Usage-based pricing is growing fast."},
+    {"url": "https://b.example/guide", "title": "Pricing guide", "snippet": "Anchor plans on the value metric."},
+]
+
+
+def _research_kwargs(topic):
+    return {
+        "user_id": "u1",
+        "language": "en",
+        "topic_or_idea": topic,
+        "focus_keyword": "saas pricing",
+        "include_trend": False,
+        "niche": "saas",
+        "seed_keywords": ["saas"],
+        "region": None,
+        "season": None,
+        "persona": None,
+        "namespace": "u1:en:progressive-test",
+    }
+
+
+@pytest.fixture
+def stubbed_research(monkeypatch):
+    release = asyncio.Event()
+    calls = {"search": 0, "scrape": 0, "keywords": 0}
+
+    async def search_ranked(queries, max_urls=10):
+        calls["search"] += 1
+        return list(RANKED)
+
+    async def scrape_ranked(ranked):
+        calls["scrape"] += 1
+        await release.wait()
+        return [{"url": item["url"], "title": item["title"], "content": f"Full page about {item['title']}."} for item in ranked]
+
+    async def extract_keywords_rag(docs, top_n=15):
+        calls["keywords"] += 1
+        return {"keywords": ["usage-based pricing", "value metric"], "themes": []}
+
+    async def pack_live_context(docs, query, language):
+        return docs_to_snippets(docs), None
+
+    async def indexed_context(**kwargs):
+        return {"snippets": [], "usedRAG": False}
+
+    monkeypatch.setattr(content_research_service, "search_ranked", search_ranked)
+    monkeypatch.setattr(content_research_service, "scrape_ranked", scrape_ranked)
+    monkeypatch.setattr(content_research_service, "extract_keywords_rag", extract_keywords_rag)
+    monkeypatch.setattr(content_research_service, "_pack_live_context", pack_live_context)
+    monkeypatch.setattr(content_research_service, "_indexed_context", indexed_context)
+    monkeypatch.setattr(settings, "RESEARCH_PROGRESSIVE", True)
+    return release, calls
+
+
+async def _drain_enrichment():
+    await asyncio.gather(*list(content_research_service._ENRICH_TASKS.values()))
+
+
+@pytest.mark.unit
+async def test_snippet_bundle_returns_before_scraping_and_is_upgraded(stubbed_research):
+    release, calls = stubbed_research
+    kwargs = _research_kwargs("Progressive pricing research")
+
+    first = await asyncio.wait_for(content_research_service.get_content_research_bundle(**kwargs), timeout=1)
+
+    assert (first["stage"], first["version"]) == ("snippets", 1)
+    assert first["retrievedContext"]["liveSources"] == 2
+    assert first["retrievedContext"]["keywords"] == []
+    assert "Usage-based pricing" in first["retrievedContext"]["snippets"][0]["text"]
+    assert calls["keywords"] == 0
+
+    # Served from the cache while enrichment is still running; no second enrichment is started
+    cached = await content_research_service.get_content_research_bundle(**kwargs)
+    assert cached["stage"] == "snippets"
+
+    release.set()
+    await _drain_enrichment()
+    enriched = await content_research_service.get_content_research_bundle(**kwargs)
+
+    assert (enriched["stage"], enriched["version"]) == ("full", 2)
+    assert enriched["retrievedContext"]["keywords"] == ["usage-based pricing", "value metric"]
+    assert enriched["retrievedContext"]["snippets"][0]["title"] == "Relevant angles"
+    assert calls == {"search": 1, "scrape": 1, "keywords": 1}
+
+
+@pytest.mark.unit
+async def test_enrichment_ignores_the_request_deadline_and_cache_keeps_newest(stubbed_research):
+    release, calls = stubbed_research
+    kwargs = _research_kwargs("Deadline-free enrichment")
+    release.set()
+
+    deadline.start(0.05)
+    try:
+        first = await content_research_service.get_content_research_bundle(**kwargs)
+        await asyncio.sleep(0.1)  # the request's budget is gone by now
+        await _drain_enrichment()
+    finally:
+        deadline.clear()
+
+    assert first["stage"] == "snippets"
+    assert not content_research_service._ENRICH_TASKS  # finished tasks leave the registry
+    enriched = await content_research_service.get_content_research_bundle(**kwargs)
+    assert enriched["version"] == 2
+    assert enriched["retrievedContext"]["degraded"] == []
+
+    # A late snippet bundle does not overwrite the enriched one
+    assert content_research_service._store_bundle("progressive-test", enriched)
+    assert not content_research_service._store_bundle("progressive-test", {**first, "version": 1})
+
+
+@pytest.mark.unit
+async def test_progressive_off_scrapes_before_returning(stubbed_research, monkeypatch):
+    release, calls = stubbed_research
+    release.set()
+    monkeypatch.setattr(settings, "RESEARCH_PROGRESSIVE", False)
+
+    async def search_and_scrape(queries, max_urls=10):
+        return [{"url": item["url"], "title": item["title"], "content": "Full page."} for item in RANKED]
+
+    monkeypatch.setattr(content_research_service, "search_and_scrape", search_and_scrape)
+
+    bundle = await content_research_service.get_content_research_bundle(**_research_kwargs("Blocking research"))
+
+    assert (bundle["stage"], bundle["version"]) == ("full", 1)
+    assert bundle["retrievedContext"]["keywords"] == ["usage-based pricing", "value metric"]
+    assert not content_research_service._ENRICH_TASKS
+    assert calls["search"] == 0
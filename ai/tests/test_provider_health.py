@@ -0,0 +1,103 @@
+"""
+tests/test_provider_health.py
+Unit tests for provider_health — shared quota state and circuit breaker for LLM providers.
+No external API calls.
+"""
+
+import pytest
+
+from services import gemini_service, provider_health
+
+
+@pytest.fixture(autouse=True)
+def fresh_health(monkeypatch):
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(provider_health.settings, "PROVIDER_HEALTH_STATE_FILE", "")
+    monkeypatch.setattr(provider_health.settings, "PROVIDER_CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(provider_health.settings, "PROVIDER_CIRCUIT_OPEN_SECONDS", 30.0)
+    yield
+    provider_health.reset_provider_health()
+
+
+def _advance(monkeypatch, seconds):
+    now = provider_health.time.time() + seconds
+    monkeypatch.setattr(provider_health.time, "time", lambda: now)
+
+
+@pytest.mark.unit
+def test_quota_blocks_until_advertised_reset(monkeypatch):
+    provider_health.record_quota_exhausted("gemini", "m", 40)
+
+    assert "quota exhausted" in provider_health.acquire("gemini", "m")
+    assert provider_health.acquire("gemini", "other-model") is None
+
+    _advance(monkeypatch, 41)
+    assert provider_health.acquire("gemini", "m") is None
+    assert provider_health.get_provider_health_stats()["gemini:m"]["shortCircuited"] == 1
+
+
+@pytest.mark.unit
+def test_circuit_opens_then_half_open_allows_single_probe(monkeypatch):
+    assert provider_health.record_failure("gemini", "m", "overloaded") is False
+    assert provider_health.record_failure("gemini", "m", "overloaded") is True
+    assert "circuit open" in provider_health.acquire("gemini", "m")
+
+    _advance(monkeypatch, 31)
+    assert provider_health.acquire("gemini", "m") is None
+    assert "probe in flight" in provider_health.acquire("gemini", "m")
+
+    provider_health.record_success("gemini", "m")
+    assert provider_health.acquire("gemini", "m") is None
+    stats = provider_health.get_provider_health_stats()["gemini:m"]
+    assert stats["state"] == "closed"
+    assert stats["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+
+@pytest.mark.unit
+def test_failed_probe_reopens_with_longer_cooldown(monkeypatch):
+    provider_health.record_failure("gemini", "m", "overloaded", open_now=True)
+    _advance(monkeypatch, 31)
+    assert provider_health.acquire("gemini", "m") is None
+
+    assert provider_health.record_failure("gemini", "m", "overloaded") is True
+
+    stats = provider_health.get_provider_health_stats()["gemini:m"]
+    assert stats["state"] == "open"
+    assert stats["openForSeconds"] == pytest.approx(60, abs=1)
+
+
+@pytest.mark.unit
+def test_state_is_shared_through_state_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(provider_health.settings, "PROVIDER_HEALTH_STATE_FILE", str(tmp_path / "health.json"))
+    provider_health.record_quota_exhausted("gemini", "m", 60)
+
+    # A second worker starts with empty in-process state and reads the file.
+    provider_health.reset_provider_health()
+    assert "quota exhausted" in provider_health.acquire("gemini", "m")
+
+
+@pytest.mark.unit
+async def test_call_gemini_skips_gemini_after_quota_is_observed(monkeypatch):
+    calls = {"gemini": 0, "groq": []}
+
+    async def fake_generate(prompt, max_tokens, temperature, json_mode):
+        calls["gemini"] += 1
+        raise RuntimeError("429 RESOURCE_EXHAUSTED. Please retry in 40.0s")
+
+    async def fake_groq(messages, max_tokens, temperature, json_mode=False, reason=""):
+        calls["groq"].append(reason)
+        return "from groq"
+
+    monkeypatch.setattr(gemini_service, "GEMINI_AVAILABLE", True)
+    monkeypatch.setattr(gemini_service.settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(gemini_service.settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(gemini_service, "_generate_with_gemini", fake_generate)
+    monkeypatch.setattr(gemini_service, "_call_groq_fallback", fake_groq)
+
+    messages = [{"role": "user", "content": "hi"}]
+    assert await gemini_service.call_gemini(messages) == "from groq"
+    assert await gemini_service.call_gemini(messages) == "from groq"
+
+    assert calls["gemini"] == 1
+    assert "per-minute quota" in calls["groq"][0]
+    assert "quota exhausted" in calls["groq"][1]
@@ -0,0 +1,134 @@
+"""
+tests/test_repair_planner.py
+Unit tests for repair_planner — rewrite only the failing blog sections, concurrently.
+No external API calls.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from services import gemini_service, llm_router, provider_health, repair_planner
+from services.llm_service import _finalize_content
+
+ENGLISH = (
+    "Remote teams that write things down spend less time in meetings and more time "
+    "shipping the work their customers actually asked for every single week."
+)
+SPANISH = (
+    "Los equipos remotos que documentan sus decisiones pasan menos tiempo en reuniones "
+    "y mucho más tiempo entregando el trabajo que sus clientes realmente necesitan."
+)
+
+
+@pytest.fixture
+def section_calls(monkeypatch):
+    """Stub the provider call; each section rewrite returns a long body."""
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    calls = []
+    running = {"now": 0, "peak": 0}
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        calls.append(messages)
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.05)
+        running["now"] -= 1
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        heading = "Rewritten" if "Rewrite section" in messages[-1]["content"] else "Full"
+        return json.dumps({"h2": heading, "body": " ".join([ENGLISH] * 4)})
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+    yield calls, running
+    llm_router.reset_router_stats()
+
+
+@pytest.mark.unit
+async def test_plan_flags_empty_short_and_wrong_language_sections():
+    sections = [
+        {"h2": "Fine", "body": " ".join([ENGLISH] * 3)},
+        {"h2": "Empty", "body": ""},
+        {"h2": "Short", "body": "Too brief."},
+        {"h2": "Spanish", "body": " ".join([SPANISH] * 3)},
+    ]
+
+    plan = await repair_planner.plan_section_repairs(sections, target_length=280, language="en")
+
+    reasons = {item["index"]: item["reasons"] for item in plan}
+    assert 0 not in reasons
+    assert reasons[1] == ["empty body"]
+    assert reasons[2] == ["too short"]
+    assert reasons[3] == ["wrong language (es)"]
+    assert plan[0]["targetWords"] == 70
+
+
+@pytest.mark.unit
+async def test_repair_sections_runs_concurrently_and_merges(section_calls):
+    calls, running = section_calls
+    data = {
+        "h1": "Remote work",
+        "sections": [
+            {"h2": "Keep", "body": ENGLISH},
+            {"h2": "A", "body": "short"},
+            {"h2": "B", "body": ""},
+        ],
+    }
+    plan = [
+        {"index": 1, "reasons": ["too short"], "words": 1, "targetWords": 80},
+        {"index": 2, "reasons": ["empty body"], "words": 0, "targetWords": 80},
+    ]
+    llm_router.reset_routing()
+
+    summary = await repair_planner.repair_sections(
+        data, plan, topic_or_idea="Remote work", focus_keyword="remote work", language="en"
+    )
+
+    assert summary["repaired"] == [1, 2]
+    assert running["peak"] == 2
+    assert data["sections"][0] == {"h2": "Keep", "body": ENGLISH}
+    assert data["sections"][1]["h2"] == "Rewritten"
+    assert all("Rewrite section" in messages[-1]["content"] for messages in calls)
+    assert len(llm_router.get_routing_decisions()) == 2
+
+
+@pytest.mark.unit
+async def test_finalize_repairs_sections_instead_of_regenerating(section_calls):
+    calls, _ = section_calls
+    data = {
+        "title": "Remote work",
+        "h1": "Remote work habits for distributed teams",
+        "sections": [
+            {"h2": "Why written decisions beat meetings", "body": ENGLISH},
+            {"h2": "How to protect focus time", "body": "Short."},
+        ],
+    }
+
+    packaged, diagnostics, _ = await _finalize_content(
+        data,
+        [{"role": "user", "content": "original prompt"}],
+        2000,
+        platform="blog",
+        language="en",
+        topic_or_idea="Remote work",
+        focus_keyword="remote work",
+        target_length=200,
+        retrieved_context={},
+    )
+
+    assert diagnostics["repair"]["mode"] == "sections"
+    assert [item["index"] for item in diagnostics["repair"]["planned"]] == [0, 1]
+    assert all("original prompt" not in json.dumps(messages) for messages in calls)
+    assert packaged["structured"]["sections"][1]["h2"] == "Rewritten"
+
+
+@pytest.mark.unit
+def test_missing_sections_need_full_regeneration():
+    assert not repair_planner.sections_repairable(["Sections must include body content"], [], {"sections": []})
+    plan = [{"index": 0, "reasons": ["too short"]}]
+    assert not repair_planner.sections_repairable(["Output language must be en"], plan, {"sections": [{}]})
+    assert repair_planner.sections_repairable(
+        ["Content is significantly shorter than target length"], plan, {"sections": [{}]}
+    )
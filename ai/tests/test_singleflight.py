@@ -0,0 +1,193 @@
+"""
+tests/test_singleflight.py
+Unit tests for utils.singleflight — identical concurrent calls share one execution.
+No external API calls.
+"""
+
+import asyncio
+
+import pytest
+
+from services import gemini_service, live_search_service, llm_router, provider_health
+from utils import singleflight
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    singleflight.reset_singleflight_stats()
+    yield
+    singleflight.reset_singleflight_stats()
+
+
+def _slow(calls, result=None, delay=0.05, error=None):
+    async def fn(*args):
+        calls.append(args)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            calls.append("cancelled")
+            raise
+        if error:
+            raise error
+        return result if result is not None else {"items": [1, 2]}
+
+    return fn
+
+
+@pytest.mark.unit
+async def test_concurrent_callers_share_one_execution():
+    calls = []
+    fn = _slow(calls)
+
+    results = await asyncio.gather(*(singleflight.run("search", "q", fn, "q") for _ in range(4)))
+    await singleflight.run("search", "q", fn, "q")  # finished flights are not cached
+
+    assert len(calls) == 2
+    assert all(result == {"items": [1, 2]} for result in results)
+    results[1]["items"].append(3)
+    assert results[0] == {"items": [1, 2]}
+    stats = singleflight.get_singleflight_stats()
+    assert stats["groups"]["search"] == {"calls": 5, "executed": 2, "coalesced": 3, "abandoned": 0}
+    assert stats["callsSaved"] == 3
+    assert stats["inFlight"] == 0
+
+
+@pytest.mark.unit
+async def test_exception_reaches_every_waiter():
+    calls = []
+    fn = _slow(calls, error=RuntimeError("quota"))
+
+    results = await asyncio.gather(*(singleflight.run("llm", "k", fn) for _ in range(3)), return_exceptions=True)
+
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.unit
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    calls = []
+    fn = _slow(calls, result="page", delay=0.1)
+
+    first = asyncio.create_task(singleflight.run("scrape", "url", fn))
+    second = asyncio.create_task(singleflight.run("scrape", "url", fn))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "page"
+    assert first.cancelled()
+    assert "cancelled" not in calls
+
+
+@pytest.mark.unit
+async def test_last_waiter_leaving_cancels_shared_call():
+    calls = []
+    fn = _slow(calls, delay=1.0)
+
+    waiters = [asyncio.create_task(singleflight.run("embed", "texts", fn)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.sleep(0.01)
+
+    assert calls[-1] == "cancelled"
+    assert singleflight.get_singleflight_stats()["groups"]["embed"]["abandoned"] == 1
+    assert singleflight.get_singleflight_stats()["inFlight"] == 0
+
+
+@pytest.mark.unit
+async def test_disabled_runs_every_call(monkeypatch):
+    monkeypatch.setattr(singleflight.settings, "SINGLEFLIGHT_ENABLED", False)
+    calls = []
+
+    await asyncio.gather(*(singleflight.run("search", "q", _slow(calls)) for _ in range(3)))
+
+    assert len(calls) == 3
+
+    research_calls = []
+    await asyncio.gather(*(singleflight.run("research", "bundle", _slow(research_calls)) for _ in range(3)))
+    assert len(research_calls) == 1  # research dedup does not depend on the switch
+
+
+@pytest.mark.unit
+async def test_identical_search_queries_share_one_search(monkeypatch):
+    calls = []
+
+    async def fake_search(query, max_results):
+        calls.append(query)
+        await asyncio.sleep(0.02)
+        return [{"title": "t", "url": "https://example.com", "snippet": "s"}]
+
+    monkeypatch.setattr(live_search_service, "_search_ddg", fake_search)
+
+    results = await asyncio.gather(*(live_search_service.search_ddg("remote work") for _ in range(3)))
+
+    assert calls == ["remote work"]
+    assert all(len(result) == 1 for result in results)
+
+
+@pytest.mark.unit
+async def test_shared_scrape_survives_the_first_caller_being_cancelled(monkeypatch):
+    release = asyncio.Event()
+    clients = []
+
+    class FakeClient:
+        def __init__(self):
+            self.closed = False
+            clients.append(self)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            self.closed = True
+
+        async def get(self, url, **kwargs):
+            await release.wait()
+            assert not self.closed
+            return type("Response", (), {"status_code": 200, "text": "<html>page</html>"})()
+
+    async def fake_run_cpu(name, fn, *args, **kwargs):
+        return {"title": "Page", "content": "Full page text"}
+
+    monkeypatch.setattr(live_search_service.httpx, "AsyncClient", FakeClient)
+    monkeypatch.setattr(live_search_service, "run_cpu", fake_run_cpu)
+
+    first = asyncio.create_task(live_search_service.scrape_url("https://example.com/a"))
+    joiner = asyncio.create_task(live_search_service.scrape_url("https://example.com/a"))
+    await asyncio.sleep(0.01)
+    first.cancel()  # e.g. its client disconnected
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert (await joiner)["content"] == "Full page text"
+    assert len(clients) == 1
+
+
+@pytest.mark.unit
+async def test_identical_llm_prompts_share_one_call_and_keep_execution_context(monkeypatch):
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    calls = []
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        calls.append(provider)
+        await asyncio.sleep(0.02)
+        gemini_service._record_llm_execution(provider, "fake-model")
+        gemini_service._record_llm_usage(42, False)
+        return "text"
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+
+    async def caller():
+        text = await llm_router.call_routed("content", [{"role": "user", "content": "same prompt"}])
+        return text, gemini_service.get_last_llm_execution(), gemini_service.get_last_llm_usage()
+
+    results = await asyncio.gather(caller(), caller())
+
+    assert calls == ["gemini"]
+    for text, executed, usage in results:
+        assert text == "text"
+        assert executed == {"provider": "gemini", "model": "fake-model"}
+        assert usage == {"outputTokens": 42, "truncated": False}
+    llm_router.reset_router_stats()
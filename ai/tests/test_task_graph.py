@@ -0,0 +1,86 @@
+"""
+tests/test_task_graph.py
+Unit tests for utils.task_graph and the /topic/suggest research graph.
+Providers are stubbed — no external API calls.
+"""
+
+import asyncio
+
+import pytest
+
+from models.requests import TopicSuggestRequest
+from services import generation_service, live_search_service
+from utils import task_graph
+
+
+@pytest.mark.unit
+async def test_independent_nodes_run_concurrently_and_get_their_inputs():
+    async def slow(value):
+        await asyncio.sleep(0.05)
+        return value
+
+    async def a():
+        return await slow(1)
+
+    async def b():
+        return await slow(2)
+
+    async def total(a, b):
+        return a + b
+
+    results, report = await task_graph.run_graph({"a": ((), a), "b": ((), b), "total": (("a", "b"), total)})
+
+    assert results == {"a": 1, "b": 2, "total": 3}
+    assert report["wallMs"] < report["serialMs"]
+    assert report["nodes"]["total"]["startMs"] >= report["nodes"]["a"]["ms"]
+
+
+@pytest.mark.unit
+async def test_failure_cancels_running_nodes_and_cycles_are_rejected():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await task_graph.run_graph({"slow": ((), slow), "broken": ((), broken)})
+    assert cancelled.is_set()
+
+    with pytest.raises(ValueError):
+        await task_graph.run_graph({"a": (("b",), broken), "b": (("a",), broken)})
+    with pytest.raises(ValueError):
+        await task_graph.run_graph({"a": (("missing",), broken)})
+
+
+@pytest.mark.unit
+async def test_topic_live_search_runs_alongside_seed_and_retrieval(monkeypatch):
+    async def fake_seed(*args):
+        await asyncio.sleep(0.05)
+
+    async def fake_retrieve(*args):
+        await asyncio.sleep(0.05)
+        return {"snippets": [{"title": "indexed", "url": "https://a.example", "text": "indexed text"}]}
+
+    async def fake_live(queries, max_urls=10):
+        await asyncio.sleep(0.08)
+        return [{"title": "live", "url": "https://b.example", "content": "live text"}]
+
+    monkeypatch.setattr(generation_service, "quick_seed_now", fake_seed)
+    monkeypatch.setattr(generation_service, "ensure_index_async", lambda *args: None)
+    monkeypatch.setattr(generation_service, "retrieve_context", fake_retrieve)
+    monkeypatch.setattr(live_search_service, "search_and_scrape", fake_live)
+    req = TopicSuggestRequest(userId="u1", niche="saas", persona={"role": "founder"}, includeTrends=True)
+
+    ns, ctx, live_sources = await generation_service.topic_research(req)
+
+    timings = ctx["timings"]
+    assert live_sources == 1 and ctx["indexedSources"] == 1
+    assert timings["nodes"]["live"]["startMs"] < timings["nodes"]["seed"]["ms"]
+    assert timings["wallMs"] < timings["serialMs"]
@@ -0,0 +1,108 @@
+"""
+tests/test_token_budget.py
+Unit tests for token_budget — max_tokens from target length with learned tokens-per-word.
+No external API calls.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services import gemini_service, llm_router, provider_health, token_budget
+from services.llm_service import generate_content_json
+
+SENTENCE = "Remote teams write decisions down so nobody waits for the next meeting to move on. "
+
+
+@pytest.fixture(autouse=True)
+def fresh_budget():
+    token_budget.reset_token_budget()
+    yield
+    token_budget.reset_token_budget()
+
+
+@pytest.mark.unit
+def test_budget_scales_with_length_and_language():
+    short = token_budget.estimate_max_tokens("blog", "en", 400)
+    long = token_budget.estimate_max_tokens("blog", "en", 1800)
+    dense = token_budget.estimate_max_tokens("blog", "tr", 1800)
+
+    assert short == token_budget.PLATFORM_MIN_TOKENS["blog"]
+    assert long > 2000
+    assert dense > long
+    assert token_budget.estimate_max_tokens("blog", "en", 100000) == token_budget.settings.TOKEN_BUDGET_MAX_OUTPUT_TOKENS
+    # LinkedIn/Instagram prompts pin their own length, so a large targetLength does not inflate them
+    assert token_budget.estimate_max_tokens("linkedin", "en", 1200) == token_budget.estimate_max_tokens("linkedin", "en", 5000)
+
+
+@pytest.mark.unit
+def test_fixed_mode_restores_legacy_caps(monkeypatch):
+    monkeypatch.setattr(token_budget.settings, "TOKEN_BUDGET_ADAPTIVE", False)
+    assert token_budget.estimate_max_tokens("blog", "tr", 1800) == 2000
+    assert token_budget.estimate_max_tokens("instagram", "en", 1800) == 700
+    assert token_budget.budgeting_mode() == "fixed"
+
+
+@pytest.mark.unit
+def test_observations_move_ratio_from_prior():
+    prior = token_budget.tokens_per_word("gemini", "en")
+    for _ in range(20):
+        token_budget.observe("gemini", "en-US", 500, 1500)
+    learned = token_budget.tokens_per_word("gemini", "en")
+
+    assert prior < learned <= 3.0
+    assert token_budget.tokens_per_word("groq", "en") == pytest.approx(prior * 1.1)
+    token_budget.observe("gemini", "en", 10, 1000)  # too few words to trust
+    assert token_budget.tokens_per_word("gemini", "en") == learned
+    assert token_budget.get_token_budget_stats()["ratios"]["gemini:en"]["samples"] == 20
+
+
+@pytest.mark.unit
+def test_gemini_usage_and_truncation_are_read_from_response():
+    response = SimpleNamespace(
+        usage_metadata=SimpleNamespace(candidates_token_count=812),
+        candidates=[SimpleNamespace(finish_reason=SimpleNamespace(name="MAX_TOKENS"))],
+    )
+    gemini_service._record_gemini_usage(response)
+    assert gemini_service.get_last_llm_usage() == {"outputTokens": 812, "truncated": True}
+
+
+@pytest.mark.unit
+async def test_generation_learns_ratio_and_counts_outcomes(monkeypatch):
+    llm_router.reset_router_stats()
+    provider_health.reset_provider_health()
+    monkeypatch.setattr(llm_router.settings, "GEMINI_API_KEY", "test-key")
+    budgets = []
+
+    async def fake_call(provider, messages, max_tokens, temperature, json_mode):
+        budgets.append(max_tokens)
+        body = (SENTENCE * 30).strip()
+        payload = {
+            "title": "Remote work",
+            "h1": "Remote work habits for distributed teams",
+            "sections": [{"h2": "Why written decisions beat meetings", "body": body}],
+        }
+        gemini_service._record_llm_execution(provider, llm_router._model_for(provider))
+        gemini_service._record_llm_usage(3 * token_budget.payload_words(payload), False)
+        return json.dumps(payload)
+
+    monkeypatch.setattr(llm_router, "_call_provider", fake_call)
+
+    _, diagnostics, _ = await generate_content_json(
+        platform="blog",
+        language="en",
+        topic_or_idea="Remote work",
+        tone="friendly",
+        target_length=450,
+        focus_keyword="remote work",
+        style_guide=[],
+        retrieved_context={},
+    )
+
+    assert diagnostics["tokenBudget"] == {"mode": "adaptive", "maxTokens": budgets[0], "truncated": False}
+    stats = token_budget.get_token_budget_stats()
+    assert stats["ratios"]["gemini:en"]["samples"] == 1
+    assert stats["ratios"]["gemini:en"]["ratio"] > token_budget.LANGUAGE_PRIORS["en"]
+    assert stats["outcomes"]["adaptive"]["calls"] == 1
+    llm_router.reset_router_stats()
@@ -0,0 +1,125 @@
+"""
+Per-request deadline shared by every stage of a generation.
+
+Each stage used to have its own fixed timeout (DDG 10 s, 8 s per scraped URL,
+Groq 60 s, Gemini quota waits of up to 35 s, KIE polling for 120 s), so one
+request could run for minutes. The routers now `start()` a budget, taken
+from the X-Request-Timeout header (seconds) or REQUEST_DEADLINE_SECONDS, and
+the stages consult it:
+
+- `cap(timeout)` shortens a stage timeout to the time that is left
+- `tight(stage)` is true once less than the stage's DEADLINE_*_MIN_SECONDS
+  remains; the stage then takes its cheaper path and records it with
+  `degrade(stage, action)`:
+
+    scrape    use search snippets instead of fetching pages
+    keywords  skip keyword clustering
+    repair    keep the output as is instead of an LLM repair round
+    llm       use Groq instead of Gemini, fall back instead of waiting
+    image     skip the alt-text LLM call / stop polling KIE
+
+`report()` gives budget, elapsed time and the degradations for
+`diagnostics["deadline"]`. The state is one dict in a contextvar, so tasks
+spawned while serving the request (research, fan-out, single-flight calls)
+record into the same report. Without `start()` there is no deadline and
+nothing degrades (batch endpoints and the job worker).
+"""
+
+import contextvars
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+HEADER = "X-Request-Timeout"
+
+# Remaining seconds below which each stage degrades (settings attribute names)
+STAGE_THRESHOLDS = {
+    "scrape": "DEADLINE_SCRAPE_MIN_SECONDS",
+    "keywords": "DEADLINE_KEYWORDS_MIN_SECONDS",
+    "repair": "DEADLINE_REPAIR_MIN_SECONDS",
+    "llm": "DEADLINE_GEMINI_MIN_SECONDS",
+    "image": "DEADLINE_IMAGE_MIN_SECONDS",
+}
+
+_STATE: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+def budget_from_header(value: Optional[str], default: Optional[float] = None) -> float:
+    """
+    Seconds from the X-Request-Timeout header, capped at
+    REQUEST_DEADLINE_MAX_SECONDS; `default` (REQUEST_DEADLINE_SECONDS) when
+    the header is absent or invalid.
+    """
+    default = settings.REQUEST_DEADLINE_SECONDS if default is None else default
+    try:
+        budget = float(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        budget = default
+    if budget <= 0:
+        budget = default
+    return min(budget, settings.REQUEST_DEADLINE_MAX_SECONDS)
+
+
+def start(budget_seconds: float) -> None:
+    """Begin a deadline for the current request (and the tasks it spawns)."""
+    now = time.monotonic()
+    _STATE.set({"budget": budget_seconds, "started": now, "deadline": now + budget_seconds, "degradations": []})
+
+
+def clear() -> None:
+    _STATE.set(None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left, or None when no deadline is active."""
+    state = _STATE.get()
+    if state is None:
+        return None
+    return state["deadline"] - time.monotonic()
+
+
+def cap(timeout: float, minimum: float = 1.0) -> float:
+    """`timeout` shortened to the remaining budget, but never below `minimum`."""
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(minimum, min(timeout, left))
+
+
+def tight(stage: str) -> bool:
+    left = remaining()
+    if left is None:
+        return False
+    return left < float(getattr(settings, STAGE_THRESHOLDS[stage]))
+
+
+def degrade(stage: str, action: str) -> None:
+    state = _STATE.get()
+    if state is None or any(item["stage"] == stage and item["action"] == action for item in state["degradations"]):
+        return
+    left = state["deadline"] - time.monotonic()
+    state["degradations"].append({"stage": stage, "action": action, "remainingMs": round(left * 1000)})
+    logger.info("deadline_degrade stage=%s action=%s remaining=%.1fs", stage, action, left)
+
+
+def degraded(stage: str) -> bool:
+    state = _STATE.get()
+    return bool(state) and any(item["stage"] == stage for item in state["degradations"])
+
+
+def report() -> Optional[Dict[str, Any]]:
+    state = _STATE.get()
+    if state is None:
+        return None
+    now = time.monotonic()
+    degradations: List[Dict[str, Any]] = list(state["degradations"])
+    return {
+        "budgetMs": round(state["budget"] * 1000),
+        "elapsedMs": round((now - state["started"]) * 1000),
+        "exceeded": now > state["deadline"],
+        "degradations": degradations,
+    }
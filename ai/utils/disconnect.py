@@ -0,0 +1,99 @@
+"""
+Cancel a request's work when its client disconnects.
+
+If the browser or backend gave up on /content/generate or /topic/suggest,
+the service used to keep scraping, embedding and calling the LLMs to
+completion for nobody. `run_until_disconnected(request, route, work)` runs
+the endpoint's work as a task next to a watcher on the ASGI receive channel
+(which only reports http.disconnect once the body has been read); when the
+client leaves first, the work task is cancelled, which cancels everything it
+awaits, and ClientDisconnected is raised (answered with 499 in main.py).
+
+Work shared with other requests is not torn down by one of them leaving:
+single-flight calls (research bundles, index seeding, search, scrape,
+embeddings, LLM prompts) are shielded and only cancelled once their last
+waiter is gone, background index builds are not tied to a request, and an
+execution started under an Idempotency-Key keeps running for the retry.
+Such work calls mark_detached() as its request leaves, and the disconnect is
+counted as detached rather than cancelled.
+
+Per-route counts (watched, completed, disconnected, detached) are exposed
+via get_disconnect_stats() for /metrics; "cancelled" is the number of
+disconnects whose work was really torn down.
+"""
+
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STATS: Dict[str, Dict[str, int]] = {}
+_OUTCOME: ContextVar[Optional[Dict[str, bool]]] = ContextVar("disconnect_outcome", default=None)
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready; its work was cancelled."""
+
+
+def _stats(route: str) -> Dict[str, int]:
+    return _STATS.setdefault(route, {"watched": 0, "completed": 0, "disconnected": 0, "detached": 0})
+
+
+def mark_detached() -> None:
+    """Called by request work that keeps running for another caller after the request is cancelled."""
+    outcome = _OUTCOME.get()
+    if outcome is not None:
+        outcome["detached"] = True
+
+
+async def _wait_for_disconnect(request: Any) -> None:
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_until_disconnected(request: Any, route: str, work: Awaitable[T]) -> T:
+    stats = _stats(route)
+    stats["watched"] += 1
+    outcome = {"detached": False}
+    token = _OUTCOME.set(outcome)
+    try:
+        task = asyncio.ensure_future(work)  # the task copies the context, and with it `outcome`
+    finally:
+        _OUTCOME.reset(token)
+    watcher = asyncio.create_task(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            # The client disconnected (or this handler itself was cancelled)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    if task.cancelled() and watcher.done() and not watcher.cancelled():
+        stats["disconnected"] += 1
+        if outcome["detached"]:
+            stats["detached"] += 1
+            logger.info("client_disconnected route=%s: request work detached, still running", route)
+        else:
+            logger.info("client_disconnected route=%s: request work cancelled", route)
+        raise ClientDisconnected(route)
+    stats["completed"] += 1
+    return task.result()
+
+
+def get_disconnect_stats() -> Dict[str, Any]:
+    return {
+        "routes": {route: dict(counts) for route, counts in sorted(_STATS.items())},
+        "cancelled": sum(counts["disconnected"] - counts["detached"] for counts in _STATS.values()),
+    }
+
+
+def reset_disconnect_stats() -> None:
+    _STATS.clear()
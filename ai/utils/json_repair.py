@@ -0,0 +1,319 @@
+"""
+Deterministic local repair of malformed LLM JSON.
+
+A tolerant recursive-descent parser that reads what the model meant rather
+than what the grammar allows, and records the kinds of fixes it made:
+
+- prose / markdown fences around the object
+- trailing, stray and missing commas
+- raw newlines and unescaped quotes inside strings
+- single-quoted strings, unquoted keys, Python literals (True/False/None)
+- // and /* */ comments
+- truncated output: an open string value is kept, a dangling key is dropped
+  and open containers are closed. An array item cut off mid-way is dropped,
+  so only complete items (e.g. whole blog sections) survive.
+
+Used by ``call_gemini_json`` before falling back to an LLM repair round-trip.
+"""
+
+import json
+import re
+from typing import Any, List, Tuple
+
+MAX_DEPTH = 200
+
+_NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_BAREWORD = re.compile(r"[A-Za-z_$][\w$-]*")
+_UNQUOTED_KEY = re.compile(r"[^:\s,{}\[\]\"']+")
+_INVALID_ESCAPE = re.compile(r"\\([^\"\\/bfnrtu])")
+# What may follow "<string>," when the string really ended there
+_AFTER_COMMA = re.compile(r"\s*(?:$|[\"'{\[\]}\-\d]|(?:true|false|null)\b|[A-Za-z_$][\w$-]*\s*:)")
+_KEY_AHEAD = {
+    '"': re.compile(r'"[^"\n]*"\s*:'),
+    "'": re.compile(r"'[^'\n]*'\s*:"),
+}
+_LITERALS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "True": True,
+    "False": False,
+    "None": None,
+    "NaN": None,
+    "undefined": None,
+}
+_MISSING = object()
+
+
+class JSONRepairError(ValueError):
+    pass
+
+
+class _Truncated(Exception):
+    """Input ended mid-value; args[0] is the partial value or _MISSING."""
+
+
+def _decode(raw: str) -> str:
+    raw = _INVALID_ESCAPE.sub(r"\1", raw)
+    try:
+        return json.loads(f'"{raw}"', strict=False)
+    except ValueError:
+        return raw.rstrip("\\").replace('\\"', '"')
+
+
+class _Repairer:
+    def __init__(self, text: str, start: int):
+        self.text = text
+        self.pos = start
+        self.fixes: List[str] = []
+
+    def fix(self, description: str) -> None:
+        if description not in self.fixes:
+            self.fixes.append(description)
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def skip_ws(self) -> None:
+        text, n = self.text, len(self.text)
+        while self.pos < n:
+            if text[self.pos] in " \t\r\n":
+                self.pos += 1
+            elif text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = n if end == -1 else end + 1
+                self.fix("removed comments")
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                self.pos = n if end == -1 else end + 2
+                self.fix("removed comments")
+            else:
+                break
+
+    def _significant_after(self, index: int) -> int:
+        text, n = self.text, len(self.text)
+        while index < n and text[index] in " \t\r\n":
+            index += 1
+        return index
+
+    # -- grammar ------------------------------------------------------------
+
+    def parse_value(self, depth: int) -> Any:
+        if depth > MAX_DEPTH:
+            raise JSONRepairError("nesting too deep")
+        self.skip_ws()
+        char = self.peek()
+        if not char:
+            raise _Truncated(_MISSING)
+        if char == "{":
+            return self.parse_object(depth + 1)
+        if char == "[":
+            return self.parse_array(depth + 1)
+        if char in "\"'":
+            return self.parse_string(is_key=False)
+
+        number = _NUMBER.match(self.text, self.pos)
+        if number:
+            self.pos = number.end()
+            token = number.group()
+            return float(token) if any(c in token for c in ".eE") else int(token)
+
+        word = _BAREWORD.match(self.text, self.pos)
+        if word:
+            self.pos = word.end()
+            token = word.group()
+            if token in _LITERALS:
+                if token not in ("true", "false", "null"):
+                    self.fix("converted non-JSON literals")
+                return _LITERALS[token]
+            if self.pos >= len(self.text):
+                raise _Truncated(_MISSING)  # most likely a literal cut in half
+            self.fix("quoted bare words")
+            return token
+        raise JSONRepairError(f"unexpected {char!r} at offset {self.pos}")
+
+    def parse_object(self, depth: int) -> dict:
+        self.pos += 1  # "{"
+        result: dict = {}
+        while True:
+            self.skip_ws()
+            char = self.peek()
+            if not char:
+                raise _Truncated(result)
+            if char == "}":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                self.fix("removed stray commas")
+                continue
+            if char == "]":
+                self.pos += 1
+                self.fix("fixed mismatched closers")
+                return result
+
+            try:
+                key = self.parse_key()
+            except _Truncated:
+                raise _Truncated(result) from None
+            self.skip_ws()
+            if self.peek() == ":":
+                self.pos += 1
+            elif not self.peek():
+                raise _Truncated(result)
+            else:
+                self.fix("inserted missing colons")
+
+            try:
+                result[key] = self.parse_value(depth)
+            except _Truncated as truncated:
+                if truncated.args[0] is not _MISSING:
+                    result[key] = truncated.args[0]
+                raise _Truncated(result) from None
+
+            self.skip_ws()
+            char = self.peek()
+            if char == ",":
+                self.pos += 1
+                after = self._significant_after(self.pos)
+                if self.text[after:after + 1] == "}":
+                    self.fix("removed trailing commas")
+            elif char in "}]":
+                continue
+            elif not char:
+                raise _Truncated(result)
+            elif char in "\"'" or _BAREWORD.match(self.text, self.pos):
+                self.fix("inserted missing commas")
+            else:
+                raise JSONRepairError(f"unexpected {char!r} after object member at offset {self.pos}")
+
+    def parse_array(self, depth: int) -> list:
+        self.pos += 1  # "["
+        result: list = []
+        while True:
+            self.skip_ws()
+            char = self.peek()
+            if not char:
+                raise _Truncated(result)
+            if char == "]":
+                self.pos += 1
+                return result
+            if char == ",":
+                self.pos += 1
+                self.fix("removed stray commas")
+                continue
+            if char == "}":
+                self.pos += 1
+                self.fix("fixed mismatched closers")
+                return result
+
+            try:
+                result.append(self.parse_value(depth))
+            except _Truncated:
+                self.fix("dropped truncated array items")
+                raise _Truncated(result) from None
+
+            self.skip_ws()
+            char = self.peek()
+            if char == ",":
+                self.pos += 1
+                after = self._significant_after(self.pos)
+                if self.text[after:after + 1] == "]":
+                    self.fix("removed trailing commas")
+            elif char in "]}":
+                continue
+            elif not char:
+                raise _Truncated(result)
+            else:
+                self.fix("inserted missing commas")
+
+    def parse_key(self) -> str:
+        if self.peek() in "\"'":
+            return self.parse_string(is_key=True)
+        word = _UNQUOTED_KEY.match(self.text, self.pos)
+        if not word:
+            raise JSONRepairError(f"expected a key at offset {self.pos}")
+        self.pos = word.end()
+        self.fix("quoted unquoted keys")
+        return word.group()
+
+    def _closes_string(self, quote_pos: int, is_key: bool) -> bool:
+        """Is the quote at quote_pos the end of the string, or an unescaped quote inside it?"""
+        at = self._significant_after(quote_pos + 1)
+        following = self.text[at:at + 1]
+        if not following:
+            return True
+        if is_key:
+            return following == ":"
+        if following in "}]:":
+            return True
+        if following == ",":
+            return bool(_AFTER_COMMA.match(self.text, at + 1))
+        if following in _KEY_AHEAD:
+            # "a": "x" "b": ... is a missing comma, not an inner quote
+            return bool(_KEY_AHEAD[following].match(self.text, at))
+        return False
+
+    def parse_string(self, is_key: bool) -> str:
+        quote = self.peek()
+        if quote == "'":
+            self.fix("converted single-quoted strings")
+        self.pos += 1
+        text, n = self.text, len(self.text)
+        parts: List[str] = []
+        start = self.pos
+        while True:
+            if self.pos >= n:
+                parts.append(text[start:])
+                raise _Truncated(_decode("".join(parts)))
+            char = text[self.pos]
+            if char == "\\":
+                self.pos += 2
+                continue
+            if char == quote:
+                parts.append(text[start:self.pos])
+                self.pos += 1
+                if self._closes_string(self.pos - 1, is_key):
+                    return _decode("".join(parts))
+                parts.append('\\"' if quote == '"' else "'")
+                start = self.pos
+                self.fix("escaped inner quotes")
+                continue
+            if char == '"':  # inside a single-quoted string
+                parts.append(text[start:self.pos] + '\\"')
+                self.pos += 1
+                start = self.pos
+                continue
+            if char in "\n\r\t":
+                self.fix("escaped raw control characters")
+            self.pos += 1
+
+
+def repair_json(text: str) -> Tuple[Any, List[str]]:
+    """
+    Parse `text` as leniently as possible.
+
+    Returns (value, fixes); `fixes` names the kinds of defects that were
+    repaired and is empty for clean JSON. Raises JSONRepairError when no
+    object can be recovered.
+    """
+    raw = text or ""
+    start = raw.find("{")
+    if start == -1:
+        raise JSONRepairError("no JSON object found")
+    repairer = _Repairer(raw, start)
+    if raw[:start].strip():
+        repairer.fix("stripped text around the object")
+    try:
+        value = repairer.parse_object(1)
+    except _Truncated as truncated:
+        value = truncated.args[0]
+        repairer.fix("closed truncated output")
+    return value, repairer.fixes
+
+
+def missing_required(data: Any, required_keys) -> List[str]:
+    """Required keys that are absent or empty in a repaired payload."""
+    if not isinstance(data, dict):
+        return list(required_keys or ())
+    return [key for key in (required_keys or ()) if data.get(key) in (None, "", [], {})]
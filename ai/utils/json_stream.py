@@ -0,0 +1,301 @@
+"""
+Incremental, tolerant JSON parser for streamed LLM output.
+
+Feed chunks as they arrive; every top-level field is reported as soon as its
+value closes, and items of top-level arrays are reported one by one, so a
+blog payload yields ``sections[0]``, ``sections[1]``, ..., ``meta`` and
+``faqs[i]`` long before the closing brace.
+
+Tolerated, like ``_clean_json_response`` in gemini_service:
+- prose or markdown fences before the root ``{`` and anything after it closes
+- raw newlines / control characters inside strings
+- trailing commas before ``}`` or ``]``
+
+Each input character is looked at a bounded number of times (string bodies
+and whitespace are skipped with ``str.find`` / slicing), so parsing is linear
+in the total input size regardless of how it is chunked.
+"""
+
+import json
+import re
+from typing import Any, Iterable, List, NamedTuple, Optional
+
+_WHITESPACE = " \t\r\n"
+_WHITESPACE_RUN = re.compile(r"[ \t\r\n]+")
+_LITERAL_CHARS = set("0123456789+-.eEtrufalsn")
+_LITERAL_RUN = re.compile(r"[0-9+\-.eEtrufalsn]+")
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+class JSONStreamEvent(NamedTuple):
+    key: str
+    index: Optional[int]  # position within a top-level array, None for plain fields
+    value: Any
+
+
+class _Frame:
+    __slots__ = ("value", "is_object", "key", "parent_key")
+
+    def __init__(self, value, parent_key: Optional[str]):
+        self.value = value
+        self.is_object = isinstance(value, dict)
+        self.key: Optional[str] = None
+        self.parent_key = parent_key
+
+
+# Parser states
+_BEFORE_ROOT = 0
+_VALUE = 1         # expecting a value
+_KEY = 2           # in an object, expecting a key or "}"
+_COLON = 3
+_AFTER_VALUE = 4   # expecting "," or a closer
+_STRING = 5
+_LITERAL = 6
+_DONE = 7
+
+
+def _decode_string(raw: str) -> str:
+    try:
+        return json.loads(f'"{raw}"', strict=False)
+    except ValueError:
+        return raw.replace('\\"', '"')
+
+
+def _decode_literal(token: str) -> Any:
+    if token == "true":
+        return True
+    if token == "false":
+        return False
+    if token == "null":
+        return None
+    try:
+        return json.loads(token)
+    except ValueError as exc:
+        raise JSONStreamError(f"invalid literal {token[:20]!r}") from exc
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self._state = _BEFORE_ROOT
+        self._stack: List[_Frame] = []
+        self._buffer: List[str] = []
+        self._escaped = False
+        self._string_is_key = False
+        self._root: Any = None
+        self._events: List[JSONStreamEvent] = []
+        self.consumed = 0
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    # -- value plumbing -----------------------------------------------------
+
+    def _push(self, container) -> None:
+        parent_key = None
+        if self._stack:
+            parent = self._stack[-1]
+            parent_key = parent.key if parent.is_object else None
+        self._stack.append(_Frame(container, parent_key))
+        self._state = _KEY if isinstance(container, dict) else _VALUE
+
+    def _complete(self, value: Any) -> None:
+        if not self._stack:
+            self._root = value
+            self._state = _DONE
+            return
+        frame = self._stack[-1]
+        depth = len(self._stack)
+        if frame.is_object:
+            frame.value[frame.key] = value
+            if depth == 1:
+                if not isinstance(value, list):
+                    self._events.append(JSONStreamEvent(frame.key, None, value))
+            frame.key = None
+        else:
+            frame.value.append(value)
+            if depth == 2 and self._stack[0].is_object:
+                self._events.append(JSONStreamEvent(frame.parent_key, len(frame.value) - 1, value))
+        self._state = _AFTER_VALUE
+
+    def _pop(self) -> None:
+        frame = self._stack.pop()
+        self._complete(frame.value)
+
+    # -- scanning -----------------------------------------------------------
+
+    def feed(self, chunk: str) -> List[JSONStreamEvent]:
+        """Consume one chunk; return the events completed by it."""
+        self._events = []
+        text = chunk or ""
+        self.consumed += len(text)
+        i, n = 0, len(text)
+
+        while i < n:
+            state = self._state
+
+            if state == _DONE:
+                break
+
+            if state == _BEFORE_ROOT:
+                start = text.find("{", i)
+                if start == -1:
+                    break
+                self._push({})
+                i = start + 1
+                continue
+
+            if state == _STRING:
+                # Jump between quotes and backslashes; everything in between is string body.
+                quote = -1
+                while i < n:
+                    if self._escaped:
+                        self._buffer.append(text[i])
+                        self._escaped = False
+                        i += 1
+                        continue
+                    if quote < i:
+                        quote = text.find('"', i)
+                        if quote == -1:
+                            quote = n
+                    backslash = text.find("\\", i, quote)
+                    if backslash != -1:
+                        self._buffer.append(text[i:backslash + 1])
+                        self._escaped = True
+                        i = backslash + 1
+                        continue
+                    self._buffer.append(text[i:quote])
+                    if quote == n:
+                        i = n
+                        break
+                    i = quote + 1
+                    value = _decode_string("".join(self._buffer))
+                    self._buffer = []
+                    if self._string_is_key:
+                        self._stack[-1].key = value
+                        self._state = _COLON
+                    else:
+                        self._complete(value)
+                    break
+                continue
+
+            char = text[i]
+
+            if state == _LITERAL:
+                run = _LITERAL_RUN.match(text, i)
+                if run:
+                    self._buffer.append(run.group())
+                    i = run.end()
+                    continue
+                token = "".join(self._buffer)
+                self._buffer = []
+                self._complete(_decode_literal(token))
+                continue
+
+            if char in _WHITESPACE:
+                i = _WHITESPACE_RUN.match(text, i).end()
+                continue
+
+            if state == _VALUE:
+                if char == "{":
+                    self._push({})
+                elif char == "[":
+                    self._push([])
+                elif char == "]" and self._stack and not self._stack[-1].is_object:
+                    self._pop()  # empty array or trailing comma
+                elif char == '"':
+                    self._state = _STRING
+                    self._string_is_key = False
+                elif char in _LITERAL_CHARS:
+                    self._state = _LITERAL
+                    self._buffer = [char]
+                else:
+                    raise JSONStreamError(f"unexpected {char!r} at offset {self.consumed - n + i}")
+                i += 1
+                continue
+
+            if state == _KEY:
+                if char == '"':
+                    self._state = _STRING
+                    self._string_is_key = True
+                elif char == "}":
+                    self._pop()
+                else:
+                    raise JSONStreamError(f"expected a key, got {char!r} at offset {self.consumed - n + i}")
+                i += 1
+                continue
+
+            if state == _COLON:
+                if char != ":":
+                    raise JSONStreamError(f"expected ':', got {char!r} at offset {self.consumed - n + i}")
+                self._state = _VALUE
+                i += 1
+                continue
+
+            if state == _AFTER_VALUE:
+                frame = self._stack[-1]
+                if char == ",":
+                    self._state = _KEY if frame.is_object else _VALUE
+                elif char == "}" and frame.is_object:
+                    self._pop()
+                elif char == "]" and not frame.is_object:
+                    self._pop()
+                else:
+                    raise JSONStreamError(f"expected ',' or a closer, got {char!r} at offset {self.consumed - n + i}")
+                i += 1
+                continue
+
+        return self._events
+
+    def close(self, allow_partial: bool = False) -> Any:
+        """
+        Finish parsing and return the root value.
+
+        With `allow_partial`, truncated input is closed off instead of raising:
+        an open string value is kept, a dangling key is dropped, and open
+        containers are closed.
+        """
+        if self._state == _LITERAL:
+            token = "".join(self._buffer)
+            self._buffer = []
+            try:
+                self._complete(_decode_literal(token))
+            except JSONStreamError:
+                if not allow_partial:
+                    raise
+                self._state = _AFTER_VALUE
+        if self._state == _DONE:
+            return self._root
+        if self._state == _BEFORE_ROOT:
+            raise JSONStreamError("no JSON object found")
+        if not allow_partial:
+            raise JSONStreamError("input ended before the JSON value closed")
+
+        self._events = []
+        if self._state == _STRING:
+            value = _decode_string("".join(self._buffer).rstrip("\\"))
+            self._buffer = []
+            if not self._string_is_key:
+                self._complete(value)
+        top = self._stack[-1] if self._stack else None
+        if top is not None and top.is_object and top.key is not None and self._state != _AFTER_VALUE:
+            top.key = None  # key without a value
+        while self._stack:
+            self._pop()
+        return self._root
+
+
+def iter_json_events(chunks: Iterable[str]) -> Iterable[JSONStreamEvent]:
+    parser = IncrementalJSONParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+
+def parse_json_tolerant(text: str, allow_partial: bool = False) -> Any:
+    """One-shot parse with the same tolerances as the streaming parser."""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.close(allow_partial=allow_partial)
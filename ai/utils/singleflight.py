@@ -0,0 +1,104 @@
+"""
+Single-flight coalescing for identical concurrent async calls.
+
+Concurrent requests used to scrape the same URL, run the same search query,
+embed the same texts and send identical LLM prompts in parallel. With
+`run(group, key, fn, *args)` the first caller for a key starts `fn` as a
+shared task and every caller that arrives while it is running awaits that
+same task instead of starting its own:
+
+- results and exceptions reach every waiter; joiners get a deep copy of the
+  result so nobody mutates another caller's data
+- a waiter that is cancelled only detaches itself (the shared task is
+  shielded); the task is cancelled once its last waiter has gone
+- nothing is cached: the key is forgotten as soon as the task finishes
+
+Counters per group (calls, executed, coalesced, abandoned) are exposed via
+get_singleflight_stats() for /metrics. SINGLEFLIGHT_ENABLED=false runs every
+call directly, except for the groups in ALWAYS_COALESCED: research bundles
+were deduplicated unconditionally before they moved here and still are.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+ALWAYS_COALESCED = frozenset({"research"})
+
+_FLIGHTS: Dict[Tuple[str, Hashable], Dict[str, Any]] = {}
+_STATS: Dict[str, Dict[str, int]] = {}
+
+
+def key_for(*parts: Any) -> str:
+    """Stable key for arbitrary JSON-like call arguments (messages, text lists, ...)."""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _stats(group: str) -> Dict[str, int]:
+    return _STATS.setdefault(group, {"calls": 0, "executed": 0, "coalesced": 0, "abandoned": 0})
+
+
+def _forget(flight_key: Tuple[str, Hashable], flight: Dict[str, Any]) -> None:
+    if _FLIGHTS.get(flight_key) is flight:
+        _FLIGHTS.pop(flight_key, None)
+
+
+def _finished(flight_key: Tuple[str, Hashable], flight: Dict[str, Any], task: asyncio.Task) -> None:
+    _forget(flight_key, flight)
+    if not task.cancelled():
+        task.exception()  # mark retrieved; waiters (if any) re-raise it themselves
+
+
+async def run(group: str, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+    stats = _stats(group)
+    stats["calls"] += 1
+    if not settings.SINGLEFLIGHT_ENABLED and group not in ALWAYS_COALESCED:
+        stats["executed"] += 1
+        return await fn(*args, **kwargs)
+
+    flight_key = (group, key)
+    flight = _FLIGHTS.get(flight_key)
+    leader = flight is None
+    if leader:
+        task = asyncio.create_task(fn(*args, **kwargs))
+        flight = {"task": task, "waiters": 0}
+        _FLIGHTS[flight_key] = flight
+        task.add_done_callback(lambda done: _finished(flight_key, flight, done))
+        stats["executed"] += 1
+    else:
+        stats["coalesced"] += 1
+        logger.info("singleflight_join group=%s waiters=%s", group, flight["waiters"] + 1)
+
+    task = flight["task"]
+    flight["waiters"] += 1
+    try:
+        result = await asyncio.shield(task)
+    finally:
+        flight["waiters"] -= 1
+        if flight["waiters"] == 0 and not task.done():
+            # Every caller has been cancelled; nobody is left to use the result
+            _forget(flight_key, flight)
+            task.cancel()
+            stats["abandoned"] += 1
+            logger.info("singleflight_abandoned group=%s", group)
+    return result if leader else copy.deepcopy(result)
+
+
+def get_singleflight_stats() -> Dict[str, Any]:
+    return {
+        "inFlight": len(_FLIGHTS),
+        "groups": {group: dict(counts) for group, counts in sorted(_STATS.items())},
+        "callsSaved": sum(counts["coalesced"] for counts in _STATS.values()),
+    }
+
+
+def reset_singleflight_stats() -> None:
+    _STATS.clear()
@@ -0,0 +1,77 @@
+"""
+Run a small dependency graph of async steps with independent branches in parallel.
+
+    results, report = await run_graph({
+        "seed": ((), seed),
+        "retrieve": (("seed",), retrieve),   # called as retrieve(seed=<seed result>)
+        "live": ((), live),
+    })
+
+Every node starts as soon as the nodes it depends on have finished and is
+called with their results as keyword arguments. If a node fails, the nodes
+still running are cancelled and the error propagates. The report has each
+node's start offset and duration, the wall time of the whole graph and the
+sum of the node durations (what running them one after another would cost).
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Sequence, Tuple
+
+Node = Tuple[Sequence[str], Callable[..., Awaitable[Any]]]
+
+
+def _check_acyclic(nodes: Dict[str, Node]) -> None:
+    state: Dict[str, str] = {}
+
+    def visit(name: str) -> None:
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Task graph has a cycle through {name!r}")
+        state[name] = "visiting"
+        for dep in nodes[name][0]:
+            if dep not in nodes:
+                raise ValueError(f"Task graph node {name!r} depends on unknown node {dep!r}")
+            visit(dep)
+        state[name] = "done"
+
+    for name in nodes:
+        visit(name)
+
+
+async def run_graph(nodes: Dict[str, Node]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Returns (results by node, timing report)."""
+    _check_acyclic(nodes)
+    started = time.perf_counter()
+    timings: Dict[str, Dict[str, float]] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_node(name: str) -> Any:
+        deps, fn = nodes[name]
+        inputs = {dep: await tasks[dep] for dep in deps}
+        node_started = time.perf_counter()
+        try:
+            return await fn(**inputs)
+        finally:
+            timings[name] = {
+                "startMs": round((node_started - started) * 1000, 1),
+                "ms": round((time.perf_counter() - node_started) * 1000, 1),
+            }
+
+    for name in nodes:
+        tasks[name] = asyncio.create_task(run_node(name))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    report = {
+        "nodes": {name: timings[name] for name in nodes},
+        "wallMs": round((time.perf_counter() - started) * 1000, 1),
+        "serialMs": round(sum(timing["ms"] for timing in timings.values()), 1),
+    }
+    return {name: task.result() for name, task in tasks.items()}, report
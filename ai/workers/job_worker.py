@@ -0,0 +1,145 @@
+"""
+Job worker: runs queued topic/content jobs outside the API process.
+
+    python -m workers.job_worker [--concurrency N] [--priority interactive] [--once]
+
+Each of the N slots claims one job at a time from services.job_queue, keeps
+its lease alive and runs the job's items through the same handlers as
+/topic/suggest and /content/generate, at most BATCH_MAX_CONCURRENCY items
+at once. Progress is checkpointed after every item, so a retry (or another
+worker picking up an abandoned job) skips the items that already succeeded.
+`--once` drains the runnable jobs and exits, e.g. from cron.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from models.requests import JOB_ITEM_MODELS
+from services import batch_service, generation_service, job_queue
+from services.blocking_io import run_blocking, shutdown_blocking_pools
+from services.cpu_executor import shutdown_cpu_pool
+
+logger = logging.getLogger(__name__)
+
+# The handlers behind the endpoints: jobs have no request deadline or Idempotency-Key
+HANDLERS = {"topics": generation_service.suggest_topics, "content": generation_service.generate_content}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def _keep_leased(job_id: str, worker_id: str) -> None:
+    interval = max(1.0, settings.JOB_LEASE_SECONDS / 3)
+    while True:
+        await asyncio.sleep(interval)
+        if not await run_blocking("jobs", job_queue.heartbeat, job_id, worker_id):
+            logger.warning("job_lease_lost id=%s worker=%s", job_id, worker_id)
+            return
+
+
+async def run_job(job: Dict[str, Any], worker_id: str) -> Optional[str]:
+    """Run one claimed job to completion or failure; returns its new status."""
+    job_id = job["id"]
+    items = (job["payload"] or {}).get("items") or []
+    progress = job["progress"] or job_queue.new_progress(len(items))
+    progress["errors"] = {}  # failed items are retried on every attempt
+    pending = [index for index in range(len(items)) if str(index) not in progress["results"]]
+
+    model = JOB_ITEM_MODELS.get(job["kind"])
+    handler = HANDLERS.get(job["kind"])
+    if model is None or handler is None:
+        return await run_blocking("jobs", job_queue.fail, job_id, worker_id, f"Unknown job kind {job['kind']!r}")
+
+    async def run_item(index: int):
+        response = await handler(model.model_validate(items[index]))
+        return response.model_dump()
+
+    logger.info("job_start id=%s kind=%s items=%s resumed=%s", job_id, job["kind"], len(items), len(items) - len(pending))
+    lease = asyncio.create_task(_keep_leased(job_id, worker_id))
+    outcomes = batch_service.run_batch(pending, run_item, settings.BATCH_MAX_CONCURRENCY, "job")
+    try:
+        async for outcome in outcomes:
+            key = str(pending[outcome["index"]])
+            if outcome["status"] == "ok":
+                progress["results"][key] = outcome["result"]
+            else:
+                progress["errors"][key] = outcome["error"]
+            if not await run_blocking("jobs", job_queue.save_progress, job_id, worker_id, progress):
+                logger.warning("job_abandoned id=%s: lease lost, stopping", job_id)
+                return None
+    finally:
+        await outcomes.aclose()
+        lease.cancel()
+
+    result = {"items": job_queue.progress_items(progress, len(items))}
+    if not progress["errors"]:
+        done = await run_blocking("jobs", job_queue.complete, job_id, worker_id, result)
+        return "succeeded" if done else None
+    error = f"{len(progress['errors'])}/{len(items)} items failed: " + "; ".join(
+        f"#{index}: {message}" for index, message in sorted(progress["errors"].items(), key=lambda item: int(item[0]))[:3]
+    )
+    return await run_blocking("jobs", job_queue.fail, job_id, worker_id, error, result)
+
+
+async def run_worker(
+    worker_id: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    priorities: Optional[List[str]] = None,
+    once: bool = False,
+) -> int:
+    """Run job slots until cancelled (or, with `once`, until nothing is runnable). Returns jobs processed."""
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+
+    async def slot(number: int) -> None:
+        nonlocal processed
+        while True:
+            job = await run_blocking("jobs", job_queue.claim, f"{worker_id}/{number}", priorities)
+            if job is None:
+                if once:
+                    return
+                await asyncio.sleep(settings.JOB_WORKER_POLL_SECONDS)
+                continue
+            try:
+                await run_job(job, f"{worker_id}/{number}")
+            except Exception as exc:
+                logger.exception("job_crashed id=%s", job["id"])
+                await run_blocking("jobs", job_queue.fail, job["id"], f"{worker_id}/{number}", str(exc))
+            processed += 1
+
+    slots = max(1, concurrency or settings.JOB_WORKER_CONCURRENCY)
+    logger.info("job_worker_start id=%s slots=%s priorities=%s queue=%s", worker_id, slots, priorities or "all", settings.JOB_QUEUE_PATH)
+    await asyncio.gather(*(slot(number) for number in range(slots)))
+    return processed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run queued topic/content generation jobs.")
+    parser.add_argument("--concurrency", type=int, default=None, help="jobs run at once (JOB_WORKER_CONCURRENCY)")
+    parser.add_argument(
+        "--priority",
+        action="append",
+        choices=sorted(job_queue.PRIORITIES),
+        help="only claim these priority classes (repeatable; default: all)",
+    )
+    parser.add_argument("--once", action="store_true", help="exit when no job is runnable")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, str(settings.LOG_LEVEL).upper(), logging.INFO), format="%(levelname)s:%(name)s:%(message)s")
+    try:
+        asyncio.run(run_worker(concurrency=args.concurrency, priorities=args.priority, once=args.once))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_cpu_pool()
+        shutdown_blocking_pools()
+
+
+if __name__ == "__main__":
+    main()